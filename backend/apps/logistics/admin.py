@@ -2,15 +2,18 @@
 from django.contrib import admin
 
 from apps.logistics.models import (
+    Breadcrumb,
     Driver,
     Event,
     Exception as LogisticsException,
+    OptimizationJob,
     Order,
     OutboxMessage,
     POD,
     Route,
     StatusHistory,
     Stop,
+    TravelProfile,
     Vehicle,
 )
 
@@ -58,6 +61,29 @@ class RouteAdmin(admin.ModelAdmin):
     raw_id_fields = ("driver", "vehicle")
 
 
+@admin.register(OptimizationJob)
+class OptimizationJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "route", "mode", "status", "progress", "tenant", "created_at")
+    list_filter = ("tenant", "status", "mode")
+    readonly_fields = ("created_at", "started_at", "finished_at")
+    raw_id_fields = ("route", "requested_by")
+
+
+@admin.register(TravelProfile)
+class TravelProfileAdmin(admin.ModelAdmin):
+    list_display = ("tenant", "legs", "visits", "routes", "built_at")
+    exclude = ("tables",)
+    readonly_fields = ("zones", "legs", "visits", "routes", "built_at")
+
+
+@admin.register(Breadcrumb)
+class BreadcrumbAdmin(admin.ModelAdmin):
+    list_display = ("driver", "day", "point_count", "ping_count", "started_at", "ended_at", "closed_at")
+    list_filter = ("tenant", "day")
+    exclude = ("points",)
+    raw_id_fields = ("driver",)
+
+
 @admin.register(POD)
 class PODAdmin(admin.ModelAdmin):
     list_display = ("order", "receiver_name", "delivered_at")
@@ -5,3 +5,16 @@ class LogisticsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.logistics"
     label = "logistics"
+
+    def ready(self):
+        from django.conf import settings
+        from django.core.cache import cache
+
+        from apps.logistics.optimization import providers
+
+        providers.configure_cache(
+            cache,
+            precision=settings.ROUTE_TRAVEL_CACHE_PRECISION,
+            maxsize=settings.ROUTE_TRAVEL_CACHE_SIZE,
+            timeout=settings.ROUTE_TRAVEL_CACHE_TTL_S,
+        )
@@ -2,9 +2,11 @@
 import json
 import logging
 
+from asgiref.sync import sync_to_async
 from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
 
+from apps.logistics import services
 from apps.logistics.models import Order, Route
 
 logger = logging.getLogger(__name__)
@@ -73,8 +75,8 @@ class DriverRouteConsumer(AsyncJsonWebsocketConsumer):
             return
 
         self.route_id = self.scope["url_route"]["kwargs"]["route_id"]
-        route_ok = await self._verify_route_access(user, self.route_id)
-        if not route_ok:
+        self.driver_id = await self._verify_route_access(user, self.route_id)
+        if not self.driver_id:
             await self.close(code=4003)
             return
 
@@ -100,12 +102,13 @@ class DriverRouteConsumer(AsyncJsonWebsocketConsumer):
 
     async def _handle_location_update(self, content):
         user = _user_from_scope(self.scope)
-        lat = content.get("lat")
-        lng = content.get("lng")
-        if lat is None or lng is None:
+        try:
+            lat, lng = float(content["lat"]), float(content["lng"])
+        except (KeyError, TypeError, ValueError):
             await self.send_json({"type": "error", "detail": "lat and lng required"})
             return
-        await self._save_driver_location(user, lat, lng)
+        # Buffered in the cache; logistics.flush_driver_locations writes it to the database
+        await sync_to_async(services.driver_record_location)(driver_id=self.driver_id, lat=lat, lng=lng)
 
         # Broadcast to ops
         tenant_group = await self._get_tenant_group(user)
@@ -126,19 +129,10 @@ class DriverRouteConsumer(AsyncJsonWebsocketConsumer):
     # Database helpers
     @database_sync_to_async
     def _verify_route_access(self, user, route_id):
+        """The route's driver id if ``user`` drives this open route, else ``None``."""
         return Route.objects.filter(
             pk=route_id, driver__user=user, status__in=["PLANNED", "IN_PROGRESS"]
-        ).exists()
-
-    @database_sync_to_async
-    def _save_driver_location(self, user, lat, lng):
-        from apps.logistics.models import Driver
-        from apps.logistics import services
-        try:
-            driver = Driver.objects.get(user=user)
-            services.driver_update_location(driver=driver, lat=lat, lng=lng)
-        except Driver.DoesNotExist:
-            logger.warning("DriverRouteConsumer: no driver for user %s", user.pk)
+        ).values_list("driver_id", flat=True).first()
 
     @database_sync_to_async
     def _get_tenant_group(self, user):
@@ -182,6 +176,13 @@ class TrackingConsumer(AsyncJsonWebsocketConsumer):
             "updated_at": event.get("updated_at"),
         })
 
+    async def eta_updated(self, event):
+        await self.send_json({
+            "type": "eta.updated",
+            "stops": event.get("stops"),
+            "updated_at": event.get("updated_at"),
+        })
+
     @database_sync_to_async
     def _get_order_id(self, token):
         try:
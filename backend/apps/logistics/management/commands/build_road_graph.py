@@ -0,0 +1,59 @@
+"""Django management command: build_road_graph."""
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.logistics.optimization.roads import RoadGraph
+
+# Used for edges whose CSV row has neither time_s nor speed_kmh
+DEFAULT_SPEED_KMH = 30.0
+TRUE_VALUES = {"1", "true", "yes"}
+
+
+class Command(BaseCommand):
+    help = (
+        "Convert node/edge CSVs extracted from OpenStreetMap into the .npz road graph "
+        "read by ROUTE_DISTANCE_PROVIDER=road_graph:<path>."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--nodes", required=True, help="CSV with columns id, lat, lng")
+        parser.add_argument(
+            "--edges",
+            required=True,
+            help="CSV with columns source, target, length_m and optionally time_s, speed_kmh, oneway",
+        )
+        parser.add_argument("--out", required=True, help="Output .npz path")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["nodes"], newline="") as fh:
+                rows = list(csv.DictReader(fh))
+            ids = {row["id"]: idx for idx, row in enumerate(rows)}
+            nodes = [(float(row["lat"]), float(row["lng"])) for row in rows]
+
+            edges = []
+            with open(options["edges"], newline="") as fh:
+                for line, row in enumerate(csv.DictReader(fh), start=2):
+                    try:
+                        u, v = ids[row["source"]], ids[row["target"]]
+                    except KeyError as e:
+                        raise CommandError(f"{options['edges']}:{line}: unknown node {e}.")
+                    length_m = float(row["length_m"])
+                    if row.get("time_s"):
+                        time_s = float(row["time_s"])
+                    else:
+                        time_s = length_m / 1000 / float(row.get("speed_kmh") or DEFAULT_SPEED_KMH) * 3600
+                    edges.append((u, v, length_m, time_s))
+                    if (row.get("oneway") or "").lower() not in TRUE_VALUES:
+                        edges.append((v, u, length_m, time_s))
+        except (OSError, KeyError, ValueError) as e:
+            raise CommandError(f"Could not read road network: {e}")
+
+        graph = RoadGraph.from_edges(nodes, edges)
+        graph.save(options["out"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {options['out']}: {len(graph)} nodes, {graph.edge_count} directed edges"
+            )
+        )
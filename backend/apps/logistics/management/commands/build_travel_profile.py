@@ -0,0 +1,41 @@
+"""Django management command: build_travel_profile."""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.logistics.services import travel_profile_build
+from apps.users.models import Tenant
+
+
+class Command(BaseCommand):
+    help = (
+        "Learn a tenant's zone × hour-of-week speeds and service times from its completed "
+        "routes. The logistics.build_travel_profiles task does this for every tenant."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tenant-slug", required=True, help="Slug of the tenant")
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.ROUTE_SPEED_PROFILE_DAYS,
+            help="Only mine routes completed in the last N days (0 for all)",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            tenant = Tenant.objects.get(slug=options["tenant_slug"])
+        except Tenant.DoesNotExist:
+            raise CommandError(f"Tenant '{options['tenant_slug']}' not found.")
+        since = timezone.now() - timedelta(days=options["days"]) if options["days"] else None
+
+        profile = travel_profile_build(tenant=tenant, since=since)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Built travel profile for {tenant.slug}: {profile.routes} routes, "
+                f"{profile.legs} legs, {profile.visits} timed stops over {len(profile.zones)} zones "
+                f"({len(profile.tables)} bytes)"
+            )
+        )
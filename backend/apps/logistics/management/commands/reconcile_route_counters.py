@@ -0,0 +1,29 @@
+"""Django management command: reconcile_route_counters."""
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.logistics.services import route_counters_reconcile
+from apps.users.models import Tenant
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount the orders on each route by status and repair the per-status "
+        "counters that drifted from them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tenant-slug", help="Slug of the tenant; all tenants when omitted")
+
+    def handle(self, *args, **options):
+        tenant = None
+        if options["tenant_slug"]:
+            try:
+                tenant = Tenant.objects.get(slug=options["tenant_slug"])
+            except Tenant.DoesNotExist:
+                raise CommandError(f"Tenant '{options['tenant_slug']}' not found.")
+
+        repaired = route_counters_reconcile(tenant=tenant)
+        for route in repaired:
+            counts = ", ".join(f"{status}={n}" for status, n in route.order_counts.items() if n)
+            self.stdout.write(f"route {route.id}: {counts or 'no orders'}")
+        self.stdout.write(self.style.SUCCESS(f"Repaired order counters of {len(repaired)} routes"))
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.2 on 2026-10-17 02:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("logistics", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="route",
+            name="optimization_summary",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
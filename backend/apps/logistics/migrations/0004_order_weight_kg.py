@@ -0,0 +1,18 @@
+# Generated by Django 5.0.2 on 2026-10-17 02:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("logistics", "0003_route_optimization_summary"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="order",
+            name="weight_kg",
+            field=models.FloatField(default=0),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.0.2 on 2026-10-17 03:00
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("logistics", "0005_optimizationjob"),
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TravelProfile",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("zones", models.JSONField(blank=True, default=list)),
+                ("tables", models.BinaryField()),
+                ("legs", models.PositiveIntegerField(default=0)),
+                ("visits", models.PositiveIntegerField(default=0)),
+                ("routes", models.PositiveIntegerField(default=0)),
+                ("built_at", models.DateTimeField(auto_now=True)),
+                (
+                    "tenant",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="travel_profile",
+                        to="users.tenant",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "travel_profiles",
+            },
+        ),
+    ]
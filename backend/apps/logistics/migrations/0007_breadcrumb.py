@@ -0,0 +1,61 @@
+# Generated by Django 5.0.2 on 2026-10-17 03:21
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("logistics", "0006_travelprofile"),
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Breadcrumb",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("points", models.BinaryField(default=bytes)),
+                ("point_count", models.PositiveIntegerField(default=0)),
+                ("ping_count", models.PositiveIntegerField(default=0)),
+                ("last_lat", models.IntegerField(default=0)),
+                ("last_lng", models.IntegerField(default=0)),
+                ("last_t", models.BigIntegerField(default=0)),
+                ("started_at", models.DateTimeField()),
+                ("ended_at", models.DateTimeField()),
+                ("closed_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "driver",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="breadcrumbs",
+                        to="logistics.driver",
+                    ),
+                ),
+                (
+                    "tenant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="breadcrumbs",
+                        to="users.tenant",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "breadcrumbs",
+                "ordering": ["day"],
+                "unique_together": {("driver", "day")},
+            },
+        ),
+    ]
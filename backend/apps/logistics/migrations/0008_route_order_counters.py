@@ -0,0 +1,68 @@
+# Generated by Django 5.0.2 on 2026-10-17 03:24
+
+from django.db import migrations, models
+from django.db.models import Count
+
+COUNTERS = {
+    "ASSIGNED": "assigned_count",
+    "PICKED_UP": "picked_up_count",
+    "IN_TRANSIT": "in_transit_count",
+    "DELIVERED": "delivered_count",
+    "FAILED": "failed_count",
+    "CANCELLED": "cancelled_count",
+}
+
+
+def backfill_order_counters(apps, schema_editor):
+    Order = apps.get_model("logistics", "Order")
+    Route = apps.get_model("logistics", "Route")
+    routes = {}
+    for row in (
+        Order.objects.filter(assigned_route__isnull=False, status__in=COUNTERS)
+        .values("assigned_route_id", "status")
+        .annotate(n=Count("id"))
+    ):
+        route = routes.setdefault(row["assigned_route_id"], Route(pk=row["assigned_route_id"]))
+        setattr(route, COUNTERS[row["status"]], row["n"])
+    Route.objects.bulk_update(list(routes.values()), list(COUNTERS.values()), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("logistics", "0007_breadcrumb"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="route",
+            name="assigned_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="route",
+            name="cancelled_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="route",
+            name="delivered_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="route",
+            name="failed_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="route",
+            name="in_transit_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="route",
+            name="picked_up_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_order_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.0.2 on 2026-10-17 03:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("logistics", "0008_route_order_counters"),
+        ("users", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="driver",
+            index=models.Index(
+                fields=["tenant", "is_active", "name", "id"],
+                name="drivers_tenant_name_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="exception",
+            index=models.Index(
+                fields=["tenant", "created_at", "id"],
+                name="exceptions_tenant_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["tenant", "created_at", "id"], name="orders_tenant_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="route",
+            index=models.Index(
+                fields=["tenant", "route_date", "id"], name="routes_tenant_date_idx"
+            ),
+        ),
+    ]
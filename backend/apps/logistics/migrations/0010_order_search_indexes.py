@@ -0,0 +1,64 @@
+# Generated by Django 5.0.2 on 2026-10-17 03:29
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("logistics", "0009_list_keyset_indexes"),
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["tenant", "status", "created_at", "id"],
+                name="orders_tenant_status_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["tenant", "drop_window_start"], name="orders_tenant_window_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["tenant", "assigned_route"], name="orders_tenant_route_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["tenant", "reference_code"],
+                name="orders_tenant_ref_prefix_idx",
+                opclasses=["uuid_ops", "varchar_pattern_ops"],
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["tenant", "customer_phone"],
+                name="orders_tenant_phone_prefix_idx",
+                opclasses=["uuid_ops", "varchar_pattern_ops"],
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="stop",
+            index=models.Index(
+                django.db.models.functions.text.Upper("city"),
+                models.F("order"),
+                name="stops_city_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="stop",
+            index=models.Index(
+                fields=["postal_code", "order"], name="stops_postal_code_idx"
+            ),
+        ),
+    ]
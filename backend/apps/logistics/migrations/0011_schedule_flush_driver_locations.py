@@ -0,0 +1,40 @@
+# Generated by Django 5.0.2 on 2026-10-17 09:10
+
+from django.db import migrations
+from django.utils import timezone
+
+TASK_NAME = "Flush driver locations"
+# Driver apps ping every ~5 s; positions, geofencing and live ETAs lag by at most this
+FLUSH_EVERY_S = 5
+
+
+def schedule_flush(apps, schema_editor):
+    IntervalSchedule = apps.get_model("django_celery_beat", "IntervalSchedule")
+    PeriodicTask = apps.get_model("django_celery_beat", "PeriodicTask")
+    PeriodicTasks = apps.get_model("django_celery_beat", "PeriodicTasks")
+    interval, _ = IntervalSchedule.objects.get_or_create(every=FLUSH_EVERY_S, period="seconds")
+    PeriodicTask.objects.update_or_create(
+        name=TASK_NAME,
+        defaults={"task": "logistics.flush_driver_locations", "interval": interval, "enabled": True},
+    )
+    # Historical models send no signals; bump the marker a running beat polls for changes
+    PeriodicTasks.objects.update_or_create(ident=1, defaults={"last_update": timezone.now()})
+
+
+def unschedule_flush(apps, schema_editor):
+    PeriodicTask = apps.get_model("django_celery_beat", "PeriodicTask")
+    PeriodicTasks = apps.get_model("django_celery_beat", "PeriodicTasks")
+    PeriodicTask.objects.filter(name=TASK_NAME).delete()
+    PeriodicTasks.objects.update_or_create(ident=1, defaults={"last_update": timezone.now()})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_celery_beat", "0018_improve_crontab_helptext"),
+        ("logistics", "0010_order_search_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(schedule_flush, unschedule_flush),
+    ]
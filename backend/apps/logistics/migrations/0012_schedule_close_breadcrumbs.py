@@ -0,0 +1,42 @@
+# Generated by Django 5.0.2 on 2026-10-17 11:40
+
+from django.conf import settings
+from django.db import migrations
+from django.utils import timezone
+
+TASK_NAME = "Close breadcrumbs"
+
+
+def schedule_close(apps, schema_editor):
+    CrontabSchedule = apps.get_model("django_celery_beat", "CrontabSchedule")
+    PeriodicTask = apps.get_model("django_celery_beat", "PeriodicTask")
+    PeriodicTasks = apps.get_model("django_celery_beat", "PeriodicTasks")
+    # Just after midnight, when yesterday's segments stop growing
+    crontab, _ = CrontabSchedule.objects.get_or_create(
+        minute="15", hour="0", day_of_week="*", day_of_month="*", month_of_year="*",
+        timezone=settings.TIME_ZONE,
+    )
+    PeriodicTask.objects.update_or_create(
+        name=TASK_NAME,
+        defaults={"task": "logistics.close_breadcrumbs", "crontab": crontab, "enabled": True},
+    )
+    PeriodicTasks.objects.update_or_create(ident=1, defaults={"last_update": timezone.now()})
+
+
+def unschedule_close(apps, schema_editor):
+    PeriodicTask = apps.get_model("django_celery_beat", "PeriodicTask")
+    PeriodicTasks = apps.get_model("django_celery_beat", "PeriodicTasks")
+    PeriodicTask.objects.filter(name=TASK_NAME).delete()
+    PeriodicTasks.objects.update_or_create(ident=1, defaults={"last_update": timezone.now()})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_celery_beat", "0018_improve_crontab_helptext"),
+        ("logistics", "0011_schedule_flush_driver_locations"),
+    ]
+
+    operations = [
+        migrations.RunPython(schedule_close, unschedule_close),
+    ]
@@ -2,6 +2,7 @@
 import uuid
 from django.conf import settings
 from django.db import models
+from django.db.models.functions import Upper
 
 from apps.users.models import Tenant
 
@@ -29,6 +30,10 @@ class Driver(models.Model):
     class Meta:
         db_table = "drivers"
         ordering = ["name"]
+        indexes = [
+            # Keyset pagination of the ops driver list
+            models.Index(fields=["tenant", "is_active", "name", "id"], name="drivers_tenant_name_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.name} ({self.tenant.slug})"
@@ -100,6 +105,7 @@ class Order(models.Model):
     pickup_window_end = models.DateTimeField(null=True, blank=True)
     drop_window_start = models.DateTimeField(null=True, blank=True)
     drop_window_end = models.DateTimeField(null=True, blank=True)
+    weight_kg = models.FloatField(default=0)
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -108,6 +114,25 @@ class Order(models.Model):
         db_table = "orders"
         unique_together = [["tenant", "reference_code"]]
         ordering = ["-created_at"]
+        indexes = [
+            # Keyset pagination of the ops order list
+            models.Index(fields=["tenant", "created_at", "id"], name="orders_tenant_created_idx"),
+            # Ops order search filters (selectors.order_list); the pattern ops
+            # let prefix LIKEs use the index whatever the database collation
+            models.Index(fields=["tenant", "status", "created_at", "id"], name="orders_tenant_status_idx"),
+            models.Index(fields=["tenant", "drop_window_start"], name="orders_tenant_window_idx"),
+            models.Index(fields=["tenant", "assigned_route"], name="orders_tenant_route_idx"),
+            models.Index(
+                fields=["tenant", "reference_code"],
+                opclasses=["uuid_ops", "varchar_pattern_ops"],
+                name="orders_tenant_ref_prefix_idx",
+            ),
+            models.Index(
+                fields=["tenant", "customer_phone"],
+                opclasses=["uuid_ops", "varchar_pattern_ops"],
+                name="orders_tenant_phone_prefix_idx",
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"{self.reference_code} [{self.status}]"
@@ -147,6 +172,11 @@ class Stop(models.Model):
     class Meta:
         db_table = "stops"
         ordering = ["sequence_index"]
+        indexes = [
+            # Ops order search by stop city (case-insensitive) and postal code
+            models.Index(Upper("city"), "order", name="stops_city_idx"),
+            models.Index(fields=["postal_code", "order"], name="stops_postal_code_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.type} #{self.sequence_index} for {self.order.reference_code}"
@@ -170,16 +200,144 @@ class Route(models.Model):
     start_time = models.DateTimeField(null=True, blank=True)
     end_time = models.DateTimeField(null=True, blank=True)
     notes = models.TextField(blank=True)
+    # {"mode", "distance_before_km", "distance_after_km"} from the last optimization run
+    optimization_summary = models.JSONField(default=dict, blank=True)
+    # Orders on the route per status, moved by services alongside every order
+    # transition; manage.py reconcile_route_counters repairs drift
+    assigned_count = models.IntegerField(default=0)
+    picked_up_count = models.IntegerField(default=0)
+    in_transit_count = models.IntegerField(default=0)
+    delivered_count = models.IntegerField(default=0)
+    failed_count = models.IntegerField(default=0)
+    cancelled_count = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Counter field per status an order on the route can have
+    ORDER_COUNTERS = {
+        Order.Status.ASSIGNED: "assigned_count",
+        Order.Status.PICKED_UP: "picked_up_count",
+        Order.Status.IN_TRANSIT: "in_transit_count",
+        Order.Status.DELIVERED: "delivered_count",
+        Order.Status.FAILED: "failed_count",
+        Order.Status.CANCELLED: "cancelled_count",
+    }
+    OPEN_ORDER_COUNTERS = ("assigned_count", "picked_up_count", "in_transit_count")
+
     class Meta:
         db_table = "routes"
         ordering = ["-route_date"]
+        indexes = [
+            # Keyset pagination of the ops route list
+            models.Index(fields=["tenant", "route_date", "id"], name="routes_tenant_date_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"Route {self.route_date} — {self.driver.name}"
 
+    @property
+    def order_counts(self) -> dict:
+        return {status: getattr(self, field) for status, field in self.ORDER_COUNTERS.items()}
+
+    @property
+    def order_count(self) -> int:
+        return sum(getattr(self, field) for field in self.ORDER_COUNTERS.values())
+
+
+class OptimizationJob(models.Model):
+    """Background re-sequencing of a route within a wall-clock budget."""
+
+    class Status(models.TextChoices):
+        QUEUED = "QUEUED", "Queued"
+        RUNNING = "RUNNING", "Running"
+        SUCCEEDED = "SUCCEEDED", "Succeeded"
+        FAILED = "FAILED", "Failed"
+
+    ACTIVE_STATUSES = {Status.QUEUED, Status.RUNNING}
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name="optimization_jobs")
+    route = models.ForeignKey(Route, on_delete=models.CASCADE, related_name="optimization_jobs")
+    mode = models.CharField(max_length=20)
+    time_budget_s = models.FloatField()
+    service_minutes = models.FloatField(null=True, blank=True)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.QUEUED)
+    progress = models.FloatField(default=0)
+    iterations = models.PositiveIntegerField(default=0)
+    # Tour length in km, or the "windows" objective, of the best sequence so far
+    best_cost = models.FloatField(null=True, blank=True)
+    result = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True)
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "optimization_jobs"
+        ordering = ["-created_at"]
+
+    def __str__(self) -> str:
+        return f"OptimizationJob[{self.status}] {self.mode} for route {self.route_id}"
+
+
+class TravelProfile(models.Model):
+    """
+    Speed and service-time tables learned from a tenant's completed routes
+    (see ``optimization.speed_profile``). ``tables`` is the compressed
+    ``SpeedProfile.dumps()`` output; ``zones`` lists the geohash cells it covers.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tenant = models.OneToOneField(Tenant, on_delete=models.CASCADE, related_name="travel_profile")
+    zones = models.JSONField(default=list, blank=True)
+    tables = models.BinaryField()
+    legs = models.PositiveIntegerField(default=0)
+    visits = models.PositiveIntegerField(default=0)
+    routes = models.PositiveIntegerField(default=0)
+    built_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "travel_profiles"
+
+    def __str__(self) -> str:
+        return f"TravelProfile for {self.tenant.slug}: {len(self.zones)} zones, {self.legs} legs"
+
+
+class Breadcrumb(models.Model):
+    """
+    One driver's GPS trail for one local day, encoded with
+    ``optimization.breadcrumbs``. Flushed pings are appended to ``points``
+    as deltas from ``last_lat/last_lng/last_t``, so the blob is never read to
+    grow it. Once the day is over the segment is simplified and ``closed_at``
+    set; ``ping_count`` keeps the number of pings received.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name="breadcrumbs")
+    driver = models.ForeignKey(Driver, on_delete=models.CASCADE, related_name="breadcrumbs")
+    day = models.DateField()
+    points = models.BinaryField(default=bytes)
+    point_count = models.PositiveIntegerField(default=0)
+    ping_count = models.PositiveIntegerField(default=0)
+    # Last stored point: 1e-5 degrees and epoch seconds
+    last_lat = models.IntegerField(default=0)
+    last_lng = models.IntegerField(default=0)
+    last_t = models.BigIntegerField(default=0)
+    started_at = models.DateTimeField()
+    ended_at = models.DateTimeField()
+    closed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "breadcrumbs"
+        unique_together = [["driver", "day"]]
+        ordering = ["day"]
+
+    def __str__(self) -> str:
+        return f"Breadcrumb {self.day} — {self.driver_id}: {self.point_count} points"
+
 
 class POD(models.Model):
     """Proof of Delivery."""
@@ -265,6 +423,10 @@ class Exception(models.Model):
     class Meta:
         db_table = "exceptions"
         ordering = ["-created_at"]
+        indexes = [
+            # Keyset pagination of the ops exception list
+            models.Index(fields=["tenant", "created_at", "id"], name="exceptions_tenant_created_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.type} on {self.order.reference_code}"
@@ -0,0 +1 @@
+"""Route optimization — distance matrices and stop sequencing heuristics."""
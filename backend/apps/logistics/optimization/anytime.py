@@ -0,0 +1,75 @@
+"""
+Anytime improvement for background optimization jobs.
+
+Iterated local search: kick the best tour with a few random relocations, run the
+mode's local search on the result and keep it if it is cheaper, until a
+wall-clock deadline passes. The best tour so far is always at hand, so a job can
+stop whenever its budget runs out. Kicks stay inside ``Precedence`` bounds, so
+every candidate is feasible.
+"""
+import random
+import time
+from typing import Callable, Optional
+
+from apps.logistics.optimization.precedence import Precedence, tour_positions
+
+EPSILON = 1e-9
+KICK_MOVES = 3
+
+# (fraction of the budget used, iterations, best cost so far)
+ProgressCallback = Callable[[float, int, float], None]
+
+
+def perturb(
+    tour: list[int],
+    precedence: Optional[Precedence],
+    rng: random.Random,
+    moves: int = KICK_MOVES,
+) -> list[int]:
+    """Move ``moves`` random stops (never ``tour[0]``) to random feasible positions."""
+    tour = list(tour)
+    n = len(tour)
+    for _ in range(moves):
+        i = rng.randrange(1, n)
+        if precedence:
+            lo, hi = precedence.relocation_bounds(tour, tour_positions(tour, n), i, 1)
+        else:
+            lo, hi = 0, n - 1
+        targets = [j for j in range(lo, hi + 1) if j not in (i - 1, i)]
+        if targets:
+            # Same convention as the Or-opt stage: the stop goes after tour[j].
+            j = rng.choice(targets)
+            stop = tour.pop(i)
+            tour.insert(j + 1 if j < i else j, stop)
+    return tour
+
+
+def search(
+    tour: list[int],
+    *,
+    cost: Callable[[list[int]], float],
+    improve: Callable[[list[int]], list[int]],
+    deadline: float,
+    precedence: Optional[Precedence] = None,
+    on_progress: Optional[ProgressCallback] = None,
+    seed: int = 0,
+) -> tuple[list[int], int]:
+    """
+    Improve a locally optimal ``tour`` until ``time.monotonic()`` reaches
+    ``deadline``; returns the best tour and the number of kicks tried.
+    """
+    started = time.monotonic()
+    budget = max(deadline - started, EPSILON)
+    rng = random.Random(seed)
+    best, best_cost = list(tour), cost(tour)
+    iterations = 0
+    # Fewer than two movable stops leaves nothing to kick.
+    while len(best) > 2 and time.monotonic() < deadline:
+        candidate = improve(perturb(best, precedence, rng))
+        candidate_cost = cost(candidate)
+        iterations += 1
+        if candidate_cost < best_cost - EPSILON:
+            best, best_cost = candidate, candidate_cost
+        if on_progress:
+            on_progress(min(1.0, (time.monotonic() - started) / budget), iterations, best_cost)
+    return best, iterations
@@ -0,0 +1,87 @@
+"""
+Solve many independent routes, optionally across a process pool.
+
+A ``RouteProblem`` carries only plain arrays — coordinates, the precedence
+lists and window arrays — so a route costs a few kilobytes to send to a worker,
+and the distance matrix is built on the worker's side by the provider named in
+``distance`` (loaded once per worker). Workers never touch the
+database; callers turn the returned tours back into stop sequences.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+from apps.logistics.optimization import anytime, providers, sequencing, time_windows
+from apps.logistics.optimization.precedence import Precedence
+
+# Chunks per worker handed out by pool.map; more chunks balance uneven routes better
+CHUNKS_PER_WORKER = 4
+
+
+@dataclass
+class RouteProblem:
+    key: str
+    mode: str
+    points: list[tuple[float, float]]
+    precedence: Precedence
+    windows: Optional[time_windows.TimeWindows] = None
+    speed_kmh: float = 0.0
+    lateness_weight: float = 0.0
+    distance: str = providers.DEFAULT_PROVIDER
+
+
+@dataclass
+class RouteSolution:
+    key: str
+    constructed: list[int]
+    tour: list[int]
+    distance_before_km: float
+    distance_after_km: float
+    arrivals: Optional[list[float]] = None  # per tour position, "windows" mode only
+    lateness_s: float = 0.0
+    violations: int = 0
+
+
+def solve_problem(
+    problem: RouteProblem,
+    deadline: Optional[float] = None,
+    on_progress: Optional[anytime.ProgressCallback] = None,
+) -> RouteSolution:
+    matrix = providers.get(problem.distance).matrix(problem.points)
+    if problem.mode == time_windows.MODE:
+        initial, result = time_windows.solve(
+            matrix,
+            problem.windows,
+            problem.precedence,
+            speed_kmh=problem.speed_kmh,
+            lateness_weight=problem.lateness_weight,
+            deadline=deadline,
+            on_progress=on_progress,
+        )
+        constructed, tour = initial.tour, result.tour
+        extra = {"arrivals": result.arrivals, "lateness_s": result.lateness_s, "violations": result.violations}
+    else:
+        constructed, tour = sequencing.solve(
+            matrix, problem.mode, problem.precedence, deadline=deadline, on_progress=on_progress
+        )
+        extra = {}
+    return RouteSolution(
+        key=problem.key,
+        constructed=constructed,
+        tour=tour,
+        distance_before_km=matrix.tour_length(constructed),
+        distance_after_km=matrix.tour_length(tour),
+        **extra,
+    )
+
+
+def solve_many(problems: Sequence[RouteProblem], max_workers: Optional[int] = None) -> list[RouteSolution]:
+    """Solve ``problems`` in order; ``max_workers=1`` (or a single problem) stays in-process."""
+    workers = max_workers or os.cpu_count() or 1
+    if workers == 1 or len(problems) < 2:
+        return [solve_problem(problem) for problem in problems]
+    workers = min(workers, len(problems))
+    chunksize = max(1, len(problems) // (workers * CHUNKS_PER_WORKER))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(solve_problem, problems, chunksize=chunksize))
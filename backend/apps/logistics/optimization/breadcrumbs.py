@@ -0,0 +1,149 @@
+"""
+Compact storage for driver GPS trails.
+
+A trail is a list of ``Point``s — latitude and longitude in 1e-5 degrees
+(about 1.1 m) and epoch seconds, all ints. ``encode`` stores each point as the
+zigzag varint deltas from the one before it, so a ping a few seconds and metres
+from the last costs 3–5 bytes instead of a row. Encoded trails can be appended
+to without decoding them: pass the last stored point as ``previous`` and
+concatenate the bytes.
+
+``simplify`` is Douglas-Peucker over the synchronized Euclidean distance, i.e.
+a point's distance from where the driver would have been at that time moving
+steadily along the simplified segment. Unlike the purely spatial version it
+keeps the ends of stops and slow stretches, which matter when replaying a
+route. ``polyline`` renders a trail in Google's encoded polyline format for
+map clients.
+"""
+import math
+from typing import NamedTuple, Sequence
+
+from apps.logistics.optimization.distance import EARTH_RADIUS_KM, np
+
+PRECISION = 100_000
+_METRES_PER_UNIT = EARTH_RADIUS_KM * 1000 * math.pi / 180 / PRECISION
+
+
+class Point(NamedTuple):
+    lat: int
+    lng: int
+    t: int
+
+
+ORIGIN = Point(0, 0, 0)
+
+
+def quantize(lat: float, lng: float, t: float) -> Point:
+    return Point(round(lat * PRECISION), round(lng * PRECISION), int(t))
+
+
+def encode(points: Sequence[Point], previous: Point = ORIGIN) -> bytes:
+    """Points as varint deltas from ``previous``, the last point already stored."""
+    out = bytearray()
+    last = previous
+    for point in points:
+        for delta in (point[0] - last[0], point[1] - last[1], point[2] - last[2]):
+            value = (delta << 1) ^ (delta >> 63)  # zigzag: small magnitudes → small values
+            while value >= 0x80:
+                out.append((value & 0x7F) | 0x80)
+                value >>= 7
+            out.append(value)
+        last = point
+    return bytes(out)
+
+
+def decode(data: bytes) -> list[Point]:
+    """Inverse of ``encode`` for a whole stored trail."""
+    values = []
+    value = shift = 0
+    for byte in bytes(data):
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        values.append((value >> 1) ^ -(value & 1))
+        value = shift = 0
+    if shift or len(values) % 3:
+        raise ValueError("Truncated breadcrumb data.")
+
+    points = []
+    lat = lng = t = 0
+    for i in range(0, len(values), 3):
+        lat += values[i]
+        lng += values[i + 1]
+        t += values[i + 2]
+        points.append(Point(lat, lng, t))
+    return points
+
+
+def simplify(points: Sequence[Point], tolerance_m: float) -> list[Point]:
+    """
+    Douglas-Peucker with the synchronized Euclidean distance: drop points that
+    are within ``tolerance_m`` of where the kept points place the driver at
+    that time. The first and last points are always kept.
+    """
+    n = len(points)
+    if n < 3:
+        return list(points)
+    # Local equirectangular projection in metres, accurate over a day's driving
+    scale = math.cos(math.radians(points[0].lat / PRECISION))
+    xs = [p.lng * _METRES_PER_UNIT * scale for p in points]
+    ys = [p.lat * _METRES_PER_UNIT for p in points]
+    ts = [p.t for p in points]
+    farthest = _farthest_numpy if np is not None else _farthest
+    if np is not None:
+        xs, ys, ts = np.array(xs), np.array(ys), np.array(ts, dtype=float)
+
+    keep = [False] * n
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        index, distance = farthest(xs, ys, ts, first, last)
+        if distance > tolerance_m:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    return [point for point, kept in zip(points, keep) if kept]
+
+
+def _farthest(xs, ys, ts, first: int, last: int) -> tuple[int, float]:
+    """Index strictly between ``first`` and ``last`` farthest from its synchronized position."""
+    duration = ts[last] - ts[first]
+    dx, dy = xs[last] - xs[first], ys[last] - ys[first]
+    best, best_distance = first + 1, -1.0
+    for k in range(first + 1, last):
+        fraction = (ts[k] - ts[first]) / duration if duration else 0.0
+        distance = math.hypot(xs[k] - xs[first] - fraction * dx, ys[k] - ys[first] - fraction * dy)
+        if distance > best_distance:
+            best, best_distance = k, distance
+    return best, best_distance
+
+
+def _farthest_numpy(xs, ys, ts, first: int, last: int) -> tuple[int, float]:
+    duration = ts[last] - ts[first]
+    inner = slice(first + 1, last)
+    fraction = (ts[inner] - ts[first]) / duration if duration else np.zeros(last - first - 1)
+    distances = np.hypot(
+        xs[inner] - xs[first] - fraction * (xs[last] - xs[first]),
+        ys[inner] - ys[first] - fraction * (ys[last] - ys[first]),
+    )
+    k = int(distances.argmax())
+    return first + 1 + k, float(distances[k])
+
+
+def polyline(points: Sequence[Point]) -> str:
+    """Encoded polyline (precision 5) of the points' positions."""
+    out = []
+    lat = lng = 0
+    for point in points:
+        for delta in (point.lat - lat, point.lng - lng):
+            value = ~(delta << 1) if delta < 0 else delta << 1
+            while value >= 0x20:
+                out.append(chr((0x20 | (value & 0x1F)) + 63))
+                value >>= 5
+            out.append(chr(value + 63))
+        lat, lng = point.lat, point.lng
+    return "".join(out)
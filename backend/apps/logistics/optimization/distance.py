@@ -0,0 +1,117 @@
+"""
+Pairwise distance matrices for route optimization.
+
+A ``DistanceMatrix`` is built once per stop set (one batched NumPy computation)
+and then shared by the sequencing heuristics and ETA code, so nothing downstream
+has to call the scalar ``haversine`` inside a loop.
+"""
+import math
+from typing import Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover — NumPy is optional, scalar fallback below
+    np = None
+
+EARTH_RADIUS_KM = 6371
+
+
+def haversine(lat1, lng1, lat2, lng2) -> float:
+    """Distance in km between two coordinates."""
+    dlat = math.radians(lat2 - lat1)
+    dlng = math.radians(lng2 - lng1)
+    a = math.sin(dlat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(
+        math.radians(lat2)
+    ) * math.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+class DistanceMatrix:
+    """
+    Symmetric n×n matrix of distances in km between a fixed list of points.
+
+    Points are addressed by their index in the list the matrix was built from.
+    ``array`` holds the NumPy form (``None`` without NumPy); ``rows`` is the same
+    data as nested lists, which is what the pure-Python heuristics index into.
+    """
+
+    def __init__(self, rows: list[list[float]] | None = None, array=None):
+        self._rows = rows
+        self.array = array
+
+    @classmethod
+    def from_points(cls, points: Sequence[tuple[float, float]]) -> "DistanceMatrix":
+        """Build the matrix for ``(lat, lng)`` pairs."""
+        if np is not None:
+            return cls(array=_haversine_matrix_numpy(points))
+        return cls(rows=_haversine_matrix_scalar(points))
+
+    @classmethod
+    def from_stops(cls, stops) -> "DistanceMatrix":
+        """Build the matrix for objects exposing ``lat``/``lng`` (e.g. ``Stop``)."""
+        return cls.from_points([(s.lat, s.lng) for s in stops])
+
+    @property
+    def rows(self) -> list[list[float]]:
+        if self._rows is None:
+            self._rows = self.array.tolist()
+        return self._rows
+
+    def __len__(self) -> int:
+        if self.array is not None:
+            return self.array.shape[0]
+        return len(self._rows)
+
+    def distance(self, i: int, j: int) -> float:
+        return self.rows[i][j]
+
+    def tour_length(self, tour: Sequence[int]) -> float:
+        """Total length of an open path visiting ``tour`` in order."""
+        rows = self.rows
+        return sum(rows[a][b] for a, b in zip(tour, tour[1:]))
+
+    def neighbors(self, k: int) -> list[list[int]]:
+        """For every point, the indices of its ``k`` closest other points (nearest first)."""
+        n = len(self)
+        k = min(k, n - 1)
+        if k <= 0:
+            return [[] for _ in range(n)]
+        if self.array is not None:
+            masked = self.array + np.diag(np.full(n, np.inf))
+            idx = np.argpartition(masked, k - 1, axis=1)[:, :k]
+            order = np.take_along_axis(masked, idx, axis=1).argsort(axis=1)
+            return np.take_along_axis(idx, order, axis=1).tolist()
+        rows = self.rows
+        return [
+            sorted((j for j in range(n) if j != i), key=rows[i].__getitem__)[:k]
+            for i in range(n)
+        ]
+
+    def nearest(self, i: int, candidates: Sequence[int]) -> int:
+        """Index in ``candidates`` closest to point ``i`` (first one wins ties)."""
+        if self.array is not None:
+            return candidates[int(np.argmin(self.array[i, candidates]))]
+        row = self.rows[i]
+        return min(candidates, key=row.__getitem__)
+
+
+def _haversine_matrix_numpy(points):
+    coords = np.radians(np.asarray(points, dtype=np.float64).reshape(-1, 2))
+    lat = coords[:, 0]
+    lng = coords[:, 1]
+    dlat = lat[:, None] - lat[None, :]
+    dlng = lng[:, None] - lng[None, :]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _haversine_matrix_scalar(points):
+    n = len(points)
+    rows = [[0.0] * n for _ in range(n)]
+    for i in range(n):
+        lat1, lng1 = points[i]
+        for j in range(i + 1, n):
+            d = haversine(lat1, lng1, points[j][0], points[j][1])
+            rows[i][j] = d
+            rows[j][i] = d
+    return rows
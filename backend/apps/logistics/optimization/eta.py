@@ -0,0 +1,33 @@
+"""
+Arrival times along a fixed stop sequence.
+
+The driver covers each leg, waits if a stop's window has not opened yet, then
+spends the stop's service time there. All values are seconds, windows relative
+to the moment the sequence starts. This forecasts the sequence as it stands;
+late stops are reported, not re-planned.
+"""
+from typing import Callable, Optional, Sequence
+
+# (stop, clock at departure, planned leg, planned service) -> (leg, service)
+Adjust = Callable[[int, float, float, float], tuple[float, float]]
+
+
+def arrivals(
+    legs_s: Sequence[float],
+    service_s: Sequence[float],
+    opens_s: Sequence[float],
+    adjust: Optional[Adjust] = None,
+) -> list[float]:
+    """
+    Service start per stop; ``legs_s[k]`` is the drive to stop ``k`` from where
+    the driver was. ``adjust`` can re-time each leg and stop for the time of
+    day it happens at, e.g. ``SpeedProfile.pace``.
+    """
+    clock, out = 0.0, []
+    for k, (leg, service, opens) in enumerate(zip(legs_s, service_s, opens_s)):
+        if adjust is not None:
+            leg, service = adjust(k, clock, leg, service)
+        clock = max(clock + leg, opens)
+        out.append(clock)
+        clock += service
+    return out
@@ -0,0 +1,108 @@
+"""
+Cheapest insertion of one order's pickup/drop into an existing stop sequence.
+
+A route is a list of points in visiting order. Positions before ``first_open``
+are already visited and fixed; new stops may only go after
+``points[first_open - 1]``. An insertion "after -1" puts the stop at the very
+start of the route. Only the legs next to the inserted stops change, so each
+candidate is priced in O(1), and the best (pickup, drop) pair takes one O(n)
+scan over the route. Distances come from a ``DistanceMatrix`` over the route's
+points followed by the new stops, such as the configured provider's; without
+one they are straight-line.
+"""
+from dataclasses import dataclass
+from typing import Callable, Optional, Sequence
+
+from apps.logistics.optimization.distance import DistanceMatrix, haversine
+
+Point = tuple[float, float]
+
+
+@dataclass
+class Insertion:
+    pickup_after: Optional[int]  # index into the route's points, -1 = route start
+    drop_after: Optional[int]  # index into the route's points, -1 = route start
+    added_km: float
+
+
+def _distances(located: Sequence[Point], matrix: Optional[DistanceMatrix]) -> Callable[[int, int], float]:
+    """``dist(i, j)`` between ``located`` points, by index."""
+    if matrix is None:
+        return lambda i, j: haversine(*located[i], *located[j])
+    rows = matrix.rows
+    return lambda i, j: rows[i][j]
+
+
+def _insert_costs(
+    dist: Callable[[int, int], float], n: int, first_open: int, new: int
+) -> list[float]:
+    """``costs[k]`` is the detour for putting point ``new`` after point ``first_open - 1 + k``."""
+    costs = []
+    for i in range(first_open - 1, n):
+        cost = 0.0
+        if i >= 0:
+            cost += dist(i, new)
+        if i + 1 < n:
+            cost += dist(new, i + 1)
+            if i >= 0:
+                cost -= dist(i, i + 1)
+        costs.append(cost)
+    return costs
+
+
+def cheapest_insertion(
+    points: Sequence[Point],
+    first_open: int,
+    pickup: Optional[Point] = None,
+    drop: Optional[Point] = None,
+    matrix: Optional[DistanceMatrix] = None,
+) -> Insertion:
+    """
+    Cheapest positions for ``pickup`` and/or ``drop`` with the pickup visited
+    first; positions refer to the original ``points``. ``matrix``, if given,
+    covers ``points`` followed by the pickup and then the drop, those present.
+    """
+    if pickup is None and drop is None:
+        raise ValueError("Nothing to insert.")
+    n = len(points)
+    new = [p for p in (pickup, drop) if p is not None]
+    dist = _distances(list(points) + new, matrix)
+    base = first_open - 1
+    if pickup is None or drop is None:
+        costs = _insert_costs(dist, n, first_open, n)
+        k = min(range(len(costs)), key=costs.__getitem__)
+        after = base + k
+        return Insertion(
+            pickup_after=after if pickup is not None else None,
+            drop_after=after if drop is not None else None,
+            added_km=costs[k],
+        )
+
+    p, q = n, n + 1
+    pickup_costs = _insert_costs(dist, n, first_open, p)
+    drop_costs = _insert_costs(dist, n, first_open, q)
+
+    # Both after the same point: prev -> pickup -> drop -> next.
+    best = None
+    direct = dist(p, q)
+    for k in range(len(pickup_costs)):
+        i = base + k
+        cost = direct
+        if i >= 0:
+            cost += dist(i, p)
+        if i + 1 < n:
+            cost += dist(q, i + 1)
+            if i >= 0:
+                cost -= dist(i, i + 1)
+        if best is None or cost < best.added_km:
+            best = Insertion(i, i, cost)
+
+    # Drop after a later point than the pickup: the two detours are independent.
+    best_pickup = 0
+    for k in range(1, len(drop_costs)):
+        if pickup_costs[k - 1] < pickup_costs[best_pickup]:
+            best_pickup = k - 1
+        cost = pickup_costs[best_pickup] + drop_costs[k]
+        if cost < best.added_km:
+            best = Insertion(base + best_pickup, base + k, cost)
+    return best
@@ -0,0 +1,159 @@
+"""
+Fleet planning — split a day's orders across vehicles.
+
+Orders are clustered with a capacitated k-means: one cluster per vehicle,
+assignment by regret (orders with the most to lose from their second-best
+cluster go first) so that tight capacities are filled with the orders that
+belong there. Coordinates are projected to a local plane in km, which is
+accurate enough for grouping within a city and keeps the maths vectorisable.
+"""
+import math
+import random
+from typing import Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover — NumPy is optional, scalar fallback below
+    np = None
+
+KM_PER_DEGREE_LAT = 110.574
+KM_PER_DEGREE_LNG = 111.320
+DEFAULT_ITERATIONS = 8
+# Orders per route may exceed an even split by this fraction
+DEFAULT_BALANCE_SLACK = 0.25
+
+
+def cluster_orders(
+    points: Sequence[Optional[tuple[float, float]]],
+    weights: Sequence[float],
+    capacities: Sequence[float],
+    *,
+    max_orders: Optional[int] = None,
+    iterations: int = DEFAULT_ITERATIONS,
+    seed: int = 0,
+) -> list[int]:
+    """
+    Assign each order to a vehicle index, or ``-1`` if nothing has room.
+
+    ``points`` holds one ``(lat, lng)`` per order (``None`` if unknown),
+    ``capacities`` one limit per vehicle in the same unit as ``weights``
+    (``math.inf`` for unlimited). ``max_orders`` caps orders per vehicle;
+    by default it is an even split plus ``DEFAULT_BALANCE_SLACK``.
+    """
+    n, k = len(points), len(capacities)
+    if k == 0:
+        return [-1] * n
+    if max_orders is None:
+        max_orders = math.ceil(n / k * (1 + DEFAULT_BALANCE_SLACK))
+
+    located = [i for i, p in enumerate(points) if p is not None]
+    xy = _project([points[i] for i in located])
+    centers = _initial_centers(xy, k, random.Random(seed))
+
+    assignment = [-1] * n
+    for _ in range(max(iterations, 1)):
+        assignment = _assign(located, xy, centers, weights, capacities, max_orders, n)
+        centers = _recenter(located, xy, assignment, centers)
+    return _assign_unlocated(assignment, points, weights, capacities, max_orders)
+
+
+def _project(points):
+    if not points:
+        return []
+    lat0 = math.radians(sum(p[0] for p in points) / len(points))
+    scale = KM_PER_DEGREE_LNG * math.cos(lat0)
+    return [(lng * scale, lat * KM_PER_DEGREE_LAT) for lat, lng in points]
+
+
+def _initial_centers(xy, k, rng):
+    """k-means++ seeding; vehicles beyond the number of points start at a repeat."""
+    if not xy:
+        return [(0.0, 0.0)] * k
+    centers = [xy[rng.randrange(len(xy))]]
+    closest = [_sq(p, centers[0]) for p in xy]
+    while len(centers) < k:
+        total = sum(closest)
+        if total == 0:
+            centers.append(centers[0])
+            continue
+        target, acc = rng.random() * total, 0.0
+        for idx, weight in enumerate(closest):
+            acc += weight
+            if acc >= target:
+                break
+        centers.append(xy[idx])
+        closest = [min(c, _sq(p, xy[idx])) for c, p in zip(closest, xy)]
+    return centers
+
+
+def _sq(a, b):
+    return (a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2
+
+
+def _ranked_centers(xy, centers):
+    """Per point: center indices nearest first, and the regret (2nd best − best)."""
+    if np is not None:
+        pts = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+        ctr = np.asarray(centers, dtype=np.float64).reshape(-1, 2)
+        dist = np.sqrt(((pts[:, None, :] - ctr[None, :, :]) ** 2).sum(axis=2))
+        ranked = np.argsort(dist, axis=1)
+        ordered = np.take_along_axis(dist, ranked, axis=1)
+        regret = ordered[:, 1] - ordered[:, 0] if len(centers) > 1 else ordered[:, 0] * 0
+        return ranked.tolist(), regret.tolist()
+    ranked, regret = [], []
+    for p in xy:
+        dist = [math.sqrt(_sq(p, c)) for c in centers]
+        order = sorted(range(len(centers)), key=dist.__getitem__)
+        ranked.append(order)
+        regret.append(dist[order[1]] - dist[order[0]] if len(order) > 1 else 0.0)
+    return ranked, regret
+
+
+def _assign(located, xy, centers, weights, capacities, max_orders, n):
+    ranked, regret = _ranked_centers(xy, centers)
+    load = [0.0] * len(capacities)
+    count = [0] * len(capacities)
+    assignment = [-1] * n
+    for row in sorted(range(len(located)), key=regret.__getitem__, reverse=True):
+        order = located[row]
+        for vehicle in ranked[row]:
+            if count[vehicle] < max_orders and load[vehicle] + weights[order] <= capacities[vehicle]:
+                assignment[order] = vehicle
+                load[vehicle] += weights[order]
+                count[vehicle] += 1
+                break
+    return assignment
+
+
+def _recenter(located, xy, assignment, centers):
+    sums = [[0.0, 0.0, 0] for _ in centers]
+    for row, order in enumerate(located):
+        vehicle = assignment[order]
+        if vehicle >= 0:
+            sums[vehicle][0] += xy[row][0]
+            sums[vehicle][1] += xy[row][1]
+            sums[vehicle][2] += 1
+    return [
+        (sx / c, sy / c) if c else center
+        for (sx, sy, c), center in zip(sums, centers)
+    ]
+
+
+def _assign_unlocated(assignment, points, weights, capacities, max_orders):
+    """Orders without coordinates go to whichever vehicle has the fewest orders and room."""
+    load = [0.0] * len(capacities)
+    count = [0] * len(capacities)
+    for order, vehicle in enumerate(assignment):
+        if vehicle >= 0:
+            load[vehicle] += weights[order]
+            count[vehicle] += 1
+    for order, point in enumerate(points):
+        if point is not None:
+            continue
+        for vehicle in sorted(range(len(capacities)), key=count.__getitem__):
+            if count[vehicle] < max_orders and load[vehicle] + weights[order] <= capacities[vehicle]:
+                assignment[order] = vehicle
+                load[vehicle] += weights[order]
+                count[vehicle] += 1
+                break
+    return assignment
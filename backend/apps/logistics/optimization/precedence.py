@@ -0,0 +1,82 @@
+"""
+Pickup-before-drop constraints for stop sequencing.
+
+``Precedence`` is a "must come before" relation over tour points. Sequencing
+code keeps a ``positions`` array (point → index in the tour) next to the tour so
+that each candidate move can be checked against only the moved points' own
+predecessors/successors instead of re-validating the whole tour.
+"""
+from collections import defaultdict
+from typing import Iterable, Sequence
+
+
+class Precedence:
+    """
+    ``predecessors[i]`` lists points that must be visited before point ``i``;
+    ``successors[i]`` lists points that must be visited after it.
+    """
+
+    def __init__(self, n: int, pairs: Iterable[tuple[int, int]] = ()):
+        self.predecessors: list[list[int]] = [[] for _ in range(n)]
+        self.successors: list[list[int]] = [[] for _ in range(n)]
+        for before, after in pairs:
+            self.successors[before].append(after)
+            self.predecessors[after].append(before)
+
+    @classmethod
+    def from_stops(cls, stops: Sequence) -> "Precedence":
+        """Every PICKUP of an order precedes every DROP of the same order."""
+        from apps.logistics.models import Stop
+
+        pickups, drops = defaultdict(list), defaultdict(list)
+        for idx, stop in enumerate(stops):
+            if stop.type == Stop.StopType.PICKUP:
+                pickups[stop.order_id].append(idx)
+            elif stop.type == Stop.StopType.DROP:
+                drops[stop.order_id].append(idx)
+        pairs = [(p, d) for order_id, ps in pickups.items() for p in ps for d in drops[order_id]]
+        return cls(len(stops), pairs)
+
+    def __len__(self) -> int:
+        return len(self.predecessors)
+
+    def is_constrained(self) -> bool:
+        return any(self.successors)
+
+    def is_feasible(self, tour: Sequence[int]) -> bool:
+        positions = tour_positions(tour, len(self))
+        return all(
+            positions[before] < positions[after]
+            for before, afters in enumerate(self.successors)
+            for after in afters
+        )
+
+    def relocation_bounds(self, tour, positions, i: int, length: int) -> tuple[int, int]:
+        """
+        Range ``[lo, hi]`` of insertion points ``j`` (segment goes after ``tour[j]``)
+        that keep ``tour[i:i+length]`` feasible: it may not move before any of
+        its predecessors nor after any of its successors.
+        """
+        lo, hi = 0, len(tour) - 1
+        end = i + length
+        for point in tour[i:end]:
+            for before in self.predecessors[point]:
+                pos = positions[before]
+                if pos < i and pos > lo:
+                    lo = pos
+            for after in self.successors[point]:
+                pos = positions[after]
+                if pos >= end and pos - 1 < hi:
+                    hi = pos - 1
+        return lo, hi
+
+    def blocks_reversal(self, positions, point: int, start: int) -> bool:
+        """True if ``point`` has a predecessor at or after ``start`` (both in the reversed span)."""
+        return any(positions[before] >= start for before in self.predecessors[point])
+
+
+def tour_positions(tour: Sequence[int], n: int | None = None) -> list[int]:
+    positions = [-1] * (len(tour) if n is None else n)
+    for idx, point in enumerate(tour):
+        positions[point] = idx
+    return positions
@@ -0,0 +1,255 @@
+"""
+Pluggable sources of travel distance and time between coordinates.
+
+A provider turns a list of ``(lat, lng)`` points into a ``DistanceMatrix`` of
+km for the sequencing heuristics, and into travel times in seconds for ETAs.
+Providers are named by a spec string so that they can be chosen from settings
+and handed to worker processes:
+
+- ``"haversine"`` — straight-line distance, the default;
+- ``"road_graph:<path>"`` — shortest paths over an offline ``RoadGraph`` file.
+
+``get`` loads each spec once per process. Providers that are expensive to
+query (``cacheable``) come wrapped in a ``CachedProvider`` once
+``configure_cache`` has been called, which the logistics app does at start-up.
+The haversine default is always computed directly: a 100-point matrix takes
+well under a millisecond, while one cache lookup of its 9,900 pairs takes tens.
+"""
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional, Sequence
+
+from apps.logistics.optimization.distance import DistanceMatrix, haversine
+from apps.logistics.optimization.roads import RoadGraph
+from apps.logistics.optimization.travel_cache import TravelTimeCache
+
+Point = tuple[float, float]
+
+DEFAULT_PROVIDER = "haversine"
+# Speed for the straight-line hop between a point and its snapped road node
+ACCESS_SPEED_KMH = 15.0
+# Stretch and speed applied to straight-line km when the graph has no path
+UNREACHABLE_DETOUR = 1.5
+UNREACHABLE_SPEED_KMH = 20.0
+# Road node pairs kept in the in-process path cache
+PATH_CACHE_SIZE = 250_000
+
+
+class DistanceProvider(ABC):
+    name = ""
+    # Worth putting a TravelTimeCache in front of; cheap formulas are not
+    cacheable = False
+
+    @abstractmethod
+    def matrix(self, points: Sequence[Point]) -> DistanceMatrix:
+        """Km between every pair of points, symmetric."""
+
+    @abstractmethod
+    def travel_times(self, points: Sequence[Point], speed_kmh: float) -> list[list[float]]:
+        """Seconds from every point to every other point."""
+
+    def leg_times(self, points: Sequence[Point], speed_kmh: float) -> list[float]:
+        """Seconds for each consecutive leg of the path through ``points``."""
+        seconds = self.travel_times(points, speed_kmh)
+        return [seconds[i][i + 1] for i in range(len(points) - 1)]
+
+
+class HaversineProvider(DistanceProvider):
+    name = "haversine"
+    # Never cached: the formula is faster than a lookup
+    cacheable = False
+
+    def matrix(self, points: Sequence[Point]) -> DistanceMatrix:
+        return DistanceMatrix.from_points(points)
+
+    def travel_times(self, points: Sequence[Point], speed_kmh: float) -> list[list[float]]:
+        seconds_per_km = 3600.0 / speed_kmh
+        return [[km * seconds_per_km for km in row] for row in self.matrix(points).rows]
+
+    def leg_times(self, points: Sequence[Point], speed_kmh: float) -> list[float]:
+        return [haversine(*a, *b) / speed_kmh * 3600.0 for a, b in zip(points, points[1:])]
+
+
+class RoadGraphProvider(DistanceProvider):
+    """
+    Fastest paths over a ``RoadGraph``, plus a straight-line hop at each end to
+    the snapped node. Searched node pairs are kept in an LRU cache, so repeated
+    matrices over the same stops only run Dijkstra for new sources.
+    """
+
+    name = "road_graph"
+    cacheable = True
+
+    def __init__(self, graph: RoadGraph, cache_size: int = PATH_CACHE_SIZE):
+        self.graph = graph
+        self.cache_size = cache_size
+        self._paths: OrderedDict[tuple[int, int], tuple[float, float] | None] = OrderedDict()
+
+    def matrix(self, points: Sequence[Point]) -> DistanceMatrix:
+        """Road km; each pair is the mean of both directions, as the heuristics assume symmetry."""
+        km, _ = self.pairs(points)
+        return _symmetric(km)
+
+    def travel_times(self, points: Sequence[Point], speed_kmh: float) -> list[list[float]]:
+        """Directed seconds from the graph's edge times; ``speed_kmh`` is not used."""
+        _, seconds = self.pairs(points)
+        return seconds
+
+    def leg_times(self, points: Sequence[Point], speed_kmh: float) -> list[float]:
+        return [self.pairs([a, b])[1][0][1] for a, b in zip(points, points[1:])]
+
+    def pairs(self, points: Sequence[Point]) -> tuple[list[list[float]], list[list[float]]]:
+        """Directed ``(km, seconds)`` matrices."""
+        snapped = [self.graph.snap(lat, lng) for lat, lng in points]
+        paths = self._paths_between({node for node, _ in snapped})
+        n = len(points)
+        km = [[0.0] * n for _ in range(n)]
+        seconds = [[0.0] * n for _ in range(n)]
+        for i, (a, access_a) in enumerate(snapped):
+            for j, (b, access_b) in enumerate(snapped):
+                if i == j:
+                    continue
+                path = paths.get((a, b))
+                if path is None:
+                    straight = haversine(*points[i], *points[j]) * UNREACHABLE_DETOUR
+                    km[i][j] = straight
+                    seconds[i][j] = straight / UNREACHABLE_SPEED_KMH * 3600.0
+                    continue
+                access = access_a + access_b
+                km[i][j] = path[1] / 1000.0 + access
+                seconds[i][j] = path[0] + access / ACCESS_SPEED_KMH * 3600.0
+        return km, seconds
+
+    def _paths_between(self, nodes: set[int]) -> dict[tuple[int, int], tuple[float, float] | None]:
+        """``(seconds, metres)`` for every ordered node pair, ``None`` where there is no path."""
+        paths = {}
+        for source in nodes:
+            missing = []
+            for target in nodes:
+                key = (source, target)
+                if key in self._paths:
+                    self._paths.move_to_end(key)
+                    paths[key] = self._paths[key]
+                else:
+                    missing.append(target)
+            if not missing:
+                continue
+            found = self.graph.one_to_many(source, missing)
+            for target in missing:
+                paths[source, target] = self._remember((source, target), found.get(target))
+        return paths
+
+    def _remember(self, key, value):
+        self._paths[key] = value
+        if len(self._paths) > self.cache_size:
+            self._paths.popitem(last=False)
+        return value
+
+
+class CachedProvider(DistanceProvider):
+    """
+    Serves a cacheable provider's pairs from a ``TravelTimeCache``. Points in
+    the same geohash cell share one entry (and are 0 km apart); only pairs
+    missing from both cache levels are sent to the wrapped provider, in one call.
+    """
+
+    cacheable = False
+
+    def __init__(self, inner: DistanceProvider, cache: TravelTimeCache):
+        self.inner = inner
+        self.cache = cache
+        self.name = inner.name
+
+    def matrix(self, points: Sequence[Point]) -> DistanceMatrix:
+        km, _ = self.pairs(points)
+        return _symmetric(km)
+
+    def travel_times(self, points: Sequence[Point], speed_kmh: float) -> list[list[float]]:
+        _, seconds = self.pairs(points)
+        return seconds
+
+    def leg_times(self, points: Sequence[Point], speed_kmh: float) -> list[float]:
+        """Only the consecutive pairs are looked up, in one ``get_many``."""
+        cells = [self.cache.cell(lat, lng) for lat, lng in points]
+        legs = list(zip(cells, cells[1:]))
+        entries = self.cache.get_many({leg for leg in legs if leg[0] != leg[1]})
+        fresh = {}
+        for k, (a, b) in enumerate(legs):
+            if a != b and (a, b) not in entries and (a, b) not in fresh:
+                km, seconds = self.inner.pairs([points[k], points[k + 1]])
+                fresh[a, b] = (km[0][1], seconds[0][1])
+                fresh[b, a] = (km[1][0], seconds[1][0])
+        if fresh:
+            self.cache.set_many(fresh)
+            entries.update(fresh)
+        return [entries[a, b][1] if a != b else 0.0 for a, b in legs]
+
+    def pairs(self, points: Sequence[Point]) -> tuple[list[list[float]], list[list[float]]]:
+        cells = [self.cache.cell(lat, lng) for lat, lng in points]
+        where = {}
+        for point, cell in zip(points, cells):
+            where.setdefault(cell, point)
+        wanted = [(a, b) for a in where for b in where if a != b]
+        entries = self.cache.get_many(wanted)
+
+        missing = {cell for pair in wanted if pair not in entries for cell in pair}
+        if missing:
+            todo = sorted(missing)
+            km, seconds = self.inner.pairs([where[cell] for cell in todo])
+            fresh = {
+                (a, b): (km[i][j], seconds[i][j])
+                for i, a in enumerate(todo)
+                for j, b in enumerate(todo)
+                if a != b and (a, b) not in entries
+            }
+            self.cache.set_many(fresh)
+            entries.update(fresh)
+
+        n = len(points)
+        km = [[0.0] * n for _ in range(n)]
+        seconds = [[0.0] * n for _ in range(n)]
+        for i, a in enumerate(cells):
+            for j, b in enumerate(cells):
+                if a != b:
+                    km[i][j], seconds[i][j] = entries[a, b]
+        return km, seconds
+
+
+def _symmetric(km: list[list[float]]) -> DistanceMatrix:
+    n = len(km)
+    return DistanceMatrix([[(km[i][j] + km[j][i]) / 2 for j in range(n)] for i in range(n)])
+
+
+_PROVIDERS: dict[str, DistanceProvider] = {}
+_CACHE_OPTIONS: Optional[dict] = None
+
+
+def configure_cache(store=None, **options) -> None:
+    """
+    Put a ``TravelTimeCache`` over ``store`` (Django cache API) in front of
+    cacheable providers; ``options`` go to ``TravelTimeCache``.
+    """
+    global _CACHE_OPTIONS
+    _CACHE_OPTIONS = {"store": store, **options}
+    _PROVIDERS.clear()
+
+
+def get(spec: str = DEFAULT_PROVIDER) -> DistanceProvider:
+    """
+    The provider for ``spec``, loaded on first use in this process. Only
+    cacheable providers are put behind the travel-time cache.
+    """
+    provider = _PROVIDERS.get(spec)
+    if provider is None:
+        name, _, path = spec.partition(":")
+        if name == HaversineProvider.name and not path:
+            provider = HaversineProvider()
+        elif name == RoadGraphProvider.name and path:
+            provider = RoadGraphProvider(RoadGraph.load(path))
+        else:
+            raise ValueError(f"Unknown distance provider '{spec}'.")
+        if provider.cacheable and _CACHE_OPTIONS is not None:
+            options = {"namespace": f"travel:{spec}", **_CACHE_OPTIONS}
+            provider = CachedProvider(provider, TravelTimeCache(**options))
+        _PROVIDERS[spec] = provider
+    return provider
@@ -0,0 +1,67 @@
+"""
+Local repair of an existing tour after stops were added or removed.
+
+Instead of re-optimizing the whole route, only windows of ``radius`` positions
+around the touched positions are improved. Each window is solved as a small
+path from the stop before it to the stop after it: that end stop is made a
+successor of every point in the window, so it stays last and the rest of the
+tour is untouched. Precedence pairs that cross a window's border stay satisfied
+because points never leave their window.
+"""
+from typing import Iterable, Optional, Sequence
+
+from apps.logistics.optimization import sequencing
+from apps.logistics.optimization.distance import DistanceMatrix
+from apps.logistics.optimization.precedence import Precedence
+
+REPAIR_RADIUS = 4
+
+
+def windows(n: int, touched: Iterable[int], radius: int = REPAIR_RADIUS) -> list[tuple[int, int]]:
+    """Merged ``[lo, hi]`` position ranges within ``radius`` of ``touched``; position 0 never moves."""
+    spans = sorted(
+        (max(1, p - radius), min(n - 1, p + radius)) for p in touched if 0 <= p < n
+    )
+    merged: list[list[int]] = []
+    for lo, hi in spans:
+        if lo > hi:
+            continue
+        if merged and lo <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], hi)
+        else:
+            merged.append([lo, hi])
+    return [(lo, hi) for lo, hi in merged]
+
+
+def repair(
+    matrix: DistanceMatrix,
+    tour: list[int],
+    touched: Iterable[int],
+    precedence: Optional[Precedence] = None,
+    radius: int = REPAIR_RADIUS,
+    stages: Sequence[sequencing.ImprovementStage] = sequencing.MODES["2opt"],
+) -> list[int]:
+    """Improve ``tour`` only around the positions in ``touched``."""
+    tour = list(tour)
+    d = matrix.rows
+    n = len(tour)
+    for lo, hi in windows(n, touched, radius):
+        # Local points: the fixed stop before the window, the window, and the
+        # stop after it (if any) which must stay last.
+        local = tour[lo - 1:hi + 2]
+        index = {point: k for k, point in enumerate(local)}
+        sub = DistanceMatrix([[d[a][b] for b in local] for a in local])
+        pairs = []
+        if precedence:
+            pairs = [
+                (index[before], index[after])
+                for before in local[1:]
+                for after in precedence.successors[before]
+                if after in index
+            ]
+        if hi + 1 < n:
+            last = len(local) - 1
+            pairs += [(k, last) for k in range(1, last)]
+        improved = sequencing.improve(sub, list(range(len(local))), stages, Precedence(len(local), pairs))
+        tour[lo - 1:hi + 2] = [local[k] for k in improved]
+    return tour
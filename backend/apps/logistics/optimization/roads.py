@@ -0,0 +1,133 @@
+"""
+Offline road network loaded from a preprocessed graph file.
+
+A ``RoadGraph`` is a directed graph in compressed sparse row form: the edges
+leaving node ``u`` are ``indices[indptr[u]:indptr[u + 1]]``, with per-edge
+``length_m`` and ``time_s``. On disk it is a NumPy ``.npz`` written by
+``RoadGraph.save`` (see the ``build_road_graph`` command, which takes node and
+edge CSVs exported from OpenStreetMap by any extraction tool). In memory the
+arrays become ``array.array`` buffers — compact, and fast to index from the
+pure-Python search loop.
+
+Queries are one-to-many Dijkstra on travel time that stops as soon as every
+requested target is settled, which is what a many-to-many matrix needs: one
+search per distinct source node.
+"""
+import heapq
+import math
+from array import array
+from typing import Iterable, Sequence
+
+from apps.logistics.optimization.distance import np
+from apps.logistics.optimization.spatial import GridIndex
+
+
+class RoadGraph:
+    def __init__(self, lat, lng, indptr, indices, length_m, time_s):
+        self.lat = array("d", lat)
+        self.lng = array("d", lng)
+        self.indptr = array("q", indptr)
+        self.indices = array("q", indices)
+        self.length_m = array("d", length_m)
+        self.time_s = array("d", time_s)
+        if len(self.indptr) != len(self.lat) + 1:
+            raise ValueError("indptr must have one entry per node plus one.")
+        if not len(self.indices) == len(self.length_m) == len(self.time_s) == self.indptr[-1]:
+            raise ValueError("Edge arrays disagree on the number of edges.")
+        self._index = None
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.indices)
+
+    # ─── Files ─────────────────────────────────────────────────────────────
+
+    @classmethod
+    def from_edges(
+        cls,
+        nodes: Sequence[tuple[float, float]],
+        edges: Iterable[tuple[int, int, float, float]],
+    ) -> "RoadGraph":
+        """Build from ``(lat, lng)`` nodes and directed ``(u, v, length_m, time_s)`` edges."""
+        n = len(nodes)
+        edges = sorted(edges)
+        indptr = [0] * (n + 1)
+        for u, v, _, _ in edges:
+            if not (0 <= u < n and 0 <= v < n):
+                raise ValueError(f"Edge ({u}, {v}) refers to an unknown node.")
+            indptr[u + 1] += 1
+        for u in range(n):
+            indptr[u + 1] += indptr[u]
+        return cls(
+            [lat for lat, _ in nodes],
+            [lng for _, lng in nodes],
+            indptr,
+            [v for _, v, _, _ in edges],
+            [length for _, _, length, _ in edges],
+            [seconds for _, _, _, seconds in edges],
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "RoadGraph":
+        if np is None:
+            raise ImportError("Loading a road graph requires NumPy.")
+        with np.load(path) as data:
+            return cls(*(data[name].tolist() for name in _ARRAYS))
+
+    def save(self, path: str) -> None:
+        if np is None:
+            raise ImportError("Saving a road graph requires NumPy.")
+        np.savez_compressed(
+            path,
+            lat=np.asarray(self.lat, dtype=np.float64),
+            lng=np.asarray(self.lng, dtype=np.float64),
+            indptr=np.asarray(self.indptr, dtype=np.int64),
+            indices=np.asarray(self.indices, dtype=np.int32),
+            length_m=np.asarray(self.length_m, dtype=np.float32),
+            time_s=np.asarray(self.time_s, dtype=np.float32),
+        )
+
+    # ─── Queries ───────────────────────────────────────────────────────────
+
+    def snap(self, lat: float, lng: float) -> tuple[int, float]:
+        """Closest node to ``(lat, lng)`` and the straight-line km to it."""
+        if self._index is None:
+            self._index = GridIndex.from_points(
+                (node, self.lat[node], self.lng[node]) for node in range(len(self))
+            )
+        [(node, km)] = self._index.nearest(lat, lng)
+        return node, km
+
+    def one_to_many(self, source: int, targets: Iterable[int]) -> dict[int, tuple[float, float]]:
+        """
+        ``{target: (seconds, metres)}`` along the fastest path from ``source``;
+        unreachable targets are left out.
+        """
+        pending = set(targets)
+        found = {}
+        best = {source: 0.0}
+        metres = {source: 0.0}
+        heap = [(0.0, source)]
+        indptr, indices, length_m, time_s = self.indptr, self.indices, self.length_m, self.time_s
+        while heap and pending:
+            t, u = heapq.heappop(heap)
+            if t > best[u]:
+                continue
+            if u in pending:
+                pending.discard(u)
+                found[u] = (t, metres[u])
+            m = metres[u]
+            for e in range(indptr[u], indptr[u + 1]):
+                v = indices[e]
+                nt = t + time_s[e]
+                if nt < best.get(v, math.inf):
+                    best[v] = nt
+                    metres[v] = m + length_m[e]
+                    heapq.heappush(heap, (nt, v))
+        return found
+
+
+_ARRAYS = ("lat", "lng", "indptr", "indices", "length_m", "time_s")
@@ -0,0 +1,235 @@
+"""
+Stop sequencing heuristics over a ``DistanceMatrix``.
+
+Tours are open paths of point indices; ``tour[0]`` is the anchor (the first stop,
+or later the driver's position) and never moves. A mode is a construction step
+(nearest neighbor) followed by zero or more improvement stages, each of which
+takes ``(matrix, tour, precedence)`` and returns a tour that is no longer than
+its input. With a ``Precedence`` every stage only produces feasible tours.
+"""
+from typing import Callable, Optional, Sequence
+
+from apps.logistics.optimization import anytime, spatial
+from apps.logistics.optimization.distance import DistanceMatrix
+from apps.logistics.optimization.precedence import Precedence, tour_positions
+
+EPSILON = 1e-9
+
+ImprovementStage = Callable[[DistanceMatrix, list[int], Optional[Precedence]], list[int]]
+
+
+def nearest_neighbor(
+    matrix: DistanceMatrix,
+    start: Optional[int] = None,
+    precedence: Optional[Precedence] = None,
+) -> list[int]:
+    """
+    Greedy construction: always drive to the closest point whose predecessors
+    have all been visited. Without ``start`` the first unconstrained point is used.
+    """
+    n = len(matrix)
+    if precedence is None:
+        start = 0 if start is None else start
+        remaining = [i for i in range(n) if i != start]
+        tour = [start]
+        while remaining:
+            nearest = matrix.nearest(tour[-1], remaining)
+            remaining.remove(nearest)
+            tour.append(nearest)
+        return tour
+
+    waiting = [len(p) for p in precedence.predecessors]
+    if start is None:
+        start = waiting.index(0)
+    tour = [start]
+    ready = [i for i in range(n) if i != start and waiting[i] == 0]
+    _release(precedence, waiting, start, ready)
+    while ready:
+        nearest = matrix.nearest(tour[-1], ready)
+        ready.remove(nearest)
+        tour.append(nearest)
+        _release(precedence, waiting, nearest, ready)
+    if len(tour) != n:
+        raise ValueError("Precedence constraints are cyclic.")
+    return tour
+
+
+def nearest_neighbor_path(points: Sequence[tuple[float, float]], start: int = 0) -> list[int]:
+    """
+    Greedy construction straight from ``(lat, lng)`` points, without a matrix.
+
+    Each step is a ``GridIndex`` lookup instead of a scan over every remaining
+    point, so large unconstrained stop sets stay well below O(n²).
+    """
+    if not points:
+        return []
+    index = spatial.GridIndex.from_points((i, lat, lng) for i, (lat, lng) in enumerate(points))
+    index.remove(start)
+    tour = [start]
+    while len(index):
+        lat, lng = points[tour[-1]]
+        [(nearest, _)] = index.nearest(lat, lng)
+        index.remove(nearest)
+        tour.append(nearest)
+    return tour
+
+
+def _release(precedence: Precedence, waiting: list[int], visited: int, ready: list[int]) -> None:
+    for after in precedence.successors[visited]:
+        waiting[after] -= 1
+        if waiting[after] == 0:
+            ready.append(after)
+
+
+def two_opt(
+    matrix: DistanceMatrix, tour: list[int], precedence: Optional[Precedence] = None
+) -> list[int]:
+    """Reverse segments while doing so shortens the path (first improvement)."""
+    d = matrix.rows
+    tour = list(tour)
+    n = len(tour)
+    positions = tour_positions(tour, len(matrix)) if precedence else None
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, n - 1):
+            a, b = tour[i - 1], tour[i]
+            d_ab = d[a][b]
+            for k in range(i + 1, n):
+                c = tour[k]
+                # Once a pickup/drop pair lies inside tour[i..k], every longer
+                # reversal from i also flips it, so stop extending k.
+                if precedence and precedence.blocks_reversal(positions, c, i):
+                    break
+                delta = d[a][c] - d_ab
+                if k + 1 < n:
+                    e = tour[k + 1]
+                    delta += d[b][e] - d[c][e]
+                if delta < -EPSILON:
+                    tour[i:k + 1] = tour[i:k + 1][::-1]
+                    if positions is not None:
+                        for idx in range(i, k + 1):
+                            positions[tour[idx]] = idx
+                    b = tour[i]
+                    d_ab = d[a][b]
+                    improved = True
+    return tour
+
+
+def or_opt(
+    matrix: DistanceMatrix,
+    tour: list[int],
+    precedence: Optional[Precedence] = None,
+    max_segment: int = 3,
+) -> list[int]:
+    """Relocate runs of 1..``max_segment`` consecutive stops to a cheaper position."""
+    d = matrix.rows
+    tour = list(tour)
+    n = len(tour)
+    positions = tour_positions(tour, len(matrix)) if precedence else None
+    improved = True
+    while improved:
+        improved = False
+        for length in range(1, max_segment + 1):
+            i = 1
+            while i + length <= n:
+                if precedence:
+                    lo, hi = precedence.relocation_bounds(tour, positions, i, length)
+                else:
+                    lo, hi = 0, n - 1
+                move = _best_relocation(d, tour, i, length, lo, hi)
+                if move is not None:
+                    tour = _relocate(tour, i, length, move)
+                    if positions is not None:
+                        positions = tour_positions(tour, len(matrix))
+                    improved = True
+                i += 1
+    return tour
+
+
+def _best_relocation(d, tour: list[int], i: int, length: int, lo: int, hi: int) -> int | None:
+    """Best insertion point ``j`` in ``[lo, hi]`` (segment goes after ``tour[j]``) for ``tour[i:i+length]``."""
+    n = len(tour)
+    prev, first, last = tour[i - 1], tour[i], tour[i + length - 1]
+    nxt = tour[i + length] if i + length < n else None
+    gain = d[prev][first]
+    if nxt is not None:
+        gain += d[last][nxt] - d[prev][nxt]
+
+    best_j, best_delta = None, -EPSILON
+    for j in range(lo, hi + 1):
+        if i - 1 <= j < i + length:
+            continue
+        p = tour[j]
+        q = tour[j + 1] if j + 1 < n else None
+        added = d[p][first]
+        if q is not None:
+            added += d[last][q] - d[p][q]
+        delta = added - gain
+        if delta < best_delta:
+            best_j, best_delta = j, delta
+    return best_j
+
+
+def _relocate(tour: list[int], i: int, length: int, j: int) -> list[int]:
+    segment = tour[i:i + length]
+    rest = tour[:i] + tour[i + length:]
+    pos = j + 1 if j < i else j + 1 - length
+    return rest[:pos] + segment + rest[pos:]
+
+
+def improve(
+    matrix: DistanceMatrix,
+    tour: list[int],
+    stages: Sequence[ImprovementStage],
+    precedence: Optional[Precedence] = None,
+) -> list[int]:
+    """Run improvement stages in turn until none of them shortens the tour."""
+    if not stages or len(tour) < 3:
+        return list(tour)
+    best = matrix.tour_length(tour)
+    while True:
+        for stage in stages:
+            tour = stage(matrix, tour, precedence)
+        length = matrix.tour_length(tour)
+        if length >= best - EPSILON:
+            return tour
+        best = length
+
+
+# Optimization modes selectable from RouteCreateSerializer.optimize
+MODES: dict[str, tuple[ImprovementStage, ...]] = {
+    "greedy": (),
+    "2opt": (two_opt, or_opt),
+}
+DEFAULT_MODE = "greedy"
+
+
+def solve(
+    matrix: DistanceMatrix,
+    mode: str = DEFAULT_MODE,
+    precedence: Optional[Precedence] = None,
+    *,
+    deadline: Optional[float] = None,
+    on_progress: Optional[anytime.ProgressCallback] = None,
+) -> tuple[list[int], list[int]]:
+    """
+    Return ``(constructed_tour, improved_tour)`` for ``mode``. With a
+    ``deadline`` (``time.monotonic()`` value) the improved tour is then kicked
+    and re-improved until the deadline passes.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown optimization mode '{mode}'.")
+    stages = MODES[mode]
+    constructed = nearest_neighbor(matrix, precedence=precedence)
+    tour = improve(matrix, constructed, stages, precedence)
+    if deadline is not None and stages:
+        tour, _ = anytime.search(
+            tour,
+            cost=matrix.tour_length,
+            improve=lambda t: improve(matrix, t, stages, precedence),
+            deadline=deadline,
+            precedence=precedence,
+            on_progress=on_progress,
+        )
+    return constructed, tour
@@ -0,0 +1,185 @@
+"""
+In-process spatial index for nearest-neighbour and radius queries.
+
+``GridIndex`` buckets points into square cells on a local plane in km (the
+same equirectangular projection the fleet planner uses). A query looks at the
+query point's cell and then at rings of cells around it, and stops as soon as
+no unseen cell can hold anything closer, so a lookup touches a handful of cells
+instead of every point. Reported distances are exact haversine km; the
+projection is only used to choose cells, with ``RING_MARGIN`` of slack for its
+error at city scale. Points can be removed, e.g. once a stop is visited.
+
+``geohash`` gives the standard string id of the cell around a coordinate, for
+keying caches and statistics by place.
+"""
+import math
+from typing import Hashable, Iterable, Optional
+
+from apps.logistics.optimization.distance import haversine
+from apps.logistics.optimization.planning import KM_PER_DEGREE_LAT, KM_PER_DEGREE_LNG
+
+DEFAULT_CELL_KM = 1.0
+# Auto-sized cells aim for about this many points each
+POINTS_PER_CELL = 2
+MIN_CELL_KM = 0.05
+MAX_CELL_KM = 50.0
+# Planar ring bounds are shrunk by this factor before pruning against haversine
+RING_MARGIN = 0.9
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def geohash(lat: float, lng: float, precision: int = 8) -> str:
+    """Standard base-32 geohash; 8 characters is a cell of about 38 m × 19 m."""
+    lat_lo, lat_hi, lng_lo, lng_hi = -90.0, 90.0, -180.0, 180.0
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        if even:
+            mid = (lng_lo + lng_hi) / 2
+            value = value * 2 + (lng >= mid)
+            lng_lo, lng_hi = (mid, lng_hi) if lng >= mid else (lng_lo, mid)
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            value = value * 2 + (lat >= mid)
+            lat_lo, lat_hi = (mid, lat_hi) if lat >= mid else (lat_lo, mid)
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_ALPHABET[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+
+class GridIndex:
+    """
+    Uniform grid over ``(lat, lng)`` points addressed by arbitrary hashable keys.
+
+    ``ref_lat`` fixes the longitude scale of the projection; pick the middle of
+    the area being indexed (``from_points`` does this).
+    """
+
+    def __init__(self, cell_km: float = DEFAULT_CELL_KM, ref_lat: float = 0.0):
+        self.cell_km = cell_km
+        self._ky = KM_PER_DEGREE_LAT / cell_km
+        self._kx = KM_PER_DEGREE_LNG * math.cos(math.radians(ref_lat)) / cell_km
+        self._cells: dict[tuple[int, int], dict[Hashable, tuple[float, float]]] = {}
+        self._where: dict[Hashable, tuple[int, int]] = {}
+        # Cell extent ever occupied; rings beyond it are empty
+        self._bounds: Optional[list[int]] = None
+
+    @classmethod
+    def from_points(
+        cls,
+        items: Iterable[tuple[Hashable, float, float]],
+        cell_km: Optional[float] = None,
+    ) -> "GridIndex":
+        """Build an index from ``(key, lat, lng)``; ``cell_km`` defaults to the point density."""
+        items = list(items)
+        ref_lat = sum(lat for _, lat, _ in items) / len(items) if items else 0.0
+        if cell_km is None:
+            cell_km = _auto_cell_km(items, ref_lat)
+        index = cls(cell_km=cell_km, ref_lat=ref_lat)
+        for key, lat, lng in items:
+            index.insert(key, lat, lng)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._where
+
+    def _cell(self, lat: float, lng: float) -> tuple[int, int]:
+        return math.floor(lng * self._kx), math.floor(lat * self._ky)
+
+    def insert(self, key: Hashable, lat: float, lng: float) -> None:
+        """Add ``key`` at ``(lat, lng)``, moving it if it is already indexed."""
+        if key in self._where:
+            self.remove(key)
+        cell = self._cell(lat, lng)
+        self._cells.setdefault(cell, {})[key] = (lat, lng)
+        self._where[key] = cell
+        cx, cy = cell
+        if self._bounds is None:
+            self._bounds = [cx, cx, cy, cy]
+        else:
+            b = self._bounds
+            b[0], b[1], b[2], b[3] = min(b[0], cx), max(b[1], cx), min(b[2], cy), max(b[3], cy)
+
+    def remove(self, key: Hashable) -> bool:
+        """Drop ``key``; returns ``False`` if it was not indexed."""
+        cell = self._where.pop(key, None)
+        if cell is None:
+            return False
+        bucket = self._cells[cell]
+        del bucket[key]
+        if not bucket:
+            del self._cells[cell]
+        return True
+
+    def nearest(self, lat: float, lng: float, k: int = 1) -> list[tuple[Hashable, float]]:
+        """Up to ``k`` ``(key, km)`` pairs closest to ``(lat, lng)``, nearest first."""
+        if k <= 0 or not self._where:
+            return []
+        k = min(k, len(self._where))
+        cx, cy = self._cell(lat, lng)
+        last_ring = self._last_ring(cx, cy)
+        found: list[tuple[float, Hashable]] = []
+        for ring in range(last_ring + 1):
+            for cell in _ring_cells(cx, cy, ring):
+                bucket = self._cells.get(cell)
+                if bucket:
+                    found.extend(
+                        (haversine(lat, lng, plat, plng), key) for key, (plat, plng) in bucket.items()
+                    )
+            if len(found) >= k:
+                found.sort(key=lambda item: item[0])
+                del found[k:]
+                # Anything outside rings 0..ring is at least ``ring`` cells away
+                if found[-1][0] <= ring * self.cell_km * RING_MARGIN:
+                    break
+        found.sort(key=lambda item: item[0])
+        return [(key, dist) for dist, key in found[:k]]
+
+    def within(self, lat: float, lng: float, radius_km: float) -> list[tuple[Hashable, float]]:
+        """All ``(key, km)`` pairs within ``radius_km`` of ``(lat, lng)``, nearest first."""
+        if radius_km < 0 or not self._where:
+            return []
+        cx, cy = self._cell(lat, lng)
+        reach = min(math.ceil(radius_km / (self.cell_km * RING_MARGIN)), self._last_ring(cx, cy))
+        hits = []
+        for x in range(cx - reach, cx + reach + 1):
+            for y in range(cy - reach, cy + reach + 1):
+                for key, (plat, plng) in self._cells.get((x, y), {}).items():
+                    dist = haversine(lat, lng, plat, plng)
+                    if dist <= radius_km:
+                        hits.append((key, dist))
+        hits.sort(key=lambda item: item[1])
+        return hits
+
+    def _last_ring(self, cx: int, cy: int) -> int:
+        min_x, max_x, min_y, max_y = self._bounds
+        return max(cx - min_x, max_x - cx, cy - min_y, max_y - cy, 0)
+
+
+def _ring_cells(cx: int, cy: int, ring: int):
+    if ring == 0:
+        yield cx, cy
+        return
+    for x in range(cx - ring, cx + ring + 1):
+        yield x, cy - ring
+        yield x, cy + ring
+    for y in range(cy - ring + 1, cy + ring):
+        yield cx - ring, y
+        yield cx + ring, y
+
+
+def _auto_cell_km(items, ref_lat) -> float:
+    if len(items) < 2:
+        return DEFAULT_CELL_KM
+    lats = [lat for _, lat, _ in items]
+    lngs = [lng for _, _, lng in items]
+    height = (max(lats) - min(lats)) * KM_PER_DEGREE_LAT
+    width = (max(lngs) - min(lngs)) * KM_PER_DEGREE_LNG * math.cos(math.radians(ref_lat))
+    area = max(height, MIN_CELL_KM) * max(width, MIN_CELL_KM)
+    cell = math.sqrt(area * POINTS_PER_CELL / len(items))
+    return min(max(cell, MIN_CELL_KM), MAX_CELL_KM)
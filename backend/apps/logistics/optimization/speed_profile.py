@@ -0,0 +1,211 @@
+"""
+Travel speed and service time learned from visited stops.
+
+Completed routes are mined into tables keyed by zone (the geohash cell of a
+stop) × hour of the week (0 = Monday 00:00–01:00 local time): average speed of
+the legs driven into the zone, in straight-line km/h, and average time spent at
+its stops. The speed is the ratio of summed km to summed hours, so long legs
+weigh more than short ones.
+
+Building is vectorized and needs NumPy; lookups work on plain ``array``s so
+that a loaded profile answers with a dict lookup and two index reads. Buckets
+with fewer than ``min_samples`` observations fall back to the zone over all
+hours, then the hour over all zones, then the overall average.
+"""
+import math
+import struct
+import zlib
+from array import array
+from datetime import datetime
+from typing import Callable, NamedTuple, Optional, Sequence
+
+from apps.logistics.optimization.distance import EARTH_RADIUS_KM, np
+from apps.logistics.optimization.spatial import geohash
+
+HOURS_PER_WEEK = 7 * 24
+DEFAULT_PRECISION = 5  # about 4.9 km × 4.9 km
+DEFAULT_MIN_SAMPLES = 5
+# Legs outside these bounds are GPS noise, breaks or data-entry mistakes
+MIN_LEG_KM = 0.05
+MIN_SPEED_KMH = 1.0
+MAX_SPEED_KMH = 130.0
+MAX_SERVICE_S = 2 * 3600.0
+_FORMAT_VERSION = 1
+
+
+class Visit(NamedTuple):
+    """A visited stop; times are epoch seconds, hours are local hour of the week."""
+
+    route: str
+    lat: float
+    lng: float
+    arrived_s: float
+    departed_s: float
+    arrived_hour: int
+    departed_hour: int
+
+
+def hour_of_week(local: datetime) -> int:
+    return local.weekday() * 24 + local.hour
+
+
+def week_seconds(local: datetime) -> float:
+    """Seconds since the start of ``local``'s week."""
+    return (local.weekday() * 24 + local.hour) * 3600.0 + local.minute * 60.0 + local.second
+
+
+class SpeedProfile:
+    """Speed (km/h) and service (s) tables; ``NaN`` marks buckets without enough samples."""
+
+    def __init__(
+        self,
+        zones: Sequence[str],
+        precision: int,
+        speed: array,
+        service: array,
+        legs: int = 0,
+        visits: int = 0,
+    ):
+        self.zones = list(zones)
+        self.precision = precision
+        # Per zone × hour, then per zone, then per hour, then overall
+        self.speed = speed
+        self.service = service
+        self.legs = legs
+        self.visits = visits
+        self._zone_index = {zone: i for i, zone in enumerate(self.zones)}
+
+    # ─── Building ──────────────────────────────────────────────────────────
+
+    @classmethod
+    def build(
+        cls,
+        visits: Sequence[Visit],
+        precision: int = DEFAULT_PRECISION,
+        min_samples: int = DEFAULT_MIN_SAMPLES,
+    ) -> "SpeedProfile":
+        """
+        Learn a profile from ``visits`` listed in visiting order within each
+        route. A leg runs from one visit's departure to the next visit's arrival
+        on the same route; a stop's service time is its departure minus arrival.
+        """
+        if np is None:
+            raise ImportError("Building a speed profile requires NumPy.")
+        if not visits:
+            empty = [math.nan] * (HOURS_PER_WEEK + 1)
+            return cls([], precision, array("f", empty), array("f", empty))
+        route, lat, lng, arrived, departed, arrived_hour, departed_hour = (
+            np.asarray(column) for column in zip(*visits)
+        )
+        cells = [geohash(a, b, precision) for a, b in zip(lat, lng)]
+        zones, zone = np.unique(cells, return_inverse=True)
+
+        same = route[1:] == route[:-1]
+        km = _haversine_km(lat[:-1], lng[:-1], lat[1:], lng[1:])
+        hours = (arrived[1:] - departed[:-1]) / 3600.0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            speed = km / hours
+        keep = same & (km >= MIN_LEG_KM) & (speed >= MIN_SPEED_KMH) & (speed <= MAX_SPEED_KMH)
+        # Legs are filed under the zone driven into, at the hour the driver set off
+        leg_zone, leg_hour = zone[1:][keep], departed_hour[:-1][keep]
+        speed_table = _ratio_tables(leg_zone, leg_hour, km[keep], hours[keep], len(zones), min_samples)
+
+        service = departed - arrived
+        kept = (service > 0) & (service <= MAX_SERVICE_S)
+        service_table = _ratio_tables(
+            zone[kept], arrived_hour[kept], service[kept], np.ones(kept.sum()), len(zones), min_samples
+        )
+        return cls(
+            zones.tolist(),
+            precision,
+            array("f", speed_table.astype(np.float32).tobytes()),
+            array("f", service_table.astype(np.float32).tobytes()),
+            legs=int(keep.sum()),
+            visits=int(kept.sum()),
+        )
+
+    # ─── Storage ───────────────────────────────────────────────────────────
+
+    def dumps(self) -> bytes:
+        """Compressed float32 tables; the zones are stored alongside, see ``loads``."""
+        header = struct.pack("<BBII", _FORMAT_VERSION, self.precision, self.legs, self.visits)
+        return zlib.compress(header + self.speed.tobytes() + self.service.tobytes())
+
+    @classmethod
+    def loads(cls, zones: Sequence[str], data: bytes) -> "SpeedProfile":
+        raw = zlib.decompress(data)
+        version, precision, legs, visits = struct.unpack_from("<BBII", raw)
+        if version != _FORMAT_VERSION:
+            raise ValueError(f"Unsupported speed profile format {version}.")
+        tables = array("f")
+        tables.frombytes(raw[struct.calcsize("<BBII"):])
+        half = len(tables) // 2
+        return cls(zones, precision, tables[:half], tables[half:], legs=legs, visits=visits)
+
+    # ─── Lookups ───────────────────────────────────────────────────────────
+
+    def zone(self, lat: float, lng: float) -> Optional[int]:
+        return self._zone_index.get(geohash(lat, lng, self.precision))
+
+    def speed_kmh(self, lat: float, lng: float, hour: int) -> Optional[float]:
+        """Expected speed of a leg into ``(lat, lng)`` leaving at ``hour``; ``None`` if nothing was learned."""
+        return self._lookup(self.speed, self.zone(lat, lng), hour % HOURS_PER_WEEK)
+
+    def service_s(self, lat: float, lng: float, hour: int) -> Optional[float]:
+        return self._lookup(self.service, self.zone(lat, lng), hour % HOURS_PER_WEEK)
+
+    def pace(
+        self, points: Sequence[tuple[float, float]], start: datetime, speed_kmh: float
+    ) -> Callable[[int, float, float, float], tuple[float, float]]:
+        """
+        Adjustment for ``eta.arrivals`` over stops at ``points``, starting at
+        local time ``start``: legs planned at ``speed_kmh`` are rescaled to the
+        learned speed, and learned service times replace the planned ones.
+        """
+        zones = [self.zone(lat, lng) for lat, lng in points]
+        offset = week_seconds(start)
+
+        def adjust(k: int, clock: float, leg: float, service: float) -> tuple[float, float]:
+            hour = int((offset + clock) // 3600) % HOURS_PER_WEEK
+            learned_speed = self._lookup(self.speed, zones[k], hour)
+            learned_service = self._lookup(self.service, zones[k], hour)
+            if learned_speed:
+                leg = leg * speed_kmh / learned_speed
+            return leg, service if learned_service is None else learned_service
+
+        return adjust
+
+    def _lookup(self, table: array, zone: Optional[int], hour: int) -> Optional[float]:
+        n = len(self.zones)
+        candidates = [n * HOURS_PER_WEEK + n + hour, len(table) - 1]
+        if zone is not None:
+            candidates[:0] = [zone * HOURS_PER_WEEK + hour, n * HOURS_PER_WEEK + zone]
+        for index in candidates:
+            value = table[index]
+            if not math.isnan(value):
+                return value
+        return None
+
+
+def _ratio_tables(zone, hour, numerator, denominator, n_zones: int, min_samples: int):
+    """``sum(numerator) / sum(denominator)`` per zone × hour, zone, hour and overall, concatenated."""
+    groups = (
+        (zone * HOURS_PER_WEEK + hour, n_zones * HOURS_PER_WEEK, min_samples),
+        (zone, n_zones, min_samples),
+        (hour, HOURS_PER_WEEK, min_samples),
+        (np.zeros_like(zone), 1, 1),
+    )
+    parts = []
+    for group, length, needed in groups:
+        count = np.bincount(group, minlength=length)
+        top = np.bincount(group, weights=numerator, minlength=length)
+        bottom = np.bincount(group, weights=denominator, minlength=length)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            parts.append(np.where(count >= needed, top / bottom, np.nan))
+    return np.concatenate(parts)
+
+
+def _haversine_km(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lng1, lat2, lng2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
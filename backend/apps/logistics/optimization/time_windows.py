@@ -0,0 +1,334 @@
+"""
+Time-window aware stop sequencing (VRPTW-style, single vehicle).
+
+Times are seconds from the route start. Arriving early means waiting for the
+window to open; arriving after it closes is lateness. The objective is
+``distance_km + lateness_weight * lateness_minutes``, so windows behave as soft
+constraints that are only broken when no on-time sequence is found.
+
+Local search keeps the schedule of the current tour as prefix arrays. A
+candidate move only changes the tour from some position ``p`` onward, so it is
+priced by replaying the schedule from ``p`` and abandoning the replay as soon as
+its running cost reaches the current best.
+"""
+import math
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Sequence
+
+from apps.logistics.optimization import anytime
+from apps.logistics.optimization.distance import DistanceMatrix
+from apps.logistics.optimization.precedence import Precedence
+
+MODE = "windows"
+EPSILON = 1e-9
+# Moves are only tried where they create an edge to one of a point's K nearest neighbors
+NEIGHBORHOOD_SIZE = 12
+LATE_PENALTY = 10.0
+URGENCY_HORIZON = 3600.0
+
+
+@dataclass
+class TimeWindows:
+    """Per-point service windows and service durations, in seconds from route start."""
+
+    earliest: list[float]
+    latest: list[float]
+    service: list[float]
+
+    @classmethod
+    def from_stops(cls, stops: Sequence, start: datetime, service_minutes: float) -> "TimeWindows":
+        """PICKUP stops use the order's pickup window, DROP stops its drop window."""
+        from apps.logistics.models import Stop
+
+        earliest, latest = [], []
+        for stop in stops:
+            order = stop.order
+            if stop.type == Stop.StopType.PICKUP:
+                opens, closes = order.pickup_window_start, order.pickup_window_end
+            else:
+                opens, closes = order.drop_window_start, order.drop_window_end
+            earliest.append(max((opens - start).total_seconds(), 0.0) if opens else 0.0)
+            latest.append((closes - start).total_seconds() if closes else math.inf)
+        return cls(earliest, latest, [service_minutes * 60.0] * len(stops))
+
+
+@dataclass
+class ScheduleResult:
+    tour: list[int]
+    arrivals: list[float]  # service start per tour position, seconds from route start
+    distance_km: float
+    lateness_s: float
+    violations: int
+
+
+class WindowedRoute:
+    """Prices tours against time windows for one vehicle."""
+
+    def __init__(
+        self,
+        matrix: DistanceMatrix,
+        windows: TimeWindows,
+        speed_kmh: float,
+        lateness_weight: float,
+    ):
+        self.matrix = matrix
+        self.d = matrix.rows
+        self.windows = windows
+        self.seconds_per_km = 3600.0 / speed_kmh
+        self.lateness_weight = lateness_weight / 60.0  # per second
+
+    def schedule(self, tour: Sequence[int]) -> ScheduleResult:
+        earliest, latest, service = self.windows.earliest, self.windows.latest, self.windows.service
+        d, spk = self.d, self.seconds_per_km
+        arrivals, distance, lateness, violations = [], 0.0, 0.0, 0
+        clock, prev = 0.0, None
+        for point in tour:
+            if prev is not None:
+                leg = d[prev][point]
+                distance += leg
+                clock += leg * spk
+            clock = max(clock, earliest[point])
+            late = clock - latest[point]
+            if late > 0:
+                lateness += late
+                violations += 1
+            arrivals.append(clock)
+            clock += service[point]
+            prev = point
+        return ScheduleResult(list(tour), arrivals, distance, lateness, violations)
+
+    def cost(self, result: ScheduleResult) -> float:
+        return result.distance_km + self.lateness_weight * result.lateness_s
+
+
+def construct(route: WindowedRoute, precedence: Optional[Precedence] = None) -> list[int]:
+    """
+    Time-aware nearest neighbor: the next stop minimises travel time + waiting,
+    plus an urgency term for stops whose window closes within ``URGENCY_HORIZON``
+    (all in seconds); any lateness counts ``LATE_PENALTY`` times.
+    """
+    d, spk = route.d, route.seconds_per_km
+    earliest, latest, service = route.windows.earliest, route.windows.latest, route.windows.service
+    n = len(earliest)
+    waiting = [len(p) for p in precedence.predecessors] if precedence else [0] * n
+    ready = [i for i in range(n) if waiting[i] == 0]
+
+    tour, clock, prev = [], 0.0, None
+    while ready:
+        best, best_score, best_start = None, math.inf, 0.0
+        for point in ready:
+            travel = d[prev][point] * spk if prev is not None else 0.0
+            arrival = clock + travel
+            start = max(arrival, earliest[point])
+            slack = latest[point] - start
+            score = travel + (start - arrival)
+            if slack < 0:
+                score -= slack * LATE_PENALTY
+            elif slack < URGENCY_HORIZON:
+                score += URGENCY_HORIZON - slack
+            if score < best_score:
+                best, best_score, best_start = point, score, start
+        ready.remove(best)
+        tour.append(best)
+        clock, prev = best_start + service[best], best
+        if precedence:
+            for after in precedence.successors[best]:
+                waiting[after] -= 1
+                if waiting[after] == 0:
+                    ready.append(after)
+    if len(tour) != n:
+        raise ValueError("Precedence constraints are cyclic.")
+    return tour
+
+
+class _LocalSearch:
+    """
+    Relocate (Or-opt) and 2-opt moves priced by replaying the changed part of
+    the schedule. Once a candidate rejoins the unchanged tail of the current
+    tour, the tail's forward slack tells whether its lateness can change; if
+    not, the rest of the cost is read off the prefix arrays instead of replayed.
+    """
+
+    def __init__(
+        self,
+        route: WindowedRoute,
+        tour: list[int],
+        precedence: Optional[Precedence],
+        neighbors: list[list[int]],
+    ):
+        self.route = route
+        self.precedence = precedence
+        self.neighbors = neighbors
+        self._load(tour)
+
+    def _load(self, tour: list[int]) -> None:
+        """Recompute per-position arrival, departure, cumulative distance/lateness and slack."""
+        w = self.route
+        earliest, latest, service = w.windows.earliest, w.windows.latest, w.windows.service
+        n = len(tour)
+        self.tour = tour
+        self.positions = [0] * n
+        self.arrive, self.depart, self.dist, self.late = [0.0] * n, [0.0] * n, [0.0] * n, [0.0] * n
+        clock = distance = lateness = 0.0
+        prev = None
+        for pos, point in enumerate(tour):
+            self.positions[point] = pos
+            if prev is not None:
+                leg = w.d[prev][point]
+                distance += leg
+                clock += leg * w.seconds_per_km
+            self.arrive[pos] = clock
+            if clock < earliest[point]:
+                clock = earliest[point]
+            if clock > latest[point]:
+                lateness += clock - latest[point]
+            clock += service[point]
+            self.depart[pos], self.dist[pos], self.late[pos] = clock, distance, lateness
+            prev = point
+        # slack[q]: how much later tour[q] could be reached without adding lateness downstream
+        self.slack = [0.0] * (n + 1)
+        self.slack[n] = math.inf
+        for pos in range(n - 1, -1, -1):
+            point = tour[pos]
+            arrival = self.arrive[pos]
+            wait = max(earliest[point] - arrival, 0.0)
+            self.slack[pos] = max(min(latest[point] - arrival, wait + self.slack[pos + 1]), 0.0)
+        self.best = distance + w.lateness_weight * lateness
+
+    def _price(self, p: int, changed: list[int], q: int) -> float:
+        """
+        Cost of ``tour[:p] + changed + tour[q:]``, or ``inf`` once it can no
+        longer beat ``best``.
+        """
+        w = self.route
+        d, spk, weight = w.d, w.seconds_per_km, w.lateness_weight
+        earliest, latest, service = w.windows.earliest, w.windows.latest, w.windows.service
+        tour = self.tour
+        n = len(tour)
+        clock, distance, lateness = self.depart[p - 1], self.dist[p - 1], self.late[p - 1]
+        prev = tour[p - 1]
+        bound = self.best - EPSILON
+        for pos, point in enumerate(changed, start=p):
+            leg = d[prev][point]
+            distance += leg
+            clock += leg * spk
+            if pos == q:
+                # Rejoined the unchanged tail: reuse its cost if its lateness can't change.
+                delay = clock - self.arrive[q]
+                tail_late = self.late[n - 1] - self.late[q - 1]
+                if delay <= self.slack[q] and (delay >= 0 or tail_late == 0):
+                    return distance + self.dist[n - 1] - self.dist[q] + weight * (lateness + tail_late)
+            if clock < earliest[point]:
+                clock = earliest[point]
+            if clock > latest[point]:
+                lateness += clock - latest[point]
+            if distance + weight * lateness >= bound:
+                return math.inf
+            clock += service[point]
+            prev = point
+        return distance + weight * lateness
+
+    def relocate_pass(self, max_segment: int = 3, exhaustive: bool = False) -> bool:
+        improved = False
+        n = len(self.tour)
+        for length in range(1, max_segment + 1):
+            i = 1
+            while i + length <= n:
+                tour, positions = self.tour, self.positions
+                if self.precedence:
+                    lo, hi = self.precedence.relocation_bounds(tour, positions, i, length)
+                else:
+                    lo, hi = 0, n - 1
+                segment = tour[i:i + length]
+                if exhaustive or self.late[i + length - 1] > self.late[i - 1]:
+                    # a late stop may need to jump far ahead: try every position
+                    candidates = range(lo, hi + 1)
+                else:
+                    # after a neighbor of the segment's first point, or before one of its last
+                    candidates = {positions[x] for x in self.neighbors[segment[0]]}
+                    candidates.update(positions[y] - 1 for y in self.neighbors[segment[-1]])
+                    candidates = sorted(candidates)
+                for j in candidates:
+                    if j < lo or j > hi or i - 1 <= j < i + length:
+                        continue
+                    if j < i:
+                        p, q = j + 1, i + length
+                        changed = segment + tour[j + 1:i] + tour[q:]
+                    else:
+                        p, q = i, j + 1
+                        changed = tour[i + length:q] + segment + tour[q:]
+                    if self._price(p, changed, q) < self.best - EPSILON:
+                        self._load(tour[:p] + changed)
+                        improved = True
+                        break
+                i += 1
+        return improved
+
+    def two_opt_pass(self) -> bool:
+        improved = False
+        n = len(self.tour)
+        for i in range(1, n - 1):
+            tour, positions = self.tour, self.positions
+            # Reversals tour[i..k] stay feasible only up to the first blocked k.
+            limit = n
+            if self.precedence:
+                for k in range(i + 1, n):
+                    if self.precedence.blocks_reversal(positions, tour[k], i):
+                        limit = k
+                        break
+            # The reversal joins tour[i-1] to tour[k]; only try k among its neighbors.
+            for k in sorted(positions[c] for c in self.neighbors[tour[i - 1]]):
+                if k <= i or k >= limit:
+                    continue
+                changed = tour[i:k + 1][::-1] + tour[k + 1:]
+                if self._price(i, changed, k + 1) < self.best - EPSILON:
+                    self._load(tour[:i] + changed)
+                    improved = True
+                    break
+        return improved
+
+
+def improve(
+    route: WindowedRoute, tour: list[int], precedence: Optional[Precedence] = None
+) -> list[int]:
+    """Alternate relocate and 2-opt passes until neither improves the cost."""
+    if len(tour) < 3:
+        return list(tour)
+    search = _LocalSearch(route, list(tour), precedence, route.matrix.neighbors(NEIGHBORHOOD_SIZE))
+    while True:
+        while search.relocate_pass() | search.two_opt_pass():
+            pass
+        # Granular moves can stall with stops still late; widen the relocation
+        # neighborhood only then, and go back to cheap moves if it helped.
+        if search.late[-1] == 0 or not search.relocate_pass(exhaustive=True):
+            return search.tour
+
+
+def solve(
+    matrix: DistanceMatrix,
+    windows: TimeWindows,
+    precedence: Optional[Precedence] = None,
+    *,
+    speed_kmh: float,
+    lateness_weight: float,
+    deadline: Optional[float] = None,
+    on_progress: Optional[anytime.ProgressCallback] = None,
+) -> tuple[ScheduleResult, ScheduleResult]:
+    """
+    Return ``(constructed, improved)`` schedules; a ``deadline`` keeps improving
+    as in ``sequencing.solve``.
+    """
+    route = WindowedRoute(matrix, windows, speed_kmh, lateness_weight)
+    constructed = construct(route, precedence)
+    tour = improve(route, constructed, precedence)
+    if deadline is not None:
+        tour, _ = anytime.search(
+            tour,
+            cost=lambda t: route.cost(route.schedule(t)),
+            improve=lambda t: improve(route, t, precedence),
+            deadline=deadline,
+            precedence=precedence,
+            on_progress=on_progress,
+        )
+    return route.schedule(constructed), route.schedule(tour)
@@ -0,0 +1,96 @@
+"""
+Two-level cache of pairwise travel distance and time.
+
+Entries are keyed on the geohash cells of the origin and destination, so
+depots and repeat customers hit the same key however their coordinates were
+rounded. The first level is an in-process LRU; the second is an optional
+shared ``store`` with Django's cache API (``get_many`` / ``set_many``, i.e.
+Redis in production), which lets other workers and later runs reuse results.
+Both levels are read in bulk: a lookup of any number of pairs costs at most one
+shared-store round trip.
+"""
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from apps.logistics.optimization.spatial import geohash
+
+DEFAULT_PRECISION = 8
+DEFAULT_MAXSIZE = 100_000
+
+Pair = tuple[str, str]
+Entry = tuple[float, float]  # (km, seconds)
+
+
+class TravelTimeCache:
+    def __init__(
+        self,
+        store=None,
+        *,
+        namespace: str = "travel",
+        precision: int = DEFAULT_PRECISION,
+        maxsize: int = DEFAULT_MAXSIZE,
+        timeout: Optional[float] = None,
+    ):
+        self.store = store
+        self.namespace = namespace
+        self.precision = precision
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._local: OrderedDict[Pair, Entry] = OrderedDict()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    def cell(self, lat: float, lng: float) -> str:
+        return geohash(lat, lng, self.precision)
+
+    def _key(self, pair: Pair) -> str:
+        return f"{self.namespace}:{pair[0]}:{pair[1]}"
+
+    def get_many(self, pairs: Iterable[Pair]) -> dict[Pair, Entry]:
+        """Cached ``(km, seconds)`` for the ``(origin_cell, destination_cell)`` pairs found."""
+        found, remote = {}, []
+        for pair in pairs:
+            entry = self._local.get(pair)
+            if entry is None:
+                remote.append(pair)
+            else:
+                self._local.move_to_end(pair)
+                found[pair] = entry
+        self.hits += len(found)
+        if remote and self.store is not None:
+            keys = {self._key(pair): pair for pair in remote}
+            for key, entry in self.store.get_many(list(keys)).items():
+                pair = keys[key]
+                found[pair] = entry = tuple(entry)
+                self._remember(pair, entry)
+                self.shared_hits += 1
+        self.misses += sum(1 for pair in remote if pair not in found)
+        return found
+
+    def set_many(self, entries: dict[Pair, Entry]) -> None:
+        for pair, entry in entries.items():
+            self._remember(pair, entry)
+        if entries and self.store is not None:
+            self.store.set_many(
+                {self._key(pair): entry for pair, entry in entries.items()}, timeout=self.timeout
+            )
+
+    def clear_local(self) -> None:
+        self._local.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.shared_hits + self.misses
+        return {
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.shared_hits) / lookups, 3) if lookups else 0.0,
+            "size": len(self._local),
+        }
+
+    def _remember(self, pair: Pair, entry: Entry) -> None:
+        self._local[pair] = entry
+        self._local.move_to_end(pair)
+        if len(self._local) > self.maxsize:
+            self._local.popitem(last=False)
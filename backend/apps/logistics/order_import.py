@@ -0,0 +1,104 @@
+"""
+Streaming readers for bulk order imports.
+
+Both formats are read one line at a time, so an upload of any size is held in
+memory only one chunk at a time by ``services.orders_import``. Each reader
+yields ``(line, data, error)``: ``data`` has the shape of
+``OrderCreateSerializer`` input, or ``error`` says why the line could not be
+read at all.
+
+- NDJSON: one order object per line, exactly as posted to ``/ops/orders/``.
+- CSV: one order per row with a header. Order columns keep their API names;
+  the pickup and drop stops are flattened into ``pickup_*`` and ``drop_*``
+  columns (``address_line``, ``city``, ``state``, ``postal_code``, ``lat``,
+  ``lng``, ``notes``). A stop is created for each side with an address line.
+"""
+import csv
+import io
+import json
+from typing import IO, Iterator, Optional
+
+FORMATS = ("csv", "ndjson")
+FORMAT_EXTENSIONS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+ORDER_COLUMNS = (
+    "reference_code",
+    "customer_name",
+    "customer_phone",
+    "customer_email",
+    "notes",
+    "weight_kg",
+    "pickup_window_start",
+    "pickup_window_end",
+    "drop_window_start",
+    "drop_window_end",
+)
+STOP_COLUMNS = ("address_line", "city", "state", "postal_code", "lat", "lng", "notes")
+# CSV stop prefix, stop type and sequence index within the order
+CSV_STOPS = (("pickup", "PICKUP", 1), ("drop", "DROP", 2))
+
+Row = tuple[int, Optional[dict], Optional[str]]
+
+
+def guess_format(filename: str) -> Optional[str]:
+    for extension, fmt in FORMAT_EXTENSIONS.items():
+        if filename.lower().endswith(extension):
+            return fmt
+    return None
+
+
+def read_rows(stream: IO, fmt: str) -> Iterator[Row]:
+    """Rows of a binary or text ``stream``; lines are numbered from 1, the CSV header included."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported import format '{fmt}'.")
+    if not isinstance(stream, io.TextIOBase):
+        stream = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    return _read_csv(stream) if fmt == "csv" else _read_ndjson(stream)
+
+
+def _read_ndjson(stream: IO) -> Iterator[Row]:
+    for line, text in enumerate(stream, start=1):
+        if not text.strip():
+            continue
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as e:
+            yield line, None, f"Invalid JSON: {e.msg}."
+            continue
+        if isinstance(data, dict):
+            yield line, data, None
+        else:
+            yield line, None, "Expected a JSON object."
+
+
+def _read_csv(stream: IO) -> Iterator[Row]:
+    reader = csv.DictReader(stream)
+    columns = set(reader.fieldnames or ())
+    missing = {"reference_code", "customer_name", "customer_phone"} - columns
+    if missing:
+        raise ValueError(f"Missing CSV columns: {', '.join(sorted(missing))}.")
+    while True:
+        try:
+            row = next(reader, None)
+        except csv.Error as e:
+            raise ValueError(f"Malformed CSV after line {reader.line_num}: {e}.") from e
+        if row is None:
+            return
+        if None in row:
+            yield reader.line_num, None, "More values than header columns."
+            continue
+        data = {column: row[column] for column in ORDER_COLUMNS if row.get(column)}
+        data["stops"] = [
+            {
+                "sequence_index": index,
+                "type": stop_type,
+                **{
+                    field: row[f"{prefix}_{field}"]
+                    for field in STOP_COLUMNS
+                    if row.get(f"{prefix}_{field}")
+                },
+            }
+            for prefix, stop_type, index in CSV_STOPS
+            if row.get(f"{prefix}_address_line")
+        ]
+        yield reader.line_num, data, None
@@ -1,28 +1,150 @@
 """Read-only query logic (selectors)."""
-from django.db.models import QuerySet, Prefetch
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
+from django.core.cache import cache
+from django.db.models import Count, QuerySet, Prefetch
 from django.utils import timezone
 
-from apps.logistics.models import Driver, Exception as LogisticsException, Order, Route, Vehicle
+from apps.logistics.models import (
+    Breadcrumb,
+    Driver,
+    Exception as LogisticsException,
+    OptimizationJob,
+    Order,
+    Route,
+    Stop,
+    Vehicle,
+)
+from apps.logistics.optimization import breadcrumbs
+from apps.logistics.optimization.spatial import GridIndex
 from apps.users.models import Tenant
 
 
+# Latest GPS ping per driver, ``(lat, lng, at)``, written by services.driver_record_location
+DRIVER_POSITION_KEY = "driver_position:{}"
+
+# List orderings; each ends in the primary key and matches a tenant-leading
+# composite index, so the ops lists can be keyset paginated on them
+DRIVER_LIST_ORDERING = ("name", "id")
+ORDER_LIST_ORDERING = ("-created_at", "-id")
+ROUTE_LIST_ORDERING = ("-route_date", "-id")
+EXCEPTION_LIST_ORDERING = ("-created_at", "-id")
+
+
 def driver_list(*, tenant: Tenant) -> QuerySet[Driver]:
-    return Driver.objects.filter(tenant=tenant, is_active=True).select_related("user")
+    return (
+        Driver.objects.filter(tenant=tenant, is_active=True)
+        .select_related("user")
+        .order_by(*DRIVER_LIST_ORDERING)
+    )
+
+
+def driver_positions(driver_ids) -> dict:
+    """Buffered ``(lat, lng, at)`` per driver id, including pings not yet written to the database."""
+    keys = {DRIVER_POSITION_KEY.format(driver_id): driver_id for driver_id in driver_ids}
+    return {keys[key]: position for key, position in cache.get_many(list(keys)).items()}
+
+
+def drivers_with_live_positions(drivers) -> list[Driver]:
+    """``drivers`` with buffered pings newer than their stored position applied in memory."""
+    drivers = list(drivers)
+    positions = driver_positions([d.id for d in drivers])
+    for driver in drivers:
+        position = positions.get(driver.id)
+        if position and (driver.location_updated_at is None or position[2] > driver.location_updated_at):
+            driver.current_lat, driver.current_lng, driver.location_updated_at = position
+    return drivers
+
+
+def drivers_near_order(*, order: Order, limit: int = 10, radius_km: float | None = None) -> list[dict]:
+    """
+    Active drivers of the order's tenant closest to its next open stop, as
+    ``{"driver", "distance_km"}`` dicts, nearest first.
+    """
+    stop = (
+        order.stops.filter(lat__isnull=False, lng__isnull=False)
+        .exclude(status__in=[Stop.StopStatus.COMPLETED, Stop.StopStatus.SKIPPED])
+        .order_by("sequence_index")
+        .first()
+    )
+    if stop is None:
+        raise ValueError("Order has no open stop with coordinates.")
+    drivers = {
+        driver.id: driver
+        for driver in drivers_with_live_positions(driver_list(tenant=order.tenant))
+        if driver.current_lat is not None and driver.current_lng is not None
+    }
+    index = GridIndex.from_points((d.id, d.current_lat, d.current_lng) for d in drivers.values())
+    if radius_km is None:
+        hits = index.nearest(stop.lat, stop.lng, limit)
+    else:
+        hits = index.within(stop.lat, stop.lng, radius_km)[:limit]
+    return [{"driver": drivers[key], "distance_km": round(km, 3)} for key, km in hits]
 
 
 def vehicle_list(*, tenant: Tenant) -> QuerySet[Vehicle]:
     return Vehicle.objects.filter(tenant=tenant, is_active=True)
 
 
-def order_list(*, tenant: Tenant) -> QuerySet[Order]:
+def order_list(
+    *,
+    tenant: Tenant,
+    statuses: Optional[list[str]] = None,
+    created_from: Optional[date] = None,
+    created_to: Optional[date] = None,
+    window_from: Optional[date] = None,
+    window_to: Optional[date] = None,
+    driver_id=None,
+    route_id=None,
+    city: Optional[str] = None,
+    postal_code: Optional[str] = None,
+    reference_prefix: Optional[str] = None,
+    phone_prefix: Optional[str] = None,
+) -> QuerySet[Order]:
+    """
+    The tenant's orders, newest first, narrowed by any combination of filters.
+    Date ranges are inclusive local days; the window is the drop window's
+    start. ``city`` matches any stop case-insensitively. Each filter has an
+    index behind it (``Order.Meta.indexes``, ``Stop.Meta.indexes``).
+    """
+    orders = Order.objects.filter(tenant=tenant)
+    if statuses:
+        orders = orders.filter(status__in=statuses)
+    if created_from:
+        orders = orders.filter(created_at__gte=_day_start(created_from))
+    if created_to:
+        orders = orders.filter(created_at__lt=_day_start(created_to + timedelta(days=1)))
+    if window_from:
+        orders = orders.filter(drop_window_start__gte=_day_start(window_from))
+    if window_to:
+        orders = orders.filter(drop_window_start__lt=_day_start(window_to + timedelta(days=1)))
+    if driver_id:
+        orders = orders.filter(assigned_route__driver_id=driver_id)
+    if route_id:
+        orders = orders.filter(assigned_route_id=route_id)
+    stop_filters = {}
+    if city:
+        stop_filters["city__iexact"] = city
+    if postal_code:
+        stop_filters["postal_code"] = postal_code
+    if stop_filters:
+        orders = orders.filter(id__in=Stop.objects.filter(**stop_filters).values("order_id"))
+    if reference_prefix:
+        orders = orders.filter(reference_code__startswith=reference_prefix)
+    if phone_prefix:
+        orders = orders.filter(customer_phone__startswith=phone_prefix)
     return (
-        Order.objects.filter(tenant=tenant)
-        .select_related("assigned_route__driver")
+        orders.select_related("assigned_route__driver")
         .prefetch_related("stops")
-        .order_by("-created_at")
+        .order_by(*ORDER_LIST_ORDERING)
     )
 
 
+def _day_start(day: date) -> datetime:
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
 def order_get(*, tenant: Tenant, order_id: str) -> Order:
     return (
         Order.objects.filter(tenant=tenant, id=order_id)
@@ -44,7 +166,7 @@ def route_list(*, tenant: Tenant) -> QuerySet[Route]:
         .prefetch_related(
             Prefetch("orders", queryset=Order.objects.prefetch_related("stops"))
         )
-        .order_by("-route_date")
+        .order_by(*ROUTE_LIST_ORDERING)
     )
 
 
@@ -59,14 +181,62 @@ def route_get(*, tenant: Tenant, route_id: str) -> Route:
     )
 
 
+def route_path(*, route: Route) -> str:
+    """
+    Encoded polyline of the driver's breadcrumbs from the route's start to its
+    end, or to now while it is in progress; empty before it starts.
+    """
+    if route.start_time is None:
+        return ""
+    end = route.end_time or timezone.now()
+    start_t, end_t = int(route.start_time.timestamp()), end.timestamp()
+    segments = Breadcrumb.objects.filter(
+        driver_id=route.driver_id,
+        day__range=(timezone.localdate(route.start_time), timezone.localdate(end)),
+    ).values_list("points", flat=True)
+    return breadcrumbs.polyline([
+        point
+        for data in segments
+        for point in breadcrumbs.decode(data)
+        if start_t <= point.t <= end_t
+    ])
+
+
+def route_plan_summary(*, tenant: Tenant, route_ids: list) -> QuerySet[Route]:
+    return (
+        Route.objects.filter(tenant=tenant, id__in=route_ids)
+        .select_related("driver", "vehicle")
+        .order_by("driver__name")
+    )
+
+
+def optimization_job_get(*, tenant: Tenant, job_id: str) -> OptimizationJob:
+    return OptimizationJob.objects.get(tenant=tenant, id=job_id)
+
+
 def exception_list(*, tenant: Tenant) -> QuerySet[LogisticsException]:
     return (
         LogisticsException.objects.filter(tenant=tenant)
         .select_related("order", "created_by")
-        .order_by("-created_at")
+        .order_by(*EXCEPTION_LIST_ORDERING)
     )
 
 
+def ops_stats(*, tenant: Tenant) -> dict:
+    """Tenant-wide counts for the ops dashboard, aggregated in the database rather than from list pages."""
+    orders = dict.fromkeys(Order.Status.values, 0)
+    for row in Order.objects.filter(tenant=tenant).values("status").annotate(n=Count("id")).order_by():
+        orders[row["status"]] = row["n"]
+    return {
+        "orders": orders,
+        "order_count": sum(orders.values()),
+        "open_exception_count": LogisticsException.objects.filter(
+            tenant=tenant, status=LogisticsException.ExceptionStatus.OPEN
+        ).count(),
+        "active_route_count": Route.objects.filter(tenant=tenant, status=Route.Status.IN_PROGRESS).count(),
+    }
+
+
 def driver_today_route(*, driver: Driver) -> Route | None:
     today = timezone.localdate()
     return (
@@ -1,9 +1,12 @@
 """Logistics serializers."""
+from django.conf import settings
 from rest_framework import serializers
 
+from apps.logistics import order_import
 from apps.logistics.models import (
     Driver,
     Exception as LogisticsException,
+    OptimizationJob,
     Order,
     OutboxMessage,
     POD,
@@ -12,6 +15,7 @@ from apps.logistics.models import (
     Stop,
     Vehicle,
 )
+from apps.logistics.optimization import sequencing, time_windows
 from apps.users.serializers import UserSerializer
 
 
@@ -102,6 +106,35 @@ class VehicleSerializer(serializers.ModelSerializer):
 
 # ─── Order ─────────────────────────────────────────────────────────────────
 
+class OrderListQuerySerializer(serializers.Serializer):
+    """Filters of the ops order list; keys match ``selectors.order_list``."""
+
+    status = serializers.CharField(required=False, source="statuses", help_text="Comma-separated statuses")
+    created_from = serializers.DateField(required=False)
+    created_to = serializers.DateField(required=False)
+    window_from = serializers.DateField(required=False, help_text="Drop window start, from this day")
+    window_to = serializers.DateField(required=False)
+    driver = serializers.UUIDField(required=False, source="driver_id")
+    route = serializers.UUIDField(required=False, source="route_id")
+    city = serializers.CharField(required=False, max_length=100)
+    postal_code = serializers.CharField(required=False, max_length=20)
+    reference = serializers.CharField(required=False, max_length=100, source="reference_prefix")
+    phone = serializers.CharField(required=False, max_length=30, source="phone_prefix")
+
+    def validate_status(self, value):
+        statuses = [s for s in value.split(",") if s]
+        unknown = set(statuses) - set(Order.Status.values)
+        if unknown:
+            raise serializers.ValidationError(f"Unknown status: {', '.join(sorted(unknown))}.")
+        return statuses
+
+    def validate(self, data):
+        for start, end in (("created_from", "created_to"), ("window_from", "window_to")):
+            if data.get(start) and data.get(end) and data[start] > data[end]:
+                raise serializers.ValidationError({end: f"Must not be before {start}."})
+        return data
+
+
 class OrderListSerializer(serializers.ModelSerializer):
     stops = StopSerializer(many=True, read_only=True)
     route_id = serializers.UUIDField(source="assigned_route_id", read_only=True, allow_null=True)
@@ -138,7 +171,7 @@ class OrderDetailSerializer(serializers.ModelSerializer):
             "stops", "status_history", "pod",
             "pickup_window_start", "pickup_window_end",
             "drop_window_start", "drop_window_end",
-            "notes", "created_at", "updated_at",
+            "weight_kg", "notes", "created_at", "updated_at",
         ]
 
     def get_driver_name(self, obj):
@@ -163,50 +196,153 @@ class OrderCreateSerializer(serializers.Serializer):
     pickup_window_end = serializers.DateTimeField(required=False, allow_null=True)
     drop_window_start = serializers.DateTimeField(required=False, allow_null=True)
     drop_window_end = serializers.DateTimeField(required=False, allow_null=True)
+    weight_kg = serializers.FloatField(required=False, default=0, min_value=0)
+
+
+class OrderImportSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    # Defaults to the file extension: .csv, or .ndjson / .jsonl
+    format = serializers.ChoiceField(choices=order_import.FORMATS, required=False)
+
+    def validate(self, attrs):
+        attrs.setdefault("format", order_import.guess_format(attrs["file"].name))
+        if not attrs["format"]:
+            raise serializers.ValidationError({"format": "Cannot tell the format from the file name."})
+        return attrs
 
 
 class OrderCancelSerializer(serializers.Serializer):
     reason = serializers.CharField(max_length=500)
 
 
+class OrderInsertionSerializer(serializers.Serializer):
+    route_date = serializers.DateField(required=False)
+    limit = serializers.IntegerField(default=5, min_value=1, max_value=100)
+    commit = serializers.BooleanField(default=False)
+
+
+class InsertionCandidateSerializer(serializers.Serializer):
+    route_id = serializers.UUIDField(source="route.id")
+    route_status = serializers.CharField(source="route.status")
+    driver_name = serializers.CharField(source="route.driver.name")
+    added_km = serializers.FloatField()
+    added_minutes = serializers.FloatField()
+    pickup_after_stop_id = serializers.UUIDField(allow_null=True)
+    drop_after_stop_id = serializers.UUIDField(allow_null=True)
+
+
+class NearbyDriversQuerySerializer(serializers.Serializer):
+    limit = serializers.IntegerField(default=10, min_value=1, max_value=100)
+    radius_km = serializers.FloatField(required=False, min_value=0)
+
+
+class NearbyDriverSerializer(serializers.Serializer):
+    driver = DriverSerializer()
+    distance_km = serializers.FloatField()
+
+
 # ─── Route ─────────────────────────────────────────────────────────────────
 
 class RouteListSerializer(serializers.ModelSerializer):
     driver = DriverSerializer(read_only=True)
     vehicle = VehicleSerializer(read_only=True)
     orders = OrderListSerializer(many=True, read_only=True)
-    order_count = serializers.SerializerMethodField()
+    order_count = serializers.IntegerField(read_only=True)
+    order_counts = serializers.DictField(child=serializers.IntegerField(), read_only=True)
 
     class Meta:
         model = Route
         fields = [
             "id", "route_date", "driver", "vehicle", "status",
-            "orders", "order_count", "start_time", "end_time", "created_at",
+            "orders", "order_count", "order_counts", "start_time", "end_time", "created_at",
         ]
 
-    def get_order_count(self, obj):
-        return obj.orders.count()
+
+class PlannedRouteSerializer(serializers.ModelSerializer):
+    driver = DriverSerializer(read_only=True)
+    vehicle = VehicleSerializer(read_only=True)
+    order_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Route
+        fields = [
+            "id", "route_date", "driver", "vehicle", "status",
+            "order_count", "optimization_summary",
+        ]
 
 
 class RouteDetailSerializer(serializers.ModelSerializer):
     driver = DriverSerializer(read_only=True)
     vehicle = VehicleSerializer(read_only=True)
     orders = OrderListSerializer(many=True, read_only=True)
+    order_count = serializers.IntegerField(read_only=True)
+    order_counts = serializers.DictField(child=serializers.IntegerField(), read_only=True)
+    # Encoded polyline of the driven path, set by the views that load it
+    path = serializers.CharField(read_only=True, default=None)
 
     class Meta:
         model = Route
         fields = [
             "id", "route_date", "driver", "vehicle", "status",
-            "orders", "start_time", "end_time", "notes", "created_at",
+            "orders", "order_count", "order_counts", "start_time", "end_time", "notes",
+            "optimization_summary", "created_at", "path",
         ]
 
 
+class OptimizeModeField(serializers.Field):
+    """Optimization mode name; booleans are still accepted for the old on/off flag."""
+
+    default_error_messages = {
+        "invalid_choice": '"{input}" is not a valid optimization mode.',
+    }
+
+    def to_internal_value(self, data):
+        if data in (True, "true", "True"):
+            return sequencing.DEFAULT_MODE
+        if data in (False, "false", "False", "", None):
+            return False
+        if not isinstance(data, str) or (data not in sequencing.MODES and data != time_windows.MODE):
+            self.fail("invalid_choice", input=data)
+        return data
+
+    def to_representation(self, value):
+        return value
+
+
 class RouteCreateSerializer(serializers.Serializer):
     route_date = serializers.DateField()
     driver_id = serializers.UUIDField()
     vehicle_id = serializers.UUIDField()
     order_ids = serializers.ListField(child=serializers.UUIDField(), min_length=1)
-    optimize = serializers.BooleanField(default=False)
+    optimize = OptimizeModeField(default=False)
+    service_minutes = serializers.FloatField(required=False, min_value=0)
+
+
+class RoutePlanSerializer(serializers.Serializer):
+    route_date = serializers.DateField()
+    driver_ids = serializers.ListField(child=serializers.UUIDField(), required=False)
+    vehicle_ids = serializers.ListField(child=serializers.UUIDField(), required=False)
+    optimize = OptimizeModeField(default=sequencing.DEFAULT_MODE)
+    service_minutes = serializers.FloatField(required=False, min_value=0)
+
+
+class OptimizationJobCreateSerializer(serializers.Serializer):
+    mode = serializers.ChoiceField(
+        choices=[*sequencing.MODES, time_windows.MODE], default="2opt"
+    )
+    time_budget_s = serializers.FloatField(
+        required=False, min_value=1, max_value=settings.ROUTE_OPTIMIZATION_MAX_BUDGET_S
+    )
+    service_minutes = serializers.FloatField(required=False, min_value=0)
+
+
+class OptimizationJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = OptimizationJob
+        fields = [
+            "id", "route", "mode", "status", "progress", "iterations", "best_cost",
+            "time_budget_s", "result", "error", "created_at", "started_at", "finished_at",
+        ]
 
 
 class RouteReorderSerializer(serializers.Serializer):
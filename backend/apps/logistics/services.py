@@ -1,29 +1,61 @@
 """Logistics business logic — write operations."""
 import hashlib
+import io
+import json
 import math
 import secrets
+import threading
 import uuid
-from datetime import datetime
-from typing import Optional
-
-from django.db import transaction
+from contextlib import contextmanager
+from collections import Counter
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from time import monotonic
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import BinaryField, Count, F, Func, JSONField, Max, Q, Value
 from django.utils import timezone
+from rest_framework.exceptions import ValidationError as DRFValidationError
+from rest_framework.serializers import as_serializer_error
 
+from apps.logistics import order_import
 from apps.logistics.models import (
+    Breadcrumb,
     Driver,
     Event,
     Exception as LogisticsException,
+    OptimizationJob,
     Order,
     OutboxMessage,
     POD,
     Route,
     StatusHistory,
     Stop,
+    TravelProfile,
     Vehicle,
 )
+from apps.logistics.optimization import (
+    batch, breadcrumbs, eta, insertion, planning, providers, repair, sequencing, time_windows,
+)
+from apps.logistics.optimization.distance import haversine as _haversine  # noqa: F401
+from apps.logistics.optimization.precedence import Precedence
+from apps.logistics.optimization.spatial import GridIndex
+from apps.logistics.optimization.speed_profile import SpeedProfile, Visit, hour_of_week
+from apps.logistics.selectors import DRIVER_POSITION_KEY, driver_positions
+from apps.logistics.serializers import OrderCreateSerializer
 from apps.users.models import Tenant, User
 
 
+BULK_BATCH_SIZE = 1000
+# Stop fields written after (re)sequencing a route
+SEQUENCED_STOP_FIELDS = ["sequence_index", "scheduled_eta"]
+VISITED_STOP_STATUSES = (Stop.StopStatus.COMPLETED, Stop.StopStatus.SKIPPED)
+DROPPED_ORDER_STATUSES = (Order.Status.CANCELLED, Order.Status.FAILED)
+ORDER_CHANGED_MESSAGE = "Order was changed by someone else; reload it and retry."
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Helpers
 # ─────────────────────────────────────────────────────────────────────────────
@@ -32,15 +64,46 @@ def _make_tracking_token() -> str:
     return secrets.token_urlsafe(32)
 
 
-def _haversine(lat1, lng1, lat2, lng2) -> float:
-    """Distance in km between two coordinates."""
-    R = 6371
-    dlat = math.radians(lat2 - lat1)
-    dlng = math.radians(lng2 - lng1)
-    a = math.sin(dlat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(
-        math.radians(lat2)
-    ) * math.sin(dlng / 2) ** 2
-    return 2 * R * math.asin(math.sqrt(a))
+# Backslash escapes of COPY's text format, where an unescaped ``\N`` is NULL
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _copy_rows(model, rows: list[dict]) -> None:
+    """
+    Write ``rows``, dicts of field attnames to values, to ``model``'s table
+    with one ``COPY ... FROM STDIN``. Missing fields get their defaults and
+    ``auto_now`` fields the current time, as in ``bulk_create``, but values
+    are written as ``str()`` gives them (JSON fields are dumped here) instead
+    of through each field's save-time conversions, which cost ``bulk_create``
+    more than the insert did. No signals, and execute wrappers do not see the
+    COPY, though the debug query log does.
+    """
+    if not rows:
+        return
+    now = timezone.now()
+    quote = connection.ops.quote_name
+    columns, data = [], []
+    for field in model._meta.concrete_fields:
+        name = field.attname
+        if field.has_default() and callable(field.default):
+            values = [row[name] if name in row else field.default() for row in rows]
+        else:
+            auto_now = getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False)
+            default = now if auto_now else field.get_default()
+            values = [row.get(name, default) for row in rows]
+        if isinstance(field, JSONField):
+            values = [None if value is None else json.dumps(value) for value in values]
+        columns.append(quote(field.column))
+        data.append([
+            "\\N" if value is None
+            else value.translate(_COPY_ESCAPES) if isinstance(value, str)
+            else str(value)
+            for value in values
+        ])
+    text = "".join("\t".join(row) + "\n" for row in zip(*data))
+    sql = f"COPY {quote(model._meta.db_table)} ({', '.join(columns)}) FROM STDIN"
+    with connection.cursor() as cursor:
+        cursor.copy_expert(sql, io.StringIO(text))
 
 
 def _nearest_neighbor_order(stops: list[Stop]) -> list[Stop]:
@@ -51,24 +114,78 @@ def _nearest_neighbor_order(stops: list[Stop]) -> list[Stop]:
     if len(with_coords) < 2:
         return stops
 
-    ordered = [with_coords.pop(0)]
-    while with_coords:
-        last = ordered[-1]
-        nearest = min(
-            with_coords,
-            key=lambda s: _haversine(last.lat, last.lng, s.lat, s.lng),
-        )
-        with_coords.remove(nearest)
-        ordered.append(nearest)
-
-    return ordered + without_coords
+    tour = sequencing.nearest_neighbor_path([(float(s.lat), float(s.lng)) for s in with_coords])
+    return [with_coords[i] for i in tour] + without_coords
+
+
+class _EventBuffer(threading.local):
+    events: Optional[list[Event]] = None
+
+
+_pending_events = _EventBuffer()
+
+
+@contextmanager
+def collect_events():
+    """
+    Unit of work for domain events, usable as a context manager or decorator.
+
+    Opens ``transaction.atomic``; events emitted inside are buffered and, just
+    before the block exits, written with one INSERT into ``events`` and one into
+    ``outbox_messages``. So they commit or roll back with the state changes
+    they describe, and a relay never sees an event before its writes.
+
+    Ordering: events are inserted in emission order, and ``created_at`` (which
+    the outbox is dispatched by) does not decrease along it; they follow every
+    other write of the unit. A nested ``collect_events`` shares the outer buffer
+    and discards its own events if it raises. A plain ``transaction.atomic``
+    savepoint rolled back inside the unit does not, so wrap blocks whose
+    failure is caught in ``collect_events`` instead.
+    """
+    buffer = _pending_events.events
+    if buffer is not None:
+        mark = len(buffer)
+        try:
+            with transaction.atomic():
+                yield
+        except BaseException:
+            del buffer[mark:]
+            raise
+        return
+
+    _pending_events.events = buffer = []
+    try:
+        with transaction.atomic():
+            yield
+            _write_events(buffer)
+    finally:
+        _pending_events.events = None
+
+
+def _write_events(events: list[Event]) -> None:
+    if not events:
+        return
+    now = timezone.now()
+    Event.objects.bulk_create(events, batch_size=BULK_BATCH_SIZE)
+    OutboxMessage.objects.bulk_create(
+        [OutboxMessage(event=event, next_attempt_at=now) for event in events],
+        batch_size=BULK_BATCH_SIZE,
+    )
 
 
 def _emit_event(tenant: Tenant, event_type: str, payload: dict) -> Event:
-    """Create Event + OutboxMessage in same transaction."""
-    event = Event.objects.create(tenant=tenant, type=event_type, payload=payload)
-    OutboxMessage.objects.create(event=event, next_attempt_at=timezone.now())
-    return event
+    """Create Event + OutboxMessage in same transaction; buffered inside ``collect_events``."""
+    return _emit_events_bulk(tenant, [(event_type, payload)])[0]
+
+
+def _emit_events_bulk(tenant: Tenant, events: list[tuple[str, dict]]) -> list[Event]:
+    """Create many Event + OutboxMessage rows with two INSERTs, or add them to the open unit of work."""
+    created = [Event(tenant=tenant, type=event_type, payload=payload) for event_type, payload in events]
+    if _pending_events.events is not None:
+        _pending_events.events.extend(created)
+    else:
+        _write_events(created)
+    return created
 
 
 def _record_status_history(
@@ -93,6 +210,96 @@ def _record_status_history(
     )
 
 
+def _transition_orders(orders: list[Order], to_status: str) -> list[tuple[Order, str]]:
+    """
+    Compare-and-set ``orders`` to ``to_status`` without locking them first.
+
+    Each order moves only if ``Order.VALID_TRANSITIONS`` allows it from the
+    status it was loaded with and its row still has that status, checked by a
+    conditional ``UPDATE ... WHERE status = <loaded status> RETURNING id``, one
+    per distinct loaded status. Moved orders are updated in memory and counted
+    on their routes; returns ``(order, from_status)`` for them only, so callers
+    write history and events for exactly the rows that changed. Orders changed
+    by someone else since they were loaded are left out, and the caller
+    decides whether that is an error.
+    """
+    groups: dict[str, list[Order]] = {}
+    for order in orders:
+        if order.can_transition_to(to_status):
+            groups.setdefault(order.status, []).append(order)
+    if not groups:
+        return []
+
+    now = timezone.now()
+    moved = []
+    # The ORM's update() only counts rows; RETURNING says which ones moved
+    quote = connection.ops.quote_name
+    sql = (
+        f"UPDATE {quote(Order._meta.db_table)} SET status = %s, updated_at = %s "
+        f"WHERE id = ANY(%s) AND status = %s RETURNING id"
+    )
+    with connection.cursor() as cursor:
+        for from_status, group in groups.items():
+            cursor.execute(sql, [to_status, now, [order.pk for order in group], from_status])
+            ids = {row[0] for row in cursor.fetchall()}
+            for order in group:
+                if order.pk in ids:
+                    order.status, order.updated_at = to_status, now
+                    moved.append((order, from_status))
+    _count_route_orders(
+        (order.assigned_route_id, from_status, to_status) for order, from_status in moved
+    )
+    return moved
+
+
+def _count_route_orders(moves: Iterable[tuple]) -> None:
+    """
+    Apply ``(route_id, from_status, to_status)`` order moves to the routes'
+    counters with one ``UPDATE ... SET n = n + delta`` per route, so
+    concurrent transitions add up. ``from_status`` is ``None`` for orders
+    joining a route; moves without a route are ignored.
+    """
+    deltas: dict = {}
+    for route_id, from_status, to_status in moves:
+        if route_id is None:
+            continue
+        delta = deltas.setdefault(route_id, Counter())
+        if from_status in Route.ORDER_COUNTERS:
+            delta[Route.ORDER_COUNTERS[from_status]] -= 1
+        if to_status in Route.ORDER_COUNTERS:
+            delta[Route.ORDER_COUNTERS[to_status]] += 1
+    for route_id, delta in deltas.items():
+        changes = {field: F(field) + n for field, n in delta.items() if n}
+        if changes:
+            Route.objects.filter(pk=route_id).update(**changes)
+
+
+def route_counters_reconcile(*, tenant: Optional[Tenant] = None) -> list[Route]:
+    """
+    Recount the orders of each route by status and rewrite the counters that
+    drifted, with one aggregate query and one ``bulk_update``. Returns the
+    repaired routes.
+    """
+    routes = Route.objects.all() if tenant is None else Route.objects.filter(tenant=tenant)
+    orders = Order.objects.filter(assigned_route__isnull=False, status__in=Route.ORDER_COUNTERS)
+    if tenant is not None:
+        orders = orders.filter(tenant=tenant)
+    actual: dict = {}
+    for row in orders.values("assigned_route_id", "status").annotate(n=Count("id")):
+        actual.setdefault(row["assigned_route_id"], {})[Route.ORDER_COUNTERS[row["status"]]] = row["n"]
+
+    fields = list(Route.ORDER_COUNTERS.values())
+    drifted = []
+    for route in routes.only("id", *fields).iterator():
+        counts = actual.get(route.id, {})
+        if any(getattr(route, field) != counts.get(field, 0) for field in fields):
+            for field in fields:
+                setattr(route, field, counts.get(field, 0))
+            drifted.append(route)
+    Route.objects.bulk_update(drifted, fields, batch_size=BULK_BATCH_SIZE)
+    return drifted
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Driver / Vehicle CRUD
 # ─────────────────────────────────────────────────────────────────────────────
@@ -128,7 +335,7 @@ def vehicle_create(
 # Order CRUD
 # ─────────────────────────────────────────────────────────────────────────────
 
-@transaction.atomic
+@collect_events()
 def order_create(
     *,
     tenant: Tenant,
@@ -142,6 +349,7 @@ def order_create(
     pickup_window_end=None,
     drop_window_start=None,
     drop_window_end=None,
+    weight_kg: float = 0,
     actor_user: Optional[User] = None,
 ) -> Order:
     if Order.objects.filter(tenant=tenant, reference_code=reference_code).exists():
@@ -159,6 +367,7 @@ def order_create(
         pickup_window_end=pickup_window_end,
         drop_window_start=drop_window_start,
         drop_window_end=drop_window_end,
+        weight_kg=weight_kg,
     )
 
     for stop_data in stops_data:
@@ -176,14 +385,139 @@ def order_create(
     return order
 
 
-@transaction.atomic
+def orders_import(
+    *,
+    tenant: Tenant,
+    rows: Iterable[order_import.Row],
+    actor_user: Optional[User] = None,
+    chunk_size: Optional[int] = None,
+) -> dict:
+    """
+    Create orders from ``order_import.read_rows`` output. Rows are validated
+    like single creates and written a chunk per transaction with one
+    ``COPY`` per table, so a chunk costs a fixed handful of queries
+    however many orders it holds. Invalid rows, including reference codes
+    already taken in the tenant or earlier in the file, are skipped and
+    reported by line.
+
+    Imports are partial: if the file stops being readable part-way, the rows
+    read so far stay committed and the report gains ``stopped``,
+    ``{"line": ..., "detail": ...}``, the first line not imported. Importing
+    the file from that line resumes it; re-importing all of it only reports
+    the orders already created as duplicates. A file unreadable from the
+    start raises ``ValueError`` with nothing written.
+    """
+    chunk_size = chunk_size or settings.ORDER_IMPORT_CHUNK_SIZE
+    report = {"rows": 0, "created": 0, "errors": []}
+    seen: set[str] = set()
+    chunk = []
+    rows = iter(rows)
+    line = 0
+    while True:
+        try:
+            row = next(rows, None)
+        except ValueError as e:
+            if not report["rows"]:
+                raise
+            report["stopped"] = {"line": line + 1, "detail": str(e)}
+            break
+        if row is None:
+            break
+        line = row[0]
+        report["rows"] += 1
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            _import_chunk(tenant, chunk, actor_user, seen, report)
+            chunk = []
+    if chunk:
+        _import_chunk(tenant, chunk, actor_user, seen, report)
+    return report
+
+
+def _import_chunk(
+    tenant: Tenant, chunk: list[order_import.Row], actor_user: Optional[User], seen: set[str], report: dict
+) -> None:
+    # One serializer validates every row: DRF deep-copies its fields per instance,
+    # which would cost more than the inserts
+    validator = OrderCreateSerializer()
+    valid = []
+    for line, data, error in chunk:
+        if error:
+            report["errors"].append({"line": line, "errors": {"non_field_errors": [error]}})
+            continue
+        try:
+            valid.append((line, validator.run_validation(data)))
+        except DRFValidationError as e:
+            report["errors"].append({"line": line, "errors": as_serializer_error(e)})
+
+    codes = [d["reference_code"] for _, d in valid]
+    taken = seen | set(
+        Order.objects.filter(tenant=tenant, reference_code__in=codes).values_list("reference_code", flat=True)
+    )
+    # Plain rows for _copy_rows: model instances cost more to build than to write
+    orders, stops = [], []
+    for line, d in valid:
+        code = d["reference_code"]
+        if code in taken:
+            report["errors"].append(
+                {"line": line, "errors": {"reference_code": [f"Order with reference '{code}' already exists."]}}
+            )
+            continue
+        taken.add(code)
+        order = {field: value for field, value in d.items() if field != "stops"}
+        order.update(id=uuid.uuid4(), tenant_id=tenant.pk, tracking_token=_make_tracking_token())
+        orders.append(order)
+        stops.extend({**stop_data, "order_id": order["id"]} for stop_data in d["stops"])
+    seen.update(taken)
+    if not orders:
+        return
+
+    now = timezone.now()
+    events = [
+        {
+            "id": uuid.uuid4(),
+            "tenant_id": tenant.pk,
+            "type": "order.created",
+            "payload": {"order_id": str(order["id"]), "reference_code": order["reference_code"]},
+            "created_at": now,
+        }
+        for order in orders
+    ]
+    # Each chunk commits, so it is never inside another unit of work; like
+    # collect_events it writes the events last, but by COPY as well
+    with transaction.atomic():
+        _copy_rows(Order, orders)
+        _copy_rows(Stop, stops)
+        _copy_rows(
+            StatusHistory,
+            [
+                {
+                    "tenant_id": tenant.pk,
+                    "order_id": order["id"],
+                    "actor_user_id": actor_user.pk if actor_user else None,
+                    "actor_type": StatusHistory.ActorType.OPS,
+                    "to_status": Order.Status.CREATED,
+                }
+                for order in orders
+            ],
+        )
+        _copy_rows(Event, events)
+        _copy_rows(OutboxMessage, [{"event_id": event["id"], "next_attempt_at": now} for event in events])
+    report["created"] += len(orders)
+
+
+@collect_events()
 def order_cancel(*, order: Order, reason: str, actor_user: Optional[User]) -> Order:
     if order.status not in Order.CANCELLABLE_STATUSES:
         raise ValueError(f"Cannot cancel order in status '{order.status}'.")
 
     prev = order.status
-    order.status = Order.Status.CANCELLED
-    order.save(update_fields=["status", "updated_at"])
+    if not _transition_orders([order], Order.Status.CANCELLED):
+        raise ValueError(ORDER_CHANGED_MESSAGE)
+    if order.assigned_route:
+        route_repair_sequence(
+            route=order.assigned_route, changed_stop_ids=order.stops.values_list("id", flat=True)
+        )
 
     _record_status_history(
         order=order,
@@ -201,7 +535,7 @@ def order_cancel(*, order: Order, reason: str, actor_user: Optional[User]) -> Or
 # Route management
 # ─────────────────────────────────────────────────────────────────────────────
 
-@transaction.atomic
+@collect_events()
 def route_create(
     *,
     tenant: Tenant,
@@ -209,68 +543,420 @@ def route_create(
     driver: Driver,
     vehicle: Vehicle,
     order_ids: list,
-    optimize: bool = False,
+    optimize: bool | str = False,
+    service_minutes: Optional[float] = None,
     actor_user: Optional[User] = None,
 ) -> Route:
+    """
+    Create a route and assign CREATED orders to it. Assignment, history and
+    events are set-based, so the query count does not grow with the route.
+
+    ``optimize`` is a mode from ``sequencing.MODES``, ``time_windows.MODE`` or
+    ``True`` for the default mode; the resulting distances are stored on
+    ``route.optimization_summary``.
+    """
     route = Route.objects.create(
         tenant=tenant,
         route_date=route_date,
         driver=driver,
         vehicle=vehicle,
+        assigned_count=len(order_ids),
     )
 
-    orders = Order.objects.filter(id__in=order_ids, tenant=tenant, status=Order.Status.CREATED)
-    if orders.count() != len(order_ids):
+    # One conditional UPDATE claims the orders; a short count means some were
+    # missing or already taken, and the transaction rolls back (counter included)
+    moved = Order.objects.filter(id__in=order_ids, tenant=tenant, status=Order.Status.CREATED).update(
+        assigned_route=route, status=Order.Status.ASSIGNED, updated_at=timezone.now()
+    )
+    if moved != len(order_ids):
         raise ValueError("One or more orders not found or not in CREATED status.")
 
-    for order in orders:
-        prev = order.status
-        order.assigned_route = route
-        order.status = Order.Status.ASSIGNED
-        order.save(update_fields=["assigned_route", "status", "updated_at"])
-        _record_status_history(
-            order=order,
-            from_status=prev,
-            to_status=Order.Status.ASSIGNED,
-            actor_user=actor_user,
-            actor_type=StatusHistory.ActorType.OPS,
-            metadata={"route_id": str(route.id)},
-        )
-        _emit_event(
-            tenant,
-            "order.status_changed",
-            {"order_id": str(order.id), "to_status": Order.Status.ASSIGNED},
-        )
+    StatusHistory.objects.bulk_create(
+        [
+            StatusHistory(
+                tenant=tenant,
+                order_id=order_id,
+                actor_user=actor_user,
+                actor_type=StatusHistory.ActorType.OPS,
+                from_status=Order.Status.CREATED,
+                to_status=Order.Status.ASSIGNED,
+                metadata={"route_id": str(route.id)},
+            )
+            for order_id in order_ids
+        ],
+        batch_size=BULK_BATCH_SIZE,
+    )
+    _emit_events_bulk(
+        tenant,
+        [
+            ("order.status_changed", {"order_id": str(order_id), "to_status": Order.Status.ASSIGNED})
+            for order_id in order_ids
+        ],
+    )
 
     if optimize:
-        _optimize_route_stops(route)
+        mode = sequencing.DEFAULT_MODE if optimize is True else optimize
+        route.optimization_summary = _optimize_route_stops(
+            route, mode=mode, service_minutes=service_minutes
+        )
+        route.save(update_fields=["optimization_summary", "updated_at"])
+    else:
+        route_update_etas(route=route, service_minutes=service_minutes)
 
     return route
 
 
-def _optimize_route_stops(route: Route) -> None:
-    """Re-sequence stops using nearest-neighbor heuristic."""
+def _route_start_time(route: Route) -> datetime:
+    """Actual start of the route, else the configured start of its day."""
+    if route.start_time:
+        return route.start_time
+    route_date = route.route_date
+    if isinstance(route_date, str):
+        route_date = date.fromisoformat(route_date)
+    hour, minute = map(int, settings.ROUTE_DAY_START.split(":"))
+    return timezone.make_aware(datetime.combine(route_date, time(hour, minute)))
+
+
+def _optimize_route_stops(
+    route: Route,
+    mode: str = sequencing.DEFAULT_MODE,
+    service_minutes: Optional[float] = None,
+) -> dict:
+    """
+    Re-sequence stops with an optimization mode and summarise the distances.
+
+    The ``windows`` mode schedules stops against their order's pickup/drop
+    windows; every mode writes the resulting ``Stop.scheduled_eta``.
+    """
     orders = route.orders.all().prefetch_related("stops")
     all_stops = []
     for order in orders:
         all_stops.extend(list(order.stops.all()))
 
-    optimized = _nearest_neighbor_order(all_stops)
-    for idx, stop in enumerate(optimized, start=1):
+    ordered, summary = _sequence_stops(
+        all_stops, mode=mode, start=_route_start_time(route), service_minutes=service_minutes
+    )
+    Stop.objects.bulk_update(ordered, SEQUENCED_STOP_FIELDS)
+    return summary
+
+
+def _sequence_stops(
+    stops: list[Stop],
+    *,
+    mode: str,
+    start: datetime,
+    service_minutes: Optional[float] = None,
+    deadline: Optional[float] = None,
+    on_progress=None,
+) -> tuple[list[Stop], dict]:
+    """
+    Order ``stops`` in memory (``stop.order`` must be loaded) and set their
+    ``sequence_index`` and ``scheduled_eta``; returns the ordered stops and a
+    distance summary. Nothing is written. ``deadline`` and ``on_progress`` are
+    passed to the solver for time-budgeted runs.
+    """
+    head, located, tail = _split_stops(stops)
+    solution = None
+    if len(located) >= 2:
+        problem = _route_problem("", located, mode=mode, start=start, service_minutes=service_minutes)
+        solution = batch.solve_problem(problem, deadline=deadline, on_progress=on_progress)
+    return _apply_solution(
+        head, located, tail, solution, mode=mode, start=start, service_minutes=service_minutes
+    )
+
+
+def _split_stops(stops: list[Stop]) -> tuple[list[Stop], list[Stop], list[Stop]]:
+    """
+    Split into ``(head, located, tail)``. Stops without coordinates can't be
+    placed by distance; pickups go ahead of and drops behind everything else so
+    per-order precedence still holds.
+    """
+    located = [s for s in stops if s.lat is not None and s.lng is not None]
+    unlocated = [s for s in stops if s.lat is None or s.lng is None]
+    head = [s for s in unlocated if s.type == Stop.StopType.PICKUP]
+    tail = [s for s in unlocated if s.type != Stop.StopType.PICKUP]
+    return head, located, tail
+
+
+def _route_problem(
+    key: str,
+    located: list[Stop],
+    *,
+    mode: str,
+    start: datetime,
+    service_minutes: Optional[float] = None,
+) -> batch.RouteProblem:
+    """Array-only description of sequencing ``located`` stops, safe to send to a worker process."""
+    problem = batch.RouteProblem(
+        key=key,
+        mode=mode,
+        points=[(s.lat, s.lng) for s in located],
+        precedence=Precedence.from_stops(located),
+        distance=settings.ROUTE_DISTANCE_PROVIDER,
+    )
+    if mode == time_windows.MODE:
+        if service_minutes is None:
+            service_minutes = settings.ROUTE_SERVICE_TIME_MINUTES
+        problem.windows = time_windows.TimeWindows.from_stops(located, start, service_minutes)
+        problem.speed_kmh = _typical_speed_kmh(located, start)
+        problem.lateness_weight = settings.ROUTE_LATENESS_WEIGHT
+    return problem
+
+
+def _apply_solution(
+    head: list[Stop],
+    located: list[Stop],
+    tail: list[Stop],
+    solution: Optional[batch.RouteSolution],
+    *,
+    mode: str,
+    start: datetime,
+    service_minutes: Optional[float] = None,
+) -> tuple[list[Stop], dict]:
+    """
+    Set ``sequence_index`` and ``scheduled_eta`` from ``solution``; nothing is
+    written. A ``windows`` solution's arrivals become the ETAs, so the lateness
+    and violations it reports are those of the schedule stored; other modes
+    are timed by ``_schedule_etas``.
+    """
+    summary = {"mode": mode, "distance_before_km": 0.0, "distance_after_km": 0.0}
+    if solution is not None:
+        if solution.arrivals is not None:
+            summary.update(
+                lateness_minutes=round(solution.lateness_s / 60, 1),
+                window_violations=solution.violations,
+            )
+        summary["distance_before_km"] = round(solution.distance_before_km, 3)
+        summary["distance_after_km"] = round(solution.distance_after_km, 3)
+        located = [located[i] for i in solution.tour]
+
+    ordered = head + located + tail
+    for idx, stop in enumerate(ordered, start=1):
         stop.sequence_index = idx
-        stop.save(update_fields=["sequence_index"])
+    if solution is not None and solution.arrivals is not None:
+        # Head and tail stops have no coordinates, hence no ETA
+        for stop in head + tail:
+            stop.scheduled_eta = None
+        for stop, arrival in zip(located, solution.arrivals):
+            stop.scheduled_eta = start + timedelta(seconds=arrival)
+    else:
+        _schedule_etas(ordered, start=start, service_minutes=service_minutes)
+    return ordered, summary
+
+
+@collect_events()
+def routes_plan(
+    *,
+    tenant: Tenant,
+    route_date,
+    drivers: Optional[list[Driver]] = None,
+    vehicles: Optional[list[Vehicle]] = None,
+    optimize: str = sequencing.DEFAULT_MODE,
+    service_minutes: Optional[float] = None,
+    actor_user: Optional[User] = None,
+) -> tuple[list[Route], list[Order]]:
+    """
+    Split the tenant's CREATED orders for ``route_date`` across drivers and vehicles.
+
+    Defaults to every active driver and vehicle without a route that day; the
+    largest vehicles are paired with drivers first. Orders are clustered per
+    vehicle respecting ``Vehicle.capacity_kg`` (0 means no limit) against
+    ``Order.weight_kg``, each cluster is sequenced with ``optimize``, and all
+    routes, assignments, stop sequences, history and events are written with
+    set-based statements. Returns the new routes and the orders left unassigned.
+    """
+    busy = Route.objects.filter(tenant=tenant, route_date=route_date).exclude(
+        status=Route.Status.CANCELLED
+    )
+    if drivers is None:
+        drivers = list(
+            Driver.objects.filter(tenant=tenant, is_active=True)
+            .exclude(id__in=busy.values("driver_id"))
+            .order_by("name")
+        )
+    if vehicles is None:
+        vehicles = list(
+            Vehicle.objects.filter(tenant=tenant, is_active=True)
+            .exclude(id__in=busy.values("vehicle_id"))
+        )
+    vehicles = sorted(vehicles, key=lambda v: v.capacity_kg or math.inf, reverse=True)
+    crews = list(zip(drivers, vehicles))
+    if not crews:
+        raise ValueError("No available driver/vehicle pairs for this date.")
+
+    orders = list(
+        Order.objects.filter(tenant=tenant, status=Order.Status.CREATED)
+        .exclude(pickup_window_start__date__gt=route_date)
+        .prefetch_related("stops")
+        .order_by("created_at")
+    )
+    points = []
+    for order in orders:
+        located = [(s.lat, s.lng) for s in order.stops.all() if s.lat is not None and s.lng is not None]
+        points.append(
+            (sum(p[0] for p in located) / len(located), sum(p[1] for p in located) / len(located))
+            if located else None
+        )
+    assignment = planning.cluster_orders(
+        points,
+        [o.weight_kg for o in orders],
+        [v.capacity_kg or math.inf for _, v in crews],
+    )
+
+    routes = [
+        Route(tenant=tenant, route_date=route_date, driver=driver, vehicle=vehicle)
+        for driver, vehicle in crews
+    ]
+    members: list[list[Order]] = [[] for _ in routes]
+    unassigned = []
+    for order, slot in zip(orders, assignment):
+        (members[slot] if slot >= 0 else unassigned).append(order)
+
+    sequenced = []
+    for route, route_orders in zip(routes, members):
+        if not route_orders:
+            continue
+        stops = [s for o in route_orders for s in o.stops.all()]
+        ordered, route.optimization_summary = _sequence_stops(
+            stops, mode=optimize, start=_route_start_time(route), service_minutes=service_minutes
+        )
+        sequenced.extend(ordered)
+    routes = [r for r, route_orders in zip(routes, members) if route_orders]
+    members = [m for m in members if m]
+    for route, route_orders in zip(routes, members):
+        route.assigned_count = len(route_orders)
+
+    Route.objects.bulk_create(routes)
+    for route, route_orders in zip(routes, members):
+        moved = Order.objects.filter(
+            id__in=[o.id for o in route_orders], status=Order.Status.CREATED
+        ).update(assigned_route=route, status=Order.Status.ASSIGNED, updated_at=timezone.now())
+        if moved != len(route_orders):
+            raise ValueError("Orders changed status while planning; please retry.")
+        for order in route_orders:
+            order.assigned_route = route
+            order.status = Order.Status.ASSIGNED
+    Stop.objects.bulk_update(sequenced, SEQUENCED_STOP_FIELDS, batch_size=BULK_BATCH_SIZE)
+
+    StatusHistory.objects.bulk_create(
+        [
+            StatusHistory(
+                tenant=tenant,
+                order=order,
+                actor_user=actor_user,
+                actor_type=StatusHistory.ActorType.OPS,
+                from_status=Order.Status.CREATED,
+                to_status=Order.Status.ASSIGNED,
+                metadata={"route_id": str(route.id), "planned": True},
+            )
+            for route, route_orders in zip(routes, members)
+            for order in route_orders
+        ],
+        batch_size=BULK_BATCH_SIZE,
+    )
+    _emit_events_bulk(
+        tenant,
+        [
+            ("order.status_changed", {"order_id": str(order.id), "to_status": Order.Status.ASSIGNED})
+            for route_orders in members
+            for order in route_orders
+        ],
+    )
+    return routes, unassigned
+
+
+def routes_optimize_day(
+    *,
+    tenant: Tenant,
+    route_date,
+    mode: str = sequencing.DEFAULT_MODE,
+    service_minutes: Optional[float] = None,
+    max_workers: Optional[int] = None,
+) -> list[Route]:
+    """
+    Re-sequence every PLANNED route of ``tenant`` on ``route_date``.
+
+    Routes are solved independently across a process pool (``max_workers=1``
+    keeps everything in-process) from array-only ``RouteProblem``s, then all
+    stops are written back with one ``bulk_update``. Routes that left PLANNED
+    or whose stops changed while solving are skipped. Returns the updated routes.
+    """
+    routes = {
+        r.id: r
+        for r in Route.objects.filter(tenant=tenant, route_date=route_date, status=Route.Status.PLANNED)
+    }
+    stops_by_route: dict = {route_id: [] for route_id in routes}
+    for stop in Stop.objects.filter(order__assigned_route__in=list(routes)).select_related("order"):
+        stops_by_route[stop.order.assigned_route_id].append(stop)
+
+    layouts, problems = {}, []
+    for route_id, stops in stops_by_route.items():
+        head, located, tail = _split_stops(stops)
+        layouts[route_id] = (head, located, tail)
+        if len(located) >= 2:
+            problems.append(_route_problem(
+                str(route_id),
+                located,
+                mode=mode,
+                start=_route_start_time(routes[route_id]),
+                service_minutes=service_minutes,
+            ))
+    solutions = {s.key: s for s in batch.solve_many(problems, max_workers=max_workers)}
+
+    with transaction.atomic():
+        locked = set(
+            Route.objects.select_for_update()
+            .filter(id__in=list(routes), status=Route.Status.PLANNED)
+            .values_list("id", flat=True)
+        )
+        current: dict = {route_id: set() for route_id in locked}
+        for stop_id, route_id in Stop.objects.filter(order__assigned_route__in=locked).values_list(
+            "id", "order__assigned_route"
+        ):
+            current[route_id].add(stop_id)
+
+        updated, sequenced = [], []
+        now = timezone.now()
+        for route_id, (head, located, tail) in layouts.items():
+            if route_id not in locked or current[route_id] != {s.id for s in stops_by_route[route_id]}:
+                continue
+            route = routes[route_id]
+            ordered, route.optimization_summary = _apply_solution(
+                head,
+                located,
+                tail,
+                solutions.get(str(route_id)),
+                mode=mode,
+                start=_route_start_time(route),
+                service_minutes=service_minutes,
+            )
+            route.updated_at = now
+            updated.append(route)
+            sequenced.extend(ordered)
+
+        Stop.objects.bulk_update(sequenced, SEQUENCED_STOP_FIELDS, batch_size=BULK_BATCH_SIZE)
+        Route.objects.bulk_update(updated, ["optimization_summary", "updated_at"], batch_size=BULK_BATCH_SIZE)
+        _invalidate_route_geometry(*(route.id for route in updated))
+    return updated
 
 
 @transaction.atomic
 def route_reorder_stops(*, route: Route, stop_order: list[str]) -> Route:
-    """Reorder stops by list of stop UUIDs."""
-    stops = {str(s.id): s for s in Stop.objects.filter(order__assigned_route=route)}
+    """
+    Reorder stops by list of stop UUIDs. The new indices and the ETAs they
+    imply are written together with one ``bulk_update``.
+    """
+    stops = {
+        str(s.id): s for s in Stop.objects.filter(order__assigned_route=route).select_related("order")
+    }
     for idx, stop_id in enumerate(stop_order, start=1):
         if stop_id not in stops:
             raise ValueError(f"Stop {stop_id} not on this route.")
-        stop = stops[stop_id]
-        stop.sequence_index = idx
-        stop.save(update_fields=["sequence_index"])
+        stops[stop_id].sequence_index = idx
+    ordered = sorted(stops.values(), key=lambda s: s.sequence_index)
+    _forecast_route(route, ordered)
+    Stop.objects.bulk_update(ordered, SEQUENCED_STOP_FIELDS, batch_size=BULK_BATCH_SIZE)
+    _invalidate_route_geometry(route.id)
     return route
 
 
@@ -278,9 +964,15 @@ def route_reorder_stops(*, route: Route, stop_order: list[str]) -> Route:
 def route_start(*, route: Route, actor_user: Optional[User]) -> Route:
     if route.status != Route.Status.PLANNED:
         raise ValueError("Route must be in PLANNED status to start.")
-    route.status = Route.Status.IN_PROGRESS
-    route.start_time = timezone.now()
-    route.save(update_fields=["status", "start_time", "updated_at"])
+    now = timezone.now()
+    started = Route.objects.filter(pk=route.pk, status=Route.Status.PLANNED).update(
+        status=Route.Status.IN_PROGRESS, start_time=now, updated_at=now
+    )
+    if not started:
+        raise ValueError("Route must be in PLANNED status to start.")
+    route.status, route.start_time, route.updated_at = Route.Status.IN_PROGRESS, now, now
+    route_update_etas(route=route)
+    _invalidate_route_geometry(route.id)
     return route
 
 
@@ -290,8 +982,25 @@ def order_reassign(
 ) -> Order:
     if order.status not in (Order.Status.ASSIGNED,):
         raise ValueError("Only ASSIGNED orders can be reassigned.")
+    source_route = order.assigned_route
+    stop_ids = list(order.stops.values_list("id", flat=True))
+    if target_route.status in ACTIVE_ROUTE_STATUSES:
+        try:
+            pickup, drop = _insertion_stops(order)
+        except ValueError:
+            pass  # no single located pickup/drop pair; the repair below still renumbers
+        else:
+            _invalidate_route_geometry(target_route.id)
+            _splice_order_stops(target_route, _route_geometry([target_route])[target_route.id], pickup, drop)
     order.assigned_route = target_route
     order.save(update_fields=["assigned_route", "updated_at"])
+    moves = [(target_route.id, None, Order.Status.ASSIGNED)]
+    if source_route:
+        moves.append((source_route.id, Order.Status.ASSIGNED, None))
+    _count_route_orders(moves)
+    if source_route:
+        route_repair_sequence(route=source_route, changed_stop_ids=stop_ids)
+    route_repair_sequence(route=target_route, changed_stop_ids=stop_ids)
     _record_status_history(
         order=order,
         from_status=Order.Status.ASSIGNED,
@@ -304,10 +1013,490 @@ def order_reassign(
 
 
 # ─────────────────────────────────────────────────────────────────────────────
-# Driver status update
+# Background optimization jobs
 # ─────────────────────────────────────────────────────────────────────────────
 
+# Minimum seconds between progress writes from a running job
+JOB_PROGRESS_INTERVAL_S = 1.0
+
+
 @transaction.atomic
+def optimization_job_create(
+    *,
+    tenant: Tenant,
+    route: Route,
+    mode: str = sequencing.DEFAULT_MODE,
+    time_budget_s: Optional[float] = None,
+    service_minutes: Optional[float] = None,
+    actor_user: Optional[User] = None,
+) -> OptimizationJob:
+    """Queue a background optimization of a PLANNED route; the task starts on commit."""
+    from apps.logistics.tasks import run_optimization_job
+
+    route = Route.objects.select_for_update().get(pk=route.pk)
+    if route.status != Route.Status.PLANNED:
+        raise ValueError("Only PLANNED routes can be optimized.")
+    if route.optimization_jobs.filter(status__in=OptimizationJob.ACTIVE_STATUSES).exists():
+        raise ValueError("An optimization job is already running for this route.")
+
+    job = OptimizationJob.objects.create(
+        tenant=tenant,
+        route=route,
+        mode=mode,
+        time_budget_s=time_budget_s or settings.ROUTE_OPTIMIZATION_BUDGET_S,
+        service_minutes=service_minutes,
+        requested_by=actor_user,
+    )
+    transaction.on_commit(lambda: run_optimization_job.delay(str(job.id)))
+    return job
+
+
+def optimization_job_run(*, job: OptimizationJob) -> OptimizationJob:
+    """
+    Run a QUEUED job: search for the best sequence until the budget runs out,
+    then apply it in a short transaction. The search itself holds no locks; if
+    the route's stops changed meanwhile the result is discarded.
+    """
+    from apps.logistics.tasks import broadcast_route_update
+
+    claimed = OptimizationJob.objects.filter(
+        pk=job.pk, status=OptimizationJob.Status.QUEUED
+    ).update(status=OptimizationJob.Status.RUNNING, started_at=timezone.now())
+    if not claimed:
+        return job
+    deadline = monotonic() + job.time_budget_s
+    route = job.route
+    progress = {"iterations": 0, "best_cost": None, "reported_at": 0.0}
+
+    def report(fraction: float, iterations: int, best_cost: float) -> None:
+        progress.update(iterations=iterations, best_cost=best_cost)
+        now = monotonic()
+        if now - progress["reported_at"] >= JOB_PROGRESS_INTERVAL_S:
+            progress["reported_at"] = now
+            OptimizationJob.objects.filter(pk=job.pk).update(
+                progress=round(fraction, 3), iterations=iterations, best_cost=best_cost
+            )
+
+    stops = list(Stop.objects.filter(order__assigned_route=route).select_related("order"))
+    try:
+        ordered, summary = _sequence_stops(
+            stops,
+            mode=job.mode,
+            start=_route_start_time(route),
+            service_minutes=job.service_minutes,
+            deadline=deadline,
+            on_progress=report,
+        )
+    except ValueError as e:
+        return _optimization_job_finish(job, OptimizationJob.Status.FAILED, error=str(e))
+    job.iterations = progress["iterations"]
+    job.best_cost = progress["best_cost"]
+
+    with transaction.atomic():
+        route = Route.objects.select_for_update().get(pk=route.pk)
+        current = set(Stop.objects.filter(order__assigned_route=route).values_list("id", flat=True))
+        if route.status != Route.Status.PLANNED or current != {s.id for s in stops}:
+            return _optimization_job_finish(
+                job,
+                OptimizationJob.Status.FAILED,
+                error="Route changed while the job was running; result discarded.",
+            )
+        Stop.objects.bulk_update(ordered, SEQUENCED_STOP_FIELDS)
+        route.optimization_summary = summary
+        route.save(update_fields=["optimization_summary", "updated_at"])
+        _invalidate_route_geometry(route.id)
+        job = _optimization_job_finish(job, OptimizationJob.Status.SUCCEEDED, result=summary)
+        transaction.on_commit(lambda: broadcast_route_update.delay(str(route.id), str(job.id)))
+    return job
+
+
+def _optimization_job_finish(
+    job: OptimizationJob, status: str, *, result: Optional[dict] = None, error: str = ""
+) -> OptimizationJob:
+    job.status = status
+    job.result = result or {}
+    job.error = error
+    job.finished_at = timezone.now()
+    fields = ["status", "result", "error", "finished_at", "iterations", "best_cost"]
+    if status == OptimizationJob.Status.SUCCEEDED:
+        job.progress = 1.0
+        fields.append("progress")
+    job.save(update_fields=fields)
+    return job
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Late order insertion
+# ─────────────────────────────────────────────────────────────────────────────
+
+ACTIVE_ROUTE_STATUSES = (Route.Status.PLANNED, Route.Status.IN_PROGRESS)
+ROUTE_GEOMETRY_KEY = "route_geometry:v2:{}"
+
+
+def _route_geometry(routes: list[Route]) -> dict:
+    """
+    Visiting order of each route's located stops, from the cache where possible:
+    ``{"stop_ids", "order_ids", "points", "opens", "etas", "first_open", "load_kg"}``
+    keyed by route id, where points before ``first_open`` are already visited.
+    ``opens`` (window start) and ``etas`` (planned arrival) are epoch seconds or
+    ``None``. Misses cost one query.
+    """
+    keys = {route.id: ROUTE_GEOMETRY_KEY.format(route.id) for route in routes}
+    cached = cache.get_many(list(keys.values()))
+    geometry = {route_id: cached[key] for route_id, key in keys.items() if key in cached}
+    missing = [route_id for route_id in keys if route_id not in geometry]
+    if not missing:
+        return geometry
+
+    loaded = {
+        route_id: {
+            "stop_ids": [], "order_ids": [], "points": [], "opens": [], "etas": [],
+            "first_open": 0, "load_kg": 0.0,
+        }
+        for route_id in missing
+    }
+    loaded_orders = set()
+    rows = (
+        Stop.objects.filter(order__assigned_route__in=missing)
+        .order_by("sequence_index")
+        .values_list(
+            "id", "type", "lat", "lng", "status", "scheduled_eta",
+            "order_id", "order__status", "order__assigned_route", "order__weight_kg",
+            "order__pickup_window_start", "order__drop_window_start",
+        )
+    )
+    for (
+        stop_id, stop_type, lat, lng, stop_status, scheduled_eta,
+        order_id, order_status, route_id, weight_kg, pickup_opens, drop_opens,
+    ) in rows:
+        route_geometry = loaded[route_id]
+        if order_status not in Order.TERMINAL_STATUSES and order_id not in loaded_orders:
+            loaded_orders.add(order_id)
+            route_geometry["load_kg"] += weight_kg
+        # Stops of cancelled/failed orders won't be driven to unless already visited.
+        visited = stop_status in VISITED_STOP_STATUSES
+        if lat is None or lng is None or (order_status in DROPPED_ORDER_STATUSES and not visited):
+            continue
+        opens = pickup_opens if stop_type == Stop.StopType.PICKUP else drop_opens
+        route_geometry["stop_ids"].append(str(stop_id))
+        route_geometry["order_ids"].append(str(order_id))
+        route_geometry["points"].append((lat, lng))
+        route_geometry["opens"].append(opens.timestamp() if opens else None)
+        route_geometry["etas"].append(scheduled_eta.timestamp() if scheduled_eta else None)
+        if visited:
+            route_geometry["first_open"] = len(route_geometry["points"])
+
+    cache.set_many(
+        {keys[route_id]: value for route_id, value in loaded.items()},
+        timeout=settings.ROUTE_GEOMETRY_CACHE_TTL_S,
+    )
+    geometry.update(loaded)
+    return geometry
+
+
+def _invalidate_route_geometry(*route_ids) -> None:
+    """Drop cached geometry now and again on commit, so a concurrent read can't re-cache stale stops."""
+    keys = [ROUTE_GEOMETRY_KEY.format(route_id) for route_id in route_ids if route_id]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def _insertion_stops(order: Order) -> tuple[Optional[Stop], Optional[Stop]]:
+    stops = list(order.stops.all())
+    pickups = [s for s in stops if s.type == Stop.StopType.PICKUP]
+    drops = [s for s in stops if s.type == Stop.StopType.DROP]
+    if len(pickups) > 1 or len(drops) > 1 or not stops:
+        raise ValueError("Insertion supports orders with at most one PICKUP and one DROP stop.")
+    if any(s.lat is None or s.lng is None for s in stops):
+        raise ValueError("Order stops need coordinates for insertion.")
+    return (pickups[0] if pickups else None), (drops[0] if drops else None)
+
+
+def _point(stop: Optional[Stop]) -> Optional[tuple[float, float]]:
+    return (stop.lat, stop.lng) if stop else None
+
+
+def _cheapest_insertion(route_geometry: dict, pickup: Optional[Stop], drop: Optional[Stop]) -> insertion.Insertion:
+    """Price ``pickup``/``drop`` into a route's open stops over the configured distance provider."""
+    points = list(route_geometry["points"])
+    new = [_point(stop) for stop in (pickup, drop) if stop is not None]
+    return insertion.cheapest_insertion(
+        points,
+        route_geometry["first_open"],
+        _point(pickup),
+        _point(drop),
+        matrix=_distance_provider().matrix(points + new),
+    )
+
+
+def order_insertion_candidates(*, order: Order, route_date=None, limit: int = 5) -> list[dict]:
+    """
+    Rank the tenant's PLANNED/IN_PROGRESS routes of ``route_date`` (default
+    today) by the cheapest-insertion detour of ``order``'s stops. Routes whose
+    vehicle lacks the capacity are left out.
+    """
+    if order.status != Order.Status.CREATED:
+        raise ValueError("Only CREATED orders can be inserted into a route.")
+    pickup, drop = _insertion_stops(order)
+    routes = list(
+        Route.objects.filter(
+            tenant=order.tenant,
+            route_date=route_date or timezone.localdate(),
+            status__in=ACTIVE_ROUTE_STATUSES,
+        ).select_related("driver", "vehicle")
+    )
+    geometry = _route_geometry(routes)
+    minutes_per_km = 60.0 / settings.ROUTE_AVERAGE_SPEED_KMH
+    service_minutes = settings.ROUTE_SERVICE_TIME_MINUTES * ((pickup is not None) + (drop is not None))
+
+    candidates = []
+    for route in routes:
+        route_geometry = geometry[route.id]
+        capacity = route.vehicle.capacity_kg
+        if capacity and route_geometry["load_kg"] + order.weight_kg > capacity:
+            continue
+        best = _cheapest_insertion(route_geometry, pickup, drop)
+        stop_ids = route_geometry["stop_ids"]
+        candidates.append({
+            "route": route,
+            "added_km": round(best.added_km, 3),
+            "added_minutes": round(best.added_km * minutes_per_km + service_minutes, 1),
+            "pickup_after_stop_id": stop_ids[best.pickup_after] if best.pickup_after not in (None, -1) else None,
+            "drop_after_stop_id": stop_ids[best.drop_after] if best.drop_after not in (None, -1) else None,
+        })
+    candidates.sort(key=lambda c: c["added_km"])
+    return candidates[:limit]
+
+
+@collect_events()
+def order_insert(*, order: Order, route: Route, actor_user: Optional[User] = None) -> Order:
+    """Assign a CREATED order to ``route``, splicing its stops in at the cheapest positions."""
+    route = Route.objects.select_for_update().select_related("vehicle").get(pk=route.pk)
+    order = Order.objects.select_for_update().get(pk=order.pk)
+    if order.status != Order.Status.CREATED:
+        raise ValueError("Only CREATED orders can be inserted into a route.")
+    if route.status not in ACTIVE_ROUTE_STATUSES:
+        raise ValueError("Orders can only be inserted into PLANNED or IN_PROGRESS routes.")
+    pickup, drop = _insertion_stops(order)
+
+    # Price against the committed sequence, not a possibly stale cache entry.
+    _invalidate_route_geometry(route.id)
+    route_geometry = _route_geometry([route])[route.id]
+    capacity = route.vehicle.capacity_kg
+    if capacity and route_geometry["load_kg"] + order.weight_kg > capacity:
+        raise ValueError("Order weight exceeds the route vehicle's remaining capacity.")
+    best = _splice_order_stops(route, route_geometry, pickup, drop)
+
+    order.assigned_route = route
+    order.status = Order.Status.ASSIGNED
+    order.save(update_fields=["assigned_route", "status", "updated_at"])
+    _count_route_orders([(route.id, None, Order.Status.ASSIGNED)])
+    route_repair_sequence(route=route, changed_stop_ids=[s.id for s in (pickup, drop) if s])
+    _record_status_history(
+        order=order,
+        from_status=Order.Status.CREATED,
+        to_status=Order.Status.ASSIGNED,
+        actor_user=actor_user,
+        actor_type=StatusHistory.ActorType.OPS,
+        metadata={"route_id": str(route.id), "inserted": True, "added_km": round(best.added_km, 3)},
+    )
+    _emit_event(
+        order.tenant,
+        "order.status_changed",
+        {"order_id": str(order.id), "to_status": Order.Status.ASSIGNED},
+    )
+    return order
+
+
+def _splice_order_stops(
+    route: Route, route_geometry: dict, pickup: Optional[Stop], drop: Optional[Stop]
+) -> insertion.Insertion:
+    """Put ``pickup``/``drop`` at their cheapest positions in ``route``'s stop order and renumber."""
+    best = _cheapest_insertion(route_geometry, pickup, drop)
+    after: dict = {}
+    for stop, position in ((pickup, best.pickup_after), (drop, best.drop_after)):
+        if stop is not None:
+            anchor = route_geometry["stop_ids"][position] if position >= 0 else None
+            after.setdefault(anchor, []).append(stop)
+    ordered = list(after.pop(None, []))
+    for stop in Stop.objects.filter(order__assigned_route=route).order_by("sequence_index"):
+        ordered.append(stop)
+        ordered.extend(after.pop(str(stop.id), []))
+    for idx, stop in enumerate(ordered, start=1):
+        stop.sequence_index = idx
+    Stop.objects.bulk_update(ordered, ["sequence_index"], batch_size=BULK_BATCH_SIZE)
+    return best
+
+
+def route_repair_sequence(*, route: Route, changed_stop_ids=()) -> list[Stop]:
+    """
+    Re-sequence a PLANNED/IN_PROGRESS route only around ``changed_stop_ids``:
+    stops just added to it, or stops of orders that were moved off it,
+    cancelled or failed. Visited stops stay first and fixed; the open part
+    starts from the driver's current position when known, else from the last
+    visited stop. Returns the route's stops in their new order.
+    """
+    if route.status not in ACTIVE_ROUTE_STATUSES:
+        return []
+    changed = {str(stop_id) for stop_id in changed_stop_ids}
+    stops = (
+        Stop.objects.filter(Q(order__assigned_route=route) | Q(id__in=changed))
+        .select_related("order")
+        .order_by("sequence_index")
+    )
+    done, open_stops, dropped = [], [], []
+    touched, gap = set(), False
+    for stop in stops:
+        on_route = stop.order.assigned_route_id == route.id
+        if stop.status in VISITED_STOP_STATUSES and on_route:
+            done.append(stop)
+        elif not on_route or stop.order.status in DROPPED_ORDER_STATUSES:
+            if str(stop.id) in changed:
+                # The stops on both sides of the gap get new neighbours.
+                gap = True
+                if open_stops:
+                    touched.add(open_stops[-1].id)
+            if on_route:
+                dropped.append(stop)
+        else:
+            if gap or str(stop.id) in changed:
+                touched.add(stop.id)
+                gap = False
+            open_stops.append(stop)
+
+    head, located, tail = _split_stops(open_stops)
+    anchor = _route_anchor(route, done)
+
+    positions = {i for i, stop in enumerate(located) if stop.id in touched}
+    if len(located) >= 2 and positions:
+        offset = 1 if anchor else 0
+        points = ([anchor] if anchor else []) + [(s.lat, s.lng) for s in located]
+        local = Precedence.from_stops(located)
+        precedence = Precedence(
+            len(points),
+            [(a + offset, b + offset) for a, afters in enumerate(local.successors) for b in afters],
+        )
+        tour = repair.repair(
+            _distance_provider().matrix(points),
+            list(range(len(points))),
+            {p + offset for p in positions},
+            precedence,
+        )
+        located = [located[k - offset] for k in tour if k >= offset]
+
+    ordered = done + head + located + tail + dropped
+    moved = []
+    for idx, stop in enumerate(ordered, start=1):
+        if stop.sequence_index != idx:
+            stop.sequence_index = idx
+            moved.append(stop)
+    open_stops = head + located + tail
+    start, origin = _route_origin(route, done)
+    _schedule_etas(open_stops, start=start, origin=origin)
+    refreshed = {stop.id: stop for stop in moved + open_stops}
+    Stop.objects.bulk_update(list(refreshed.values()), SEQUENCED_STOP_FIELDS, batch_size=BULK_BATCH_SIZE)
+    _invalidate_route_geometry(route.id)
+    return ordered
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# ETAs
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _distance_provider() -> providers.DistanceProvider:
+    return providers.get(settings.ROUTE_DISTANCE_PROVIDER)
+
+
+def _route_anchor(route: Route, visited: list[Stop]) -> Optional[tuple[float, float]]:
+    """Where the open part of a route starts: the driver on a live route, else the last visited stop."""
+    driver = route.driver
+    live = route.status == Route.Status.IN_PROGRESS
+    if live and driver.current_lat is not None and driver.current_lng is not None:
+        return driver.current_lat, driver.current_lng
+    located = [s for s in visited if s.lat is not None and s.lng is not None]
+    return (located[-1].lat, located[-1].lng) if located else None
+
+
+def _route_origin(route: Route, visited: list[Stop]) -> tuple[datetime, Optional[tuple[float, float]]]:
+    """``(start, origin)`` to forecast the open stops from: now and the anchor once the route is live."""
+    if route.status == Route.Status.IN_PROGRESS:
+        return timezone.now(), _route_anchor(route, visited)
+    return _route_start_time(route), None
+
+
+def _schedule_etas(
+    stops: list[Stop],
+    *,
+    start: datetime,
+    origin: Optional[tuple[float, float]] = None,
+    service_minutes: Optional[float] = None,
+) -> None:
+    """
+    Set ``scheduled_eta`` on ``stops``, in the order given, in memory.
+
+    The driver leaves ``origin`` (else the first stop) at ``start``, drives each
+    leg at ``ROUTE_AVERAGE_SPEED_KMH`` over the configured distance provider,
+    waits for windows that have not opened and spends ``service_minutes`` at
+    each stop. Where the tenant has a travel profile, legs and stops are
+    re-timed with the speeds and service times learned for their zone and hour.
+    Stops without coordinates get no ETA. ``stop.order`` must be loaded.
+    """
+    if service_minutes is None:
+        service_minutes = settings.ROUTE_SERVICE_TIME_MINUTES
+    located = [s for s in stops if s.lat is not None and s.lng is not None]
+    for stop in stops:
+        stop.scheduled_eta = None
+    if not located:
+        return
+    points = ([origin] if origin else []) + [(s.lat, s.lng) for s in located]
+    legs = _distance_provider().leg_times(points, settings.ROUTE_AVERAGE_SPEED_KMH)
+    if not origin:
+        legs = [0.0] + legs
+    windows = time_windows.TimeWindows.from_stops(located, start, service_minutes)
+    profile = _travel_profile(located[0].order.tenant_id)
+    adjust = profile and profile.pace(
+        [(s.lat, s.lng) for s in located], timezone.localtime(start), settings.ROUTE_AVERAGE_SPEED_KMH
+    )
+    for stop, arrival in zip(located, eta.arrivals(legs, windows.service, windows.earliest, adjust)):
+        stop.scheduled_eta = start + timedelta(seconds=arrival)
+
+
+@transaction.atomic
+def route_update_etas(*, route: Route, service_minutes: Optional[float] = None) -> list[Stop]:
+    """
+    Recompute ``scheduled_eta`` for the route's open stops in sequence order and
+    write them with one ``bulk_update``. A PLANNED route is forecast from its
+    start time; a live one from now and the driver's position. Returns the
+    updated stops.
+    """
+    stops = Stop.objects.filter(order__assigned_route=route).select_related("order").order_by("sequence_index")
+    open_stops = _forecast_route(route, list(stops), service_minutes=service_minutes)
+    Stop.objects.bulk_update(open_stops, ["scheduled_eta"], batch_size=BULK_BATCH_SIZE)
+    return open_stops
+
+
+def _forecast_route(
+    route: Route, stops: list[Stop], service_minutes: Optional[float] = None
+) -> list[Stop]:
+    """Set ETAs in memory on the open ones of ``stops``, given in sequence order, and return those."""
+    visited, open_stops = [], []
+    for stop in stops:
+        if stop.status in VISITED_STOP_STATUSES:
+            visited.append(stop)
+        elif stop.order.status not in DROPPED_ORDER_STATUSES:
+            open_stops.append(stop)
+    start, origin = _route_origin(route, visited)
+    _schedule_etas(open_stops, start=start, origin=origin, service_minutes=service_minutes)
+    return open_stops
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Driver status update
+# ─────────────────────────────────────────────────────────────────────────────
+
+@collect_events()
 def driver_update_order_status(
     *,
     order: Order,
@@ -322,13 +1511,20 @@ def driver_update_order_status(
         )
 
     prev = order.status
-    order.status = to_status
-    order.save(update_fields=["status", "updated_at"])
+    if not _transition_orders([order], to_status):
+        raise ValueError(ORDER_CHANGED_MESSAGE)
 
     if stop:
-        stop.actual_arrival_time = timezone.now()
+        # Keep a geofenced arrival; the gap to now is the time spent at the stop
+        stop.actual_arrival_time = stop.actual_arrival_time or timezone.now()
         stop.status = Stop.StopStatus.COMPLETED
         stop.save(update_fields=["actual_arrival_time", "status"])
+    if to_status == Order.Status.FAILED and order.assigned_route:
+        route_repair_sequence(
+            route=order.assigned_route, changed_stop_ids=order.stops.values_list("id", flat=True)
+        )
+    else:
+        _invalidate_route_geometry(order.assigned_route_id)
 
     _record_status_history(
         order=order,
@@ -358,20 +1554,24 @@ def driver_update_order_status(
 
 
 def _check_route_completion(route: Route) -> None:
-    """Complete route if all its orders are in terminal state."""
-    terminal = Order.TERMINAL_STATUSES
-    orders = route.orders.all()
-    if all(o.status in terminal for o in orders):
-        route.status = Route.Status.COMPLETED
-        route.end_time = timezone.now()
-        route.save(update_fields=["status", "end_time", "updated_at"])
+    """Complete route if all its orders are in terminal state, read from its counters."""
+    now = timezone.now()
+    # The counter UPDATEs of concurrent final transitions queue on the route
+    # row, so the last of them sees no open orders and completes it, once
+    completed = (
+        Route.objects.filter(pk=route.pk, **{field: 0 for field in Route.OPEN_ORDER_COUNTERS})
+        .exclude(status=Route.Status.COMPLETED)
+        .update(status=Route.Status.COMPLETED, end_time=now, updated_at=now)
+    )
+    if completed:
+        route.status, route.end_time, route.updated_at = Route.Status.COMPLETED, now, now
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # POD
 # ─────────────────────────────────────────────────────────────────────────────
 
-@transaction.atomic
+@collect_events()
 def pod_create(
     *,
     order: Order,
@@ -458,9 +1658,452 @@ def exception_resolve(*, exc: LogisticsException, resolution: str) -> LogisticsE
 # Driver location
 # ─────────────────────────────────────────────────────────────────────────────
 
-def driver_update_location(*, driver: Driver, lat: float, lng: float) -> Driver:
-    driver.current_lat = lat
-    driver.current_lng = lng
-    driver.location_updated_at = timezone.now()
-    driver.save(update_fields=["current_lat", "current_lng", "location_updated_at"])
-    return driver
+def driver_record_location(*, driver_id, lat: float, lng: float) -> None:
+    """
+    Absorb a GPS ping in the cache; ``driver_locations_flush`` persists the
+    latest one per driver, runs geofencing and live ETAs for it, and appends
+    the pings in between to the driver's breadcrumbs.
+    """
+    now = timezone.now()
+    cache.set(DRIVER_POSITION_KEY.format(driver_id), (lat, lng, now), timeout=settings.DRIVER_POSITION_TTL_S)
+    _buffer_trail(driver_id, lat, lng, now)
+
+
+# Each ping takes the next number of its driver's sequence and gets a key of
+# its own, so pings never read-modify-write a shared list. The flusher keeps
+# ``(drained, hole)`` per driver: the last number appended to breadcrumbs and
+# a number it found claimed but not yet written on the previous flush.
+DRIVER_TRAIL_SEQ_KEY = "driver_trail_seq:{}"
+DRIVER_TRAIL_KEY = "driver_trail:{}:{}"
+DRIVER_TRAIL_MARK_KEY = "driver_trail_mark:{}"
+# Newest pings drained per driver if flushes stop running
+DRIVER_TRAIL_MAX_PINGS = 720
+
+
+def _buffer_trail(driver_id, lat: float, lng: float, at: datetime) -> None:
+    seq_key = DRIVER_TRAIL_SEQ_KEY.format(driver_id)
+    try:
+        n = cache.incr(seq_key)
+    except ValueError:
+        cache.add(seq_key, 0, timeout=None)
+        n = cache.incr(seq_key)
+    cache.set(DRIVER_TRAIL_KEY.format(driver_id, n), (lat, lng, at), timeout=settings.DRIVER_POSITION_TTL_S)
+
+
+def _trail_spans(driver_ids) -> dict:
+    """``(first, last, hole)`` sequence numbers to drain per driver with buffered pings."""
+    seq_keys = {DRIVER_TRAIL_SEQ_KEY.format(driver_id): driver_id for driver_id in driver_ids}
+    mark_keys = {DRIVER_TRAIL_MARK_KEY.format(driver_id): driver_id for driver_id in driver_ids}
+    lasts = {seq_keys[key]: n for key, n in cache.get_many(list(seq_keys)).items()}
+    marks = {mark_keys[key]: mark for key, mark in cache.get_many(list(mark_keys)).items()}
+
+    spans = {}
+    for driver_id, last in lasts.items():
+        drained, hole = marks.get(driver_id, (0, None))
+        if last < drained:  # the sequence was evicted and restarted
+            drained, hole = 0, None
+        if last > drained:
+            spans[driver_id] = (max(drained, last - DRIVER_TRAIL_MAX_PINGS) + 1, last, hole)
+    return spans
+
+
+def _drain_trails(spans: dict) -> dict:
+    """
+    Take the buffered pings of each driver in sequence order. A number
+    claimed by a ping that is still being written stops the driver's drain
+    there until the next flush; missing on two flushes in a row, it expired
+    or its writer died, and is skipped. The marks move and the pings leave
+    the cache only when the surrounding transaction commits.
+    """
+    slots = cache.get_many([
+        DRIVER_TRAIL_KEY.format(driver_id, n)
+        for driver_id, (first, last, _) in spans.items()
+        for n in range(first, last + 1)
+    ])
+
+    trails, new_marks, done = {}, {}, []
+    for driver_id, (first, last, hole) in spans.items():
+        trail, drained, new_hole = [], first - 1, None
+        for n in range(first, last + 1):
+            key = DRIVER_TRAIL_KEY.format(driver_id, n)
+            if key in slots:
+                trail.append(slots[key])
+                done.append(key)
+            elif n != hole:
+                new_hole = n
+                break
+            drained = n
+        if trail:
+            trails[driver_id] = trail
+        new_marks[DRIVER_TRAIL_MARK_KEY.format(driver_id)] = (drained, new_hole)
+
+    def release():
+        cache.set_many(new_marks, timeout=None)
+        cache.delete_many(done)
+
+    transaction.on_commit(release)
+    return trails
+
+
+# Held while a flush runs, so runs started by overlapping beats skip instead
+DRIVER_FLUSH_LOCK_KEY = "driver_locations_flush:lock"
+# Longest a flush can hold the lock if its worker dies mid-run
+DRIVER_FLUSH_LOCK_TTL_S = 60
+
+
+def driver_locations_flush() -> list[Driver]:
+    """
+    Write buffered pings newer than the stored positions with one
+    ``bulk_update``, then geofence and re-forecast those drivers' live routes
+    in a batch. Buffered pings are appended to the drivers' breadcrumbs.
+    Returns the drivers that moved.
+
+    One flush runs at a time: while another holds the cache lock this
+    returns ``[]`` at once. Only drivers with a newer buffered position or
+    pending trail pings are loaded.
+    """
+    if not cache.add(DRIVER_FLUSH_LOCK_KEY, True, timeout=DRIVER_FLUSH_LOCK_TTL_S):
+        return []
+    try:
+        stored = dict(Driver.objects.filter(is_active=True).values_list("id", "location_updated_at"))
+        positions = driver_positions(list(stored))
+        spans = _trail_spans(list(stored))
+        newer = {
+            driver_id: position
+            for driver_id, position in positions.items()
+            if stored[driver_id] is None or position[2] > stored[driver_id]
+        }
+        moved = _flush_driver_locations(newer, spans) if newer or spans else []
+    except BaseException:
+        cache.delete(DRIVER_FLUSH_LOCK_KEY)
+        raise
+    # After the trail marks, which were registered first
+    transaction.on_commit(lambda: cache.delete(DRIVER_FLUSH_LOCK_KEY))
+    return moved
+
+
+@collect_events()
+def _flush_driver_locations(newer: dict, spans: dict) -> list[Driver]:
+    drivers = list(Driver.objects.filter(id__in=set(newer) | set(spans)).select_related("tenant"))
+    breadcrumbs_append(drivers, spans)
+    moved = []
+    for driver in drivers:
+        if driver.id in newer:
+            driver.current_lat, driver.current_lng, driver.location_updated_at = newer[driver.id]
+            moved.append(driver)
+    if not moved:
+        return []
+
+    Driver.objects.bulk_update(
+        moved, ["current_lat", "current_lng", "location_updated_at"], batch_size=BULK_BATCH_SIZE
+    )
+    _geofence_arrivals(moved)
+    live: dict = {}
+    for route in Route.objects.filter(driver__in=moved, status=Route.Status.IN_PROGRESS):
+        live.setdefault(route.driver_id, []).append(route)
+    for driver in moved:
+        if driver.id in live:
+            _refresh_live_etas(
+                driver=driver, lat=driver.current_lat, lng=driver.current_lng, routes=live[driver.id]
+            )
+    return moved
+
+
+class _AppendBytes(Func):
+    """``column || value`` on a bytea column."""
+
+    arg_joiner = " || "
+    template = "(%(expressions)s)"
+    output_field = BinaryField()
+
+
+def breadcrumbs_append(drivers: list[Driver], spans: dict) -> list[Breadcrumb]:
+    """
+    Move the drivers' buffered pings, the ``_trail_spans`` of them, into
+    their per-day breadcrumb segments: one ``bulk_create`` for new segments
+    and one ``bulk_update`` that concatenates the encoded pings onto existing
+    ones in the database. Returns the segments written.
+    """
+    by_id = {driver.id: driver for driver in drivers}
+    trails = _drain_trails({driver_id: span for driver_id, span in spans.items() if driver_id in by_id})
+    if not trails:
+        return []
+
+    pings: dict = {}
+    for driver_id, trail in trails.items():
+        driver = by_id[driver_id]
+        for lat, lng, at in trail:
+            pings.setdefault((driver, timezone.localdate(at)), []).append(
+                (breadcrumbs.quantize(lat, lng, at.timestamp()), at)
+            )
+    segments = {
+        (segment.driver_id, segment.day): segment
+        for segment in Breadcrumb.objects.filter(
+            driver__in={driver for driver, _ in pings}, day__in={day for _, day in pings}
+        ).defer("points")
+    }
+
+    created, updated = [], []
+    for (driver, day), day_pings in pings.items():
+        points = [point for point, _ in day_pings]
+        times = [at for _, at in day_pings]
+        segment = segments.get((driver.id, day))
+        if segment is None:
+            segment = Breadcrumb(
+                tenant_id=driver.tenant_id, driver=driver, day=day,
+                points=breadcrumbs.encode(points), started_at=min(times), ended_at=max(times),
+            )
+            created.append(segment)
+        else:
+            previous = breadcrumbs.Point(segment.last_lat, segment.last_lng, segment.last_t)
+            segment.points = _AppendBytes("points", Value(breadcrumbs.encode(points, previous)))
+            segment.started_at = min(segment.started_at, *times)
+            segment.ended_at = max(segment.ended_at, *times)
+            updated.append(segment)
+        segment.point_count += len(points)
+        segment.ping_count += len(points)
+        segment.last_lat, segment.last_lng, segment.last_t = points[-1]
+
+    Breadcrumb.objects.bulk_create(created, batch_size=BULK_BATCH_SIZE)
+    Breadcrumb.objects.bulk_update(
+        updated,
+        ["points", "point_count", "ping_count", "last_lat", "last_lng", "last_t", "started_at", "ended_at"],
+        batch_size=BULK_BATCH_SIZE,
+    )
+    return created + updated
+
+
+def breadcrumbs_close(*, before: Optional[date] = None, tolerance_m: Optional[float] = None) -> int:
+    """
+    Simplify the open breadcrumb segments of days before ``before`` (today by
+    default) to within ``tolerance_m`` (``BREADCRUMB_TOLERANCE_M``) and mark
+    them closed. Segments are rewritten one at a time. Returns how many closed.
+    """
+    before = before or timezone.localdate()
+    tolerance_m = settings.BREADCRUMB_TOLERANCE_M if tolerance_m is None else tolerance_m
+    pending = Breadcrumb.objects.filter(closed_at__isnull=True, day__lt=before)
+    closed = 0
+    for segment_id in pending.values_list("id", flat=True).iterator():
+        with transaction.atomic():
+            segment = Breadcrumb.objects.select_for_update().get(id=segment_id)
+            # The last point is always kept, so appends still chain onto last_*
+            points = breadcrumbs.simplify(breadcrumbs.decode(segment.points), tolerance_m)
+            segment.points = breadcrumbs.encode(points)
+            segment.point_count = len(points)
+            segment.closed_at = timezone.now()
+            segment.save(update_fields=["points", "point_count", "closed_at"])
+        closed += 1
+    return closed
+
+
+def _geofence_arrivals(drivers: list[Driver]) -> list[Stop]:
+    """Mark pending stops of the drivers' live routes within the geofence of their position as ARRIVED."""
+    by_driver: dict = {}
+    for stop in Stop.objects.filter(
+        order__assigned_route__driver__in=drivers,
+        order__assigned_route__status=Route.Status.IN_PROGRESS,
+        status=Stop.StopStatus.PENDING,
+        lat__isnull=False,
+        lng__isnull=False,
+    ).select_related("order__assigned_route"):
+        by_driver.setdefault(stop.order.assigned_route.driver_id, {})[stop.id] = stop
+    if not by_driver:
+        return []
+
+    now = timezone.now()
+    arrived = []
+    for driver in drivers:
+        stops = by_driver.get(driver.id)
+        if not stops:
+            continue
+        index = GridIndex.from_points((stop.id, stop.lat, stop.lng) for stop in stops.values())
+        hits = index.within(driver.current_lat, driver.current_lng, settings.ROUTE_GEOFENCE_RADIUS_M / 1000)
+        for stop_id, distance_km in hits:
+            stop = stops[stop_id]
+            stop.status = Stop.StopStatus.ARRIVED
+            stop.actual_arrival_time = now
+            arrived.append(stop)
+        _emit_events_bulk(driver.tenant, [
+            ("stop.arrived", {
+                "stop_id": str(stop_id),
+                "order_id": str(stops[stop_id].order_id),
+                "route_id": str(stops[stop_id].order.assigned_route_id),
+                "driver_id": str(driver.id),
+                "distance_m": round(distance_km * 1000),
+            })
+            for stop_id, distance_km in hits
+        ])
+    Stop.objects.bulk_update(arrived, ["status", "actual_arrival_time"], batch_size=BULK_BATCH_SIZE)
+    return arrived
+
+
+LIVE_ETA_KEY = "route_live_eta:{}"
+LIVE_ETA_THROTTLE_KEY = "route_live_eta_throttle:{}"
+LIVE_ETA_STATE_TTL_S = 24 * 3600
+
+
+def _refresh_live_etas(
+    *, driver: Driver, lat: float, lng: float, routes: Optional[list[Route]] = None
+) -> dict:
+    """
+    Re-forecast the open stops of the driver's live route from this ping.
+
+    Works from the cached route geometry, not the stop rows. A route is skipped
+    until the driver has moved ``ROUTE_LIVE_ETA_MIN_MOVE_M`` since its last
+    forecast, and is forecast at most once per ``ROUTE_LIVE_ETA_INTERVAL_S``.
+    Only ETAs that moved ``ROUTE_LIVE_ETA_MIN_SHIFT_MINUTES`` or more from the
+    last published value are written and pushed to the orders' tracking
+    groups. ``routes`` are the driver's live routes, if already loaded. Returns
+    ``{stop_id: eta}`` of the published changes.
+    """
+    from apps.logistics.tasks import broadcast_eta_updates
+
+    if routes is None:
+        routes = list(Route.objects.filter(driver=driver, status=Route.Status.IN_PROGRESS))
+    if not routes:
+        return {}
+    published = {}
+    for route in routes:
+        state_key = LIVE_ETA_KEY.format(route.id)
+        state = cache.get(state_key)
+        moved_m = _haversine(state["lat"], state["lng"], lat, lng) * 1000 if state else math.inf
+        if moved_m < settings.ROUTE_LIVE_ETA_MIN_MOVE_M:
+            continue
+        # cache.add is atomic, so concurrent pings for one route can't both get through
+        throttle_key = LIVE_ETA_THROTTLE_KEY.format(route.id)
+        if not cache.add(throttle_key, True, timeout=settings.ROUTE_LIVE_ETA_INTERVAL_S):
+            continue
+
+        geometry = _route_geometry([route])[route.id]
+        first = geometry["first_open"]
+        stop_ids, order_ids = geometry["stop_ids"][first:], geometry["order_ids"][first:]
+        last = state["etas"] if state else dict(zip(stop_ids, geometry["etas"][first:]))
+        points = geometry["points"][first:]
+        speed_kmh = settings.ROUTE_AVERAGE_SPEED_KMH
+        profile = _travel_profile(route.tenant_id)
+        started = timezone.now()
+        now = started.timestamp()
+        arrivals = eta.arrivals(
+            _distance_provider().leg_times([(lat, lng)] + points, speed_kmh),
+            [settings.ROUTE_SERVICE_TIME_MINUTES * 60.0] * len(stop_ids),
+            [max(opens - now, 0.0) if opens else 0.0 for opens in geometry["opens"][first:]],
+            profile and profile.pace(points, timezone.localtime(started), speed_kmh),
+        )
+
+        shift_s = settings.ROUTE_LIVE_ETA_MIN_SHIFT_MINUTES * 60.0
+        etas, changed = {}, {}
+        for stop_id, order_id, arrival in zip(stop_ids, order_ids, arrivals):
+            previous = last.get(stop_id)
+            if previous is None or abs(now + arrival - previous) >= shift_s:
+                previous = now + arrival
+                changed.setdefault(order_id, []).append(
+                    Stop(id=stop_id, scheduled_eta=datetime.fromtimestamp(previous, tz=dt_timezone.utc))
+                )
+            etas[stop_id] = previous
+        cache.set(state_key, {"lat": lat, "lng": lng, "etas": etas}, timeout=LIVE_ETA_STATE_TTL_S)
+        if not changed:
+            continue
+
+        updated = [stop for stops in changed.values() for stop in stops]
+        Stop.objects.bulk_update(updated, ["scheduled_eta"], batch_size=BULK_BATCH_SIZE)
+        payload = {
+            order_id: [{"stop_id": str(s.id), "scheduled_eta": s.scheduled_eta.isoformat()} for s in stops]
+            for order_id, stops in changed.items()
+        }
+        transaction.on_commit(
+            lambda route_id=str(route.id), payload=payload: broadcast_eta_updates.delay(route_id, payload)
+        )
+        published.update((str(stop.id), stop.scheduled_eta) for stop in updated)
+    return published
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Travel profiles
+# ─────────────────────────────────────────────────────────────────────────────
+
+TRAVEL_PROFILE_KEY = "travel_profile:{}"
+TRAVEL_PROFILE_CACHE_TTL_S = 3600
+
+
+@transaction.atomic
+def travel_profile_build(*, tenant: Tenant, since: Optional[datetime] = None) -> TravelProfile:
+    """
+    Mine the tenant's COMPLETED routes (ended after ``since``, if given) into a
+    ``SpeedProfile`` and store it. A stop is reached at its
+    ``actual_arrival_time`` and left when its last status change was recorded,
+    so visits are taken in arrival order rather than planned sequence. Two
+    queries, whatever the number of routes.
+    """
+    routes = Route.objects.filter(tenant=tenant, status=Route.Status.COMPLETED)
+    if since is not None:
+        routes = routes.filter(end_time__gte=since)
+    departures = dict(
+        StatusHistory.objects.filter(stop__order__assigned_route__in=routes, stop__isnull=False)
+        .values("stop_id")
+        .annotate(at=Max("created_at"))
+        .values_list("stop_id", "at")
+    )
+    rows = (
+        Stop.objects.filter(
+            order__assigned_route__in=routes,
+            status=Stop.StopStatus.COMPLETED,
+            lat__isnull=False,
+            lng__isnull=False,
+            actual_arrival_time__isnull=False,
+        )
+        .order_by("order__assigned_route", "actual_arrival_time")
+        .values_list("id", "order__assigned_route", "lat", "lng", "actual_arrival_time")
+    )
+    visits = []
+    for stop_id, route_id, lat, lng, arrived in rows:
+        departed = max(departures.get(stop_id, arrived), arrived)
+        visits.append(Visit(
+            str(route_id), lat, lng, arrived.timestamp(), departed.timestamp(),
+            hour_of_week(timezone.localtime(arrived)), hour_of_week(timezone.localtime(departed)),
+        ))
+
+    profile = SpeedProfile.build(
+        visits,
+        precision=settings.ROUTE_SPEED_PROFILE_PRECISION,
+        min_samples=settings.ROUTE_SPEED_PROFILE_MIN_SAMPLES,
+    )
+    stored, _ = TravelProfile.objects.update_or_create(
+        tenant=tenant,
+        defaults={
+            "zones": profile.zones,
+            "tables": profile.dumps(),
+            "legs": profile.legs,
+            "visits": profile.visits,
+            "routes": len({visit.route for visit in visits}),
+        },
+    )
+    key = TRAVEL_PROFILE_KEY.format(tenant.id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+    return stored
+
+
+def _travel_profile(tenant_id) -> Optional[SpeedProfile]:
+    """The tenant's learned profile, read through the cache; ``None`` until one is built."""
+    key = TRAVEL_PROFILE_KEY.format(tenant_id)
+    stored = cache.get(key)
+    if stored is None:
+        row = TravelProfile.objects.filter(tenant_id=tenant_id).values_list("zones", "tables").first()
+        stored = (row[0], bytes(row[1])) if row else False
+        cache.set(key, stored, timeout=TRAVEL_PROFILE_CACHE_TTL_S)
+    if not stored:
+        return None
+    return SpeedProfile.loads(*stored)
+
+
+def _typical_speed_kmh(located: list[Stop], start: datetime) -> float:
+    """Learned speed around the stops' centre at ``start``, for solvers that take one speed."""
+    profile = _travel_profile(located[0].order.tenant_id) if located else None
+    if profile is not None:
+        lat = sum(s.lat for s in located) / len(located)
+        lng = sum(s.lng for s in located) / len(located)
+        learned = profile.speed_kmh(lat, lng, hour_of_week(timezone.localtime(start)))
+        if learned:
+            return learned
+    return settings.ROUTE_AVERAGE_SPEED_KMH
+
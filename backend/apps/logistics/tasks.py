@@ -10,7 +10,7 @@ import requests
 from celery import shared_task
 from django.utils import timezone
 
-from apps.logistics.models import Event, Order, OutboxMessage, Route
+from apps.logistics.models import Event, OptimizationJob, Order, OutboxMessage, Route, Stop
 
 logger = logging.getLogger(__name__)
 
@@ -117,6 +117,140 @@ def broadcast_order_update(order_id: str, status: str, tenant_id: str, tracking_
     async_to_sync(channel_layer.group_send)(f"tracking_{order_id}", payload)
 
 
+@shared_task(name="logistics.broadcast_route_update")
+def broadcast_route_update(route_id: str, job_id: str = ""):
+    """Push a route's current stop sequence to ops and the route's driver."""
+    from channels.layers import get_channel_layer
+    from asgiref.sync import async_to_sync
+
+    channel_layer = get_channel_layer()
+    if not channel_layer:
+        return
+
+    try:
+        route = Route.objects.get(pk=route_id)
+    except Route.DoesNotExist:
+        logger.error("Route %s not found", route_id)
+        return
+
+    stops = Stop.objects.filter(order__assigned_route=route).order_by("sequence_index")
+    payload = {
+        "type": "route_updated",
+        "route_id": route_id,
+        "job_id": job_id,
+        "stops": [
+            {
+                "id": str(stop.id),
+                "order_id": str(stop.order_id),
+                "sequence_index": stop.sequence_index,
+                "scheduled_eta": stop.scheduled_eta.isoformat() if stop.scheduled_eta else None,
+            }
+            for stop in stops
+        ],
+        "optimization_summary": route.optimization_summary,
+        "updated_at": timezone.now().isoformat(),
+    }
+
+    async_to_sync(channel_layer.group_send)(f"ops_tenant_{route.tenant_id}", payload)
+    async_to_sync(channel_layer.group_send)(f"route_{route_id}", payload)
+
+
+@shared_task(name="logistics.broadcast_eta_updates")
+def broadcast_eta_updates(route_id: str, etas_by_order: dict):
+    """Push re-forecast stop ETAs (``{order_id: [{"stop_id", "scheduled_eta"}]}``) to tracking pages."""
+    from channels.layers import get_channel_layer
+    from asgiref.sync import async_to_sync
+
+    channel_layer = get_channel_layer()
+    if not channel_layer:
+        return
+
+    updated_at = timezone.now().isoformat()
+    for order_id, stops in etas_by_order.items():
+        async_to_sync(channel_layer.group_send)(
+            f"tracking_{order_id}",
+            {"type": "eta_updated", "order_id": order_id, "route_id": route_id, "stops": stops,
+             "updated_at": updated_at},
+        )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Route optimization jobs — anytime search within the job's time budget
+# ─────────────────────────────────────────────────────────────────────────────
+
+@shared_task(name="logistics.run_optimization_job")
+def run_optimization_job(job_id: str):
+    """Run a queued OptimizationJob; the job row carries status and progress."""
+    from apps.logistics.services import optimization_job_run
+
+    try:
+        job = OptimizationJob.objects.select_related("route").get(pk=job_id)
+    except OptimizationJob.DoesNotExist:
+        logger.error("OptimizationJob %s not found", job_id)
+        return
+
+    try:
+        job = optimization_job_run(job=job)
+    except Exception as exc:
+        logger.exception("OptimizationJob %s crashed", job_id)
+        OptimizationJob.objects.filter(pk=job_id).update(
+            status=OptimizationJob.Status.FAILED, error=str(exc), finished_at=timezone.now()
+        )
+        raise
+
+    return f"Optimization job {job_id} {job.status}"
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Travel profiles — learn zone × hour speeds and service times from history
+# ─────────────────────────────────────────────────────────────────────────────
+
+@shared_task(name="logistics.build_travel_profiles")
+def build_travel_profiles():
+    """
+    Rebuild every tenant's travel profile from the last ROUTE_SPEED_PROFILE_DAYS
+    of completed routes. Scheduled nightly at 02:30 by migration 0013.
+    """
+    from django.conf import settings
+    from apps.logistics.services import travel_profile_build
+    from apps.users.models import Tenant
+
+    since = timezone.now() - timedelta(days=settings.ROUTE_SPEED_PROFILE_DAYS)
+    tenants = Tenant.objects.filter(
+        routes__status=Route.Status.COMPLETED, routes__end_time__gte=since
+    ).distinct()
+    built = 0
+    for tenant in tenants:
+        travel_profile_build(tenant=tenant, since=since)
+        built += 1
+    return f"Built {built} travel profiles."
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Driver locations — persist buffered GPS pings
+# ─────────────────────────────────────────────────────────────────────────────
+
+@shared_task(name="logistics.flush_driver_locations")
+def flush_driver_locations():
+    """
+    Write the latest buffered ping of each driver and geofence their routes.
+    Scheduled every 5 s by migration 0011; pings in between only touch Redis.
+    """
+    from apps.logistics.services import driver_locations_flush
+
+    moved = driver_locations_flush()
+    return f"Flushed {len(moved)} driver locations."
+
+
+@shared_task(name="logistics.close_breadcrumbs")
+def close_breadcrumbs():
+    """Simplify the breadcrumb segments of past days. Scheduled daily at 00:15 by migration 0012."""
+    from apps.logistics.services import breadcrumbs_close
+
+    closed = breadcrumbs_close()
+    return f"Closed {closed} breadcrumb segments."
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Delay detection — flag orders that are overdue
 # ─────────────────────────────────────────────────────────────────────────────
@@ -0,0 +1,201 @@
+"""Shared fixtures for the logistics tests."""
+import uuid
+
+import pytest
+from rest_framework.test import APIClient
+
+from apps.logistics.models import Order, Stop
+from apps.logistics.optimization.distance import haversine
+from apps.logistics.services import (
+    driver_create,
+    driver_locations_flush,
+    order_create,
+    route_create,
+    route_reorder_stops,
+    vehicle_create,
+)
+from apps.users.models import User
+from apps.users.services import tenant_create, user_create
+
+SPACING = 0.01  # degrees between river_city grid nodes, about 1.1 km
+
+
+@pytest.fixture
+def tenant(db):
+    return tenant_create(name="Test Co", slug="test-co")
+
+
+@pytest.fixture
+def ops(tenant):
+    return user_create(
+        tenant=tenant, email="ops@test.co", password="pass",
+        full_name="Ops", role=User.Role.OPS_ADMIN,
+    )
+
+
+@pytest.fixture
+def ops_client(ops):
+    client = APIClient()
+    client.force_authenticate(ops)
+    return client
+
+
+@pytest.fixture
+def driver(tenant):
+    return driver_create(tenant=tenant, name="Driver", phone="1")
+
+
+@pytest.fixture
+def vehicle(tenant):
+    return vehicle_create(tenant=tenant, plate_number="TEST-1", vehicle_type="VAN", capacity_kg=500)
+
+
+@pytest.fixture
+def make_order(tenant, ops):
+    """``order_create`` with a pickup and a drop at ``(lat, lng)`` points; ``fields`` go to the order."""
+
+    def make(pickup, drop, **fields):
+        return order_create(
+            tenant=tenant,
+            reference_code=f"T-{uuid.uuid4().hex[:8]}",
+            customer_name="C",
+            customer_phone="9",
+            stops_data=[
+                {"sequence_index": 1, "type": "PICKUP", "address_line": "A", "lat": pickup[0], "lng": pickup[1]},
+                {"sequence_index": 2, "type": "DROP", "address_line": "B", "lat": drop[0], "lng": drop[1]},
+            ],
+            actor_user=ops,
+            **fields,
+        )
+
+    return make
+
+
+@pytest.fixture
+def make_orders(make_order):
+    """One order per pickup point, dropped ``offset`` degrees ``(lat, lng)`` away."""
+
+    def make(pickups, offset, **fields):
+        return [make_order((lat, lng), (lat + offset[0], lng + offset[1]), **fields) for lat, lng in pickups]
+
+    return make
+
+
+@pytest.fixture
+def make_route(tenant, ops):
+    """
+    ``route_create`` over ``orders``. ``pinned`` puts the stops in the order
+    given, each pickup before its drop, instead of their per-order indices.
+    """
+
+    def make(orders, route_date, *, driver, vehicle, pinned=False, **options):
+        route = route_create(
+            tenant=tenant, route_date=route_date, driver=driver, vehicle=vehicle,
+            order_ids=[str(o.id) for o in orders], actor_user=ops, **options,
+        )
+        if pinned:
+            route_reorder_stops(route=route, stop_order=[
+                str(s.id) for o in orders for s in o.stops.order_by("sequence_index")
+            ])
+        return route
+
+    return make
+
+
+@pytest.fixture
+def bulk_orders(db):
+    """
+    ``n`` bare orders for ``tenant``, inserted directly; ``drop`` gives each a
+    DROP stop with those fields and ``fields`` go to every order.
+    """
+
+    def make(tenant, n, *, prefix="BULK", phone="9", created_at=None, drop=None, **fields):
+        orders = Order.objects.bulk_create([
+            Order(
+                tenant=tenant, reference_code=f"{prefix}-{uuid.uuid4().hex[:10]}", customer_name="C",
+                customer_phone=phone + uuid.uuid4().hex[:8], tracking_token=uuid.uuid4().hex, **fields,
+            )
+            for _ in range(n)
+        ])
+        if drop is not None:
+            Stop.objects.bulk_create([
+                Stop(order=order, sequence_index=1, type=Stop.StopType.DROP, address_line="X", **drop)
+                for order in orders
+            ])
+        if created_at is not None:
+            Order.objects.filter(id__in=[o.id for o in orders]).update(created_at=created_at)
+        return orders
+
+    return make
+
+
+@pytest.fixture
+def river_city():
+    """
+    ``(nodes, edges)`` of a street grid split by a north-south river between
+    columns 1 and 2, with one bridge up north.
+    """
+    rows, cols, bridge_row = 5, 4, 4
+    nodes = [(12.90 + r * SPACING, 77.50 + c * SPACING) for r in range(rows) for c in range(cols)]
+    edges = []
+
+    def street(a, b):
+        km = haversine(*nodes[a], *nodes[b])
+        edges.extend([(a, b, km * 1000, km / 30 * 3600), (b, a, km * 1000, km / 30 * 3600)])
+
+    for r in range(rows):
+        for c in range(cols):
+            node = r * cols + c
+            if c + 1 < cols and (c != 1 or r == bridge_row):
+                street(node, node + 1)
+            if r + 1 < rows:
+                street(node, node + cols)
+    return nodes, edges
+
+
+class DictStore:
+    """Shared-store stand-in with Django's cache API that counts round trips."""
+
+    def __init__(self):
+        self.data, self.round_trips = {}, 0
+
+    def get_many(self, keys):
+        self.round_trips += 1
+        return {k: self.data[k] for k in keys if k in self.data}
+
+    def set_many(self, mapping, timeout=None):
+        self.round_trips += 1
+        self.data.update(mapping)
+
+
+@pytest.fixture
+def shared_store():
+    return DictStore()
+
+
+@pytest.fixture
+def flush_locations(django_capture_on_commit_callbacks):
+    """``driver_locations_flush`` as the beat task runs it, its on-commit cache writes applied."""
+
+    def flush():
+        with django_capture_on_commit_callbacks(execute=True):
+            return driver_locations_flush()
+
+    return flush
+
+
+class FakeChannelLayer:
+    """Records ``group_send`` calls instead of publishing them to Redis."""
+
+    def __init__(self):
+        self.sent = []
+
+    async def group_send(self, group, message):
+        self.sent.append((group, message))
+
+
+@pytest.fixture
+def channel_layer(monkeypatch):
+    layer = FakeChannelLayer()
+    monkeypatch.setattr("channels.layers.get_channel_layer", lambda: layer)
+    return layer
@@ -0,0 +1,233 @@
+"""
+Driver breadcrumb tests.
+
+Covers:
+- Delta/varint encoding round-trips and chains across appends
+- Douglas-Peucker keeps endpoints, turns and stops, and stays within tolerance
+- Encoded polylines match the reference encoding
+- Flushes append buffered pings to per-day segments without reading them back
+- One flush at a time; a failed flush leaves its pings buffered; an idle flush
+  loads no drivers
+- A ping still being written during a flush is appended by the next one, in
+  order; one that never lands is skipped
+- Closing past days simplifies segments, daily through the scheduled task; the
+  ops route detail serves the path
+"""
+import math
+from datetime import date, timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django_celery_beat.models import PeriodicTask
+
+from apps.logistics import tasks
+from apps.logistics.models import Breadcrumb
+from apps.logistics.optimization import breadcrumbs
+from apps.logistics.optimization.breadcrumbs import Point
+from apps.logistics.services import (
+    DRIVER_FLUSH_LOCK_KEY,
+    DRIVER_TRAIL_KEY,
+    DRIVER_TRAIL_SEQ_KEY,
+    breadcrumbs_close,
+    driver_create,
+    driver_record_location,
+    route_start,
+)
+
+T0 = 1_780_000_000
+
+
+def straight_trail(n, start=0):
+    """Driving north about 11 m every 5 s."""
+    return [Point(1_290_000 + 10 * i, 7_750_000, T0 + 5 * i) for i in range(start, start + n)]
+
+
+def sync_error_m(original, kept):
+    """Largest distance of an original point from its time-interpolated position on ``kept``."""
+    worst, j = 0.0, 0
+    for p in original:
+        while kept[j + 1].t < p.t:
+            j += 1
+        a, b = kept[j], kept[j + 1]
+        f = (p.t - a.t) / (b.t - a.t) if b.t != a.t else 0.0
+        dlat = p.lat - (a.lat + f * (b.lat - a.lat))
+        dlng = (p.lng - (a.lng + f * (b.lng - a.lng))) * math.cos(math.radians(p.lat / 1e5))
+        worst = max(worst, math.hypot(dlat, dlng) * 1.1132)
+    return worst
+
+
+class TestEncoding:
+    def test_round_trip_and_append(self):
+        trail = straight_trail(50) + [Point(-3_390_000, -7_050_000, T0 - 60)]
+        data = breadcrumbs.encode(trail[:20]) + breadcrumbs.encode(trail[20:], previous=trail[19])
+
+        assert breadcrumbs.decode(data) == trail
+        assert len(breadcrumbs.encode(trail[1:50], previous=trail[0])) == 3 * 49
+        with pytest.raises(ValueError):
+            breadcrumbs.decode(data[:-1])
+
+    def test_polyline_reference(self):
+        points = [breadcrumbs.quantize(*p, 0) for p in [(38.5, -120.2), (40.7, -120.95), (43.252, -126.453)]]
+        assert breadcrumbs.polyline(points) == "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+        assert breadcrumbs.polyline([]) == ""
+
+
+class TestSimplify:
+    def test_straight_run_collapses_to_endpoints(self):
+        trail = straight_trail(200)
+        assert breadcrumbs.simplify(trail, 5) == [trail[0], trail[-1]]
+
+    def test_turns_and_stops_are_kept(self):
+        north = straight_trail(100)
+        corner = north[-1]
+        parked = [Point(corner.lat, corner.lng, corner.t + 5 * i) for i in range(1, 60)]
+        east = [Point(corner.lat, corner.lng + 10 * i, parked[-1].t + 5 * i) for i in range(1, 100)]
+        trail = north + parked + east
+
+        kept = breadcrumbs.simplify(trail, 5)
+
+        assert kept[0] == trail[0] and kept[-1] == trail[-1]
+        assert corner in kept and parked[-1] in kept  # arrival and departure
+        assert len(kept) <= 6
+        assert sync_error_m(trail, kept) <= 5
+
+
+@pytest.mark.django_db
+class TestBreadcrumbs:
+    @pytest.fixture(autouse=True)
+    def use_flush(self, flush_locations):
+        self.flush = flush_locations
+
+    @pytest.fixture(autouse=True)
+    def trail_driver(self, tenant, ops, driver):
+        self.tenant, self.ops, self.driver = tenant, ops, driver
+
+    def ping(self, driver, n, lat=12.9):
+        for i in range(n):
+            driver_record_location(driver_id=driver.id, lat=lat + i * 1e-4, lng=77.5)
+
+    def test_flush_appends_to_day_segment(self):
+        other = driver_create(tenant=self.tenant, name="Other", phone="2")
+        self.ping(self.driver, 3)
+        self.ping(other, 2)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.flush()
+        assert len([q for q in ctx.captured_queries if "breadcrumbs" in q["sql"]]) == 2  # select, insert
+
+        self.ping(self.driver, 2, lat=12.9003)
+        with CaptureQueriesContext(connection) as ctx:
+            self.flush()
+        crumb_sql = [q["sql"] for q in ctx.captured_queries if "breadcrumbs" in q["sql"]]
+        assert len(crumb_sql) == 2 and crumb_sql[1].startswith('UPDATE "breadcrumbs"')
+        assert '"points"' not in crumb_sql[0].split("FROM")[0]  # the blob is not read back
+
+        segment = Breadcrumb.objects.get(driver=self.driver)
+        assert segment.day == timezone.localdate()
+        assert (segment.point_count, segment.ping_count) == (5, 5)
+        points = breadcrumbs.decode(segment.points)
+        assert [p.lat for p in points] == [1_290_000, 1_290_010, 1_290_020, 1_290_030, 1_290_040]
+        assert Breadcrumb.objects.get(driver=other).point_count == 2
+
+    def test_one_flush_at_a_time_and_failures_keep_pings(self, monkeypatch):
+        self.ping(self.driver, 2)
+        cache.add(DRIVER_FLUSH_LOCK_KEY, True)
+        assert self.flush() == []  # another run holds the lock
+        cache.delete(DRIVER_FLUSH_LOCK_KEY)
+
+        def fail(drivers):
+            raise RuntimeError("geofence down")
+
+        monkeypatch.setattr("apps.logistics.services._geofence_arrivals", fail)
+        with pytest.raises(RuntimeError):
+            self.flush()
+        assert not Breadcrumb.objects.exists() and cache.get(DRIVER_FLUSH_LOCK_KEY) is None
+
+        monkeypatch.undo()
+        assert [d.id for d in self.flush()] == [self.driver.id]
+        assert Breadcrumb.objects.get(driver=self.driver).point_count == 2
+
+        with CaptureQueriesContext(connection) as ctx:
+            assert self.flush() == []
+        assert len(ctx.captured_queries) == 1  # active driver ids only
+
+    def test_flush_waits_for_pings_being_written(self):
+        def lats():
+            return [p.lat for p in breadcrumbs.decode(Breadcrumb.objects.get(driver=self.driver).points)]
+
+        self.ping(self.driver, 2)
+        in_flight = cache.incr(DRIVER_TRAIL_SEQ_KEY.format(self.driver.id)), timezone.now()
+        self.ping(self.driver, 1, lat=12.9003)
+        self.flush()
+        assert lats() == [1_290_000, 1_290_010]
+
+        n, at = in_flight
+        cache.set(DRIVER_TRAIL_KEY.format(self.driver.id, n), (12.9002, 77.5, at))
+        self.flush()
+        assert lats() == [1_290_000, 1_290_010, 1_290_020, 1_290_030]
+
+        cache.incr(DRIVER_TRAIL_SEQ_KEY.format(self.driver.id))  # claimed, never written
+        self.ping(self.driver, 1, lat=12.9004)
+        self.flush()
+        self.flush()
+        assert lats()[-1] == 1_290_040 and len(lats()) == 5
+        assert not cache.get_many([DRIVER_TRAIL_KEY.format(self.driver.id, n) for n in range(1, 8)])
+
+    def test_close_simplifies_past_days(self, settings):
+        settings.BREADCRUMB_TOLERANCE_M = 5
+        yesterday = timezone.localdate() - timedelta(days=1)
+        trail = straight_trail(300)
+        now = timezone.now()
+        Breadcrumb.objects.create(
+            tenant=self.tenant, driver=self.driver, day=yesterday,
+            points=breadcrumbs.encode(trail), point_count=300, ping_count=300,
+            last_lat=trail[-1].lat, last_lng=trail[-1].lng, last_t=trail[-1].t,
+            started_at=now, ended_at=now,
+        )
+        self.ping(self.driver, 3)
+        self.flush()  # today's segment stays open
+
+        assert breadcrumbs_close() == 1
+        segment = Breadcrumb.objects.get(driver=self.driver, day=yesterday)
+        assert segment.closed_at and (segment.point_count, segment.ping_count) == (2, 300)
+        assert breadcrumbs.decode(segment.points) == [trail[0], trail[-1]]
+        assert Breadcrumb.objects.get(driver=self.driver, day=timezone.localdate()).closed_at is None
+        assert breadcrumbs_close() == 0
+
+    def test_scheduled_close_shrinks_past_days(self):
+        yesterday = timezone.localdate() - timedelta(days=1)
+        trail = straight_trail(300)
+        now = timezone.now()
+        segment = Breadcrumb.objects.create(
+            tenant=self.tenant, driver=self.driver, day=yesterday,
+            points=breadcrumbs.encode(trail), point_count=300, ping_count=300,
+            last_lat=trail[-1].lat, last_lng=trail[-1].lng, last_t=trail[-1].t,
+            started_at=now, ended_at=now,
+        )
+
+        task = PeriodicTask.objects.get(task="logistics.close_breadcrumbs")
+        assert task.enabled and (task.crontab.minute, task.crontab.hour, task.crontab.day_of_week) == ("15", "0", "*")
+        tasks.close_breadcrumbs.app.tasks[task.task].apply()  # as beat sends it, by name
+
+        segment.refresh_from_db()
+        assert segment.closed_at and segment.point_count == 2
+        assert len(segment.points) < len(breadcrumbs.encode(trail)) // 40
+
+    def test_route_detail_serves_path(self, channel_layer, vehicle, ops_client, make_order, make_route):
+        order = make_order((12.95, 77.6), (12.96, 77.6))
+        route = make_route([order], date.today(), driver=self.driver, vehicle=vehicle)
+        assert ops_client.get(f"/api/v1/ops/routes/{route.id}/").data["path"] == ""
+
+        route_start(route=route, actor_user=self.ops)
+        driver_record_location(driver_id=self.driver.id, lat=38.5, lng=-120.2)
+        driver_record_location(driver_id=self.driver.id, lat=40.7, lng=-120.95)
+        self.flush()
+        driver_record_location(driver_id=self.driver.id, lat=43.252, lng=-126.453)
+        self.flush()
+
+        resp = ops_client.get(f"/api/v1/ops/routes/{route.id}/")
+        assert resp.status_code == 200, resp.data
+        assert resp.data["path"] == "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
@@ -0,0 +1,208 @@
+"""
+Route ETA tests.
+
+Covers:
+- eta.arrivals adds legs and service time and waits for windows to open
+- Provider leg_times agree with the full travel-time matrices
+- route_create / route_reorder_stops write ETAs for the whole route in one UPDATE
+- route_start forecasts from now and the driver's position, skipping visited stops
+- Live ETAs from driver pings: movement threshold, per-route rate limit, cached
+  geometry, and only shifted ETAs pushed to tracking groups
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.logistics.models import Stop
+from apps.logistics.optimization import eta, providers
+from apps.logistics.services import LIVE_ETA_THROTTLE_KEY
+from apps.logistics.optimization.roads import RoadGraph
+from apps.logistics.optimization.travel_cache import TravelTimeCache
+from apps.logistics.services import (
+    driver_locations_flush,
+    driver_record_location,
+    route_reorder_stops,
+    route_start,
+    route_update_etas,
+)
+
+START = datetime(2026, 6, 1, 9, 0, tzinfo=dt_timezone.utc)
+POINTS = [(12.95, 77.50), (12.96, 77.51), (12.97, 77.50), (12.98, 77.52)]
+
+
+class TestArrivals:
+    def test_legs_service_and_waiting(self):
+        assert eta.arrivals([0, 600, 300], [120, 120, 120], [0, 0, 3600]) == [0, 720, 3600]
+
+    def test_leg_times_match_travel_time_matrices(self, river_city, shared_store):
+        points = [(12.9001, 77.51), (12.9001, 77.52), (12.9201, 77.51), (12.9001, 77.51)]
+        graph = RoadGraph.from_edges(*river_city)
+        for provider in (
+            providers.HaversineProvider(),
+            providers.RoadGraphProvider(graph),
+            providers.CachedProvider(providers.RoadGraphProvider(graph), TravelTimeCache(shared_store)),
+        ):
+            seconds = provider.travel_times(points, speed_kmh=30)
+            legs = provider.leg_times(points, speed_kmh=30)
+            assert legs == pytest.approx([seconds[i][i + 1] for i in range(len(points) - 1)])
+
+
+class RouteFixtures:
+    @pytest.fixture(autouse=True)
+    def route_fixtures(self, tenant, ops, driver, vehicle, make_order, make_route):
+        cache.clear()
+        self.tenant, self.ops, self.driver, self.vehicle = tenant, ops, driver, vehicle
+        self.make_order, self._make_route = make_order, make_route
+
+    def make_route(self, **windows):
+        orders = [self.make_order(a, b, **windows) for a, b in zip(POINTS[::2], POINTS[1::2])]
+        route = self._make_route(orders, START.date(), driver=self.driver, vehicle=self.vehicle)
+        assert all(s.scheduled_eta for s in self.stops(route))
+        # Unoptimized stops keep their per-order indices; pin them to POINTS order
+        route_reorder_stops(route=route, stop_order=[
+            str(s.id) for o in orders for s in o.stops.order_by("sequence_index")
+        ])
+        return route
+
+    def stops(self, route):
+        return list(Stop.objects.filter(order__assigned_route=route).order_by("sequence_index"))
+
+
+@pytest.mark.django_db
+class TestRouteEtas(RouteFixtures):
+    def test_route_create_schedules_whole_route(self, settings):
+        settings.ROUTE_DAY_START = "09:00"
+        settings.ROUTE_AVERAGE_SPEED_KMH = 30
+        settings.ROUTE_SERVICE_TIME_MINUTES = 5
+        route = self.make_route()
+
+        stops = self.stops(route)
+        etas = [s.scheduled_eta for s in stops]
+        assert etas[0] == START
+        for prev, stop, arrival in zip(stops, stops[1:], etas[1:]):
+            drive = providers.HaversineProvider().leg_times(
+                [(prev.lat, prev.lng), (stop.lat, stop.lng)], 30
+            )[0]
+            assert arrival - prev.scheduled_eta == pytest.approx(
+                timedelta(minutes=5, seconds=drive), abs=timedelta(milliseconds=1)
+            )
+
+    def test_waits_for_drop_window(self, settings):
+        settings.ROUTE_DAY_START = "09:00"
+        opens = START + timedelta(hours=2)
+        route = self.make_route(drop_window_start=opens)
+
+        drops = [s for s in self.stops(route) if s.type == Stop.StopType.DROP]
+        assert all(s.scheduled_eta >= opens for s in drops)
+
+    def test_reorder_refreshes_etas_in_one_update(self):
+        route = self.make_route()
+        stops = self.stops(route)
+        order = [stops[2], stops[3], stops[0], stops[1]]
+
+        with CaptureQueriesContext(connection) as ctx:
+            route_reorder_stops(route=route, stop_order=[str(s.id) for s in order])
+
+        eta_updates = [
+            q for q in ctx.captured_queries
+            if q["sql"].startswith('UPDATE "stops"') and "scheduled_eta" in q["sql"]
+        ]
+        assert len(eta_updates) == 1
+        after = self.stops(route)
+        assert [s.id for s in after] == [s.id for s in order]
+        etas = [s.scheduled_eta for s in after]
+        assert etas == sorted(etas) and len(set(etas)) == 4
+
+    def test_started_route_forecasts_from_driver(self):
+        route = self.make_route()
+        first = self.stops(route)[0]
+        Stop.objects.filter(id=first.id).update(status=Stop.StopStatus.COMPLETED)
+        self.driver.current_lat, self.driver.current_lng = POINTS[1]
+        self.driver.save(update_fields=["current_lat", "current_lng"])
+
+        before = timezone.now()
+        route_start(route=route, actor_user=self.ops)
+
+        stops = self.stops(route)
+        assert stops[0].scheduled_eta == first.scheduled_eta  # visited, left alone
+        assert before <= stops[1].scheduled_eta <= timezone.now()  # the driver is at stop 2
+        assert stops[1].scheduled_eta < stops[2].scheduled_eta < stops[3].scheduled_eta
+
+    def test_unlocated_stops_have_no_eta(self):
+        route = self.make_route()
+        Stop.objects.filter(id=self.stops(route)[-1].id).update(lat=None, lng=None)
+
+        updated = route_update_etas(route=route)
+
+        assert updated[-1].scheduled_eta is None
+        assert all(s.scheduled_eta for s in updated[:-1])
+
+
+def stop_reads(ctx):
+    return [q for q in ctx.captured_queries if q["sql"].startswith("SELECT") and '"stops"' in q["sql"]]
+
+
+@pytest.mark.django_db
+class TestLiveEtas(RouteFixtures):
+    def start_route(self, channel_layer, settings):
+        settings.ROUTE_LIVE_ETA_MIN_MOVE_M = 200
+        settings.ROUTE_LIVE_ETA_MIN_SHIFT_MINUTES = 2
+        self.layer = channel_layer
+        route = self.make_route()
+        self.driver.current_lat, self.driver.current_lng = POINTS[0]
+        self.driver.save(update_fields=["current_lat", "current_lng"])
+        route_start(route=route, actor_user=self.ops)
+        return route
+
+    def ping(self, route, lat, lng, capture):
+        cache.delete(LIVE_ETA_THROTTLE_KEY.format(route.id))
+        with capture(execute=True):
+            driver_record_location(driver_id=self.driver.id, lat=lat, lng=lng)
+            driver_locations_flush()
+
+    def test_detour_pushes_shifted_etas_to_tracking_groups(
+        self, channel_layer, settings, django_capture_on_commit_callbacks
+    ):
+        route = self.start_route(channel_layer, settings)
+        planned = {s.id: s.scheduled_eta for s in self.stops(route)}
+
+        self.ping(route, *POINTS[0], django_capture_on_commit_callbacks)
+        assert self.layer.sent == []  # still on plan
+
+        self.ping(route, 12.95, 77.60, django_capture_on_commit_callbacks)  # ~11 km off course
+
+        stops = self.stops(route)
+        assert all(s.scheduled_eta - planned[s.id] > timedelta(minutes=20) for s in stops)
+        groups = {group for group, _ in self.layer.sent}
+        assert groups == {f"tracking_{s.order_id}" for s in stops}
+        group, message = self.layer.sent[0]
+        assert message["type"] == "eta_updated" and len(message["stops"]) == 2
+
+    def test_movement_threshold_and_rate_limit(
+        self, channel_layer, settings, django_capture_on_commit_callbacks
+    ):
+        route = self.start_route(channel_layer, settings)
+        self.ping(route, 12.95, 77.60, django_capture_on_commit_callbacks)
+        sent = len(self.layer.sent)
+
+        # Throttled: far enough away, but within the interval
+        with django_capture_on_commit_callbacks(execute=True):
+            driver_record_location(driver_id=self.driver.id, lat=12.95, lng=77.70)
+            driver_locations_flush()
+        assert len(self.layer.sent) == sent
+
+        # Under the movement threshold: skipped without reading stops for the forecast
+        with CaptureQueriesContext(connection) as ctx:
+            self.ping(route, 12.9505, 77.6005, django_capture_on_commit_callbacks)
+        assert len(stop_reads(ctx)) == 1  # the geofence lookup
+        assert len(self.layer.sent) == sent
+
+        # Moved, but ETAs shift by less than the minimum: forecast from cached geometry, nothing pushed
+        with CaptureQueriesContext(connection) as ctx:
+            self.ping(route, 12.953, 77.60, django_capture_on_commit_callbacks)
+        assert len(stop_reads(ctx)) == 1
+        assert len(self.layer.sent) == sent
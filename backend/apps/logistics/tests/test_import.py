@@ -0,0 +1,224 @@
+"""
+Bulk order import tests.
+
+Covers:
+- CSV and NDJSON readers: flattened stop columns, unreadable lines
+- orders_import writes orders, stops, history, events and outbox rows per chunk
+  in a fixed number of queries, whatever the chunk holds
+- 5,000 orders import at IMPORT_ORDERS_PER_S or better, committed chunk by chunk
+- Values survive the COPY: tabs, newlines, backslashes, a literal \\N, nulls
+- Per-row error report: validation errors, duplicates in the tenant and in the file
+- A file unreadable part-way keeps the chunks before it and reports where to resume
+- /ops/orders/import/ endpoint and import_orders management command
+"""
+import io
+import json
+import time
+from io import StringIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.logistics import order_import
+from apps.logistics.models import Event, Order, OutboxMessage, StatusHistory, Stop
+from apps.logistics.services import order_create, orders_import
+from apps.users.models import User
+from apps.users.services import tenant_create, user_create
+
+# The import's throughput target against local Postgres
+IMPORT_ORDERS_PER_S = 2000
+
+CSV_HEADER = (
+    "reference_code,customer_name,customer_phone,weight_kg,"
+    "pickup_address_line,pickup_lat,pickup_lng,drop_address_line,drop_lat,drop_lng\n"
+)
+
+
+def csv_row(ref, weight="1.5"):
+    return f"{ref},Customer,999,{weight},Warehouse,12.9,77.5,Home,12.95,77.55\n"
+
+
+def ndjson_row(ref, **extra):
+    return json.dumps({
+        "reference_code": ref,
+        "customer_name": "Customer",
+        "customer_phone": "999",
+        "stops": [
+            {"sequence_index": 1, "type": "PICKUP", "address_line": "Warehouse"},
+            {"sequence_index": 2, "type": "DROP", "address_line": "Home", "lat": 12.95, "lng": 77.55},
+        ],
+        **extra,
+    }) + "\n"
+
+
+def read(text, fmt):
+    return list(order_import.read_rows(io.BytesIO(text.encode()), fmt))
+
+
+class TestReaders:
+    def test_csv_flattens_stops(self):
+        (line, data, error), = read(CSV_HEADER + csv_row("A-1"), "csv")
+
+        assert (line, error) == (2, None)
+        assert data["reference_code"] == "A-1" and data["weight_kg"] == "1.5"
+        assert [s["type"] for s in data["stops"]] == ["PICKUP", "DROP"]
+        assert data["stops"][1] == {
+            "sequence_index": 2, "type": "DROP", "address_line": "Home", "lat": "12.95", "lng": "77.55"
+        }
+
+    def test_unreadable_lines_are_reported(self):
+        rows = read(ndjson_row("A-1") + "{oops\n\n[1]\n", "ndjson")
+
+        assert [(line, error is None) for line, _, error in rows] == [(1, True), (2, False), (4, False)]
+        with pytest.raises(ValueError, match="customer_phone"):
+            read("reference_code,customer_name\nA,B\n", "csv")
+        assert order_import.guess_format("orders.JSONL") == "ndjson"
+
+
+@pytest.mark.django_db
+class TestOrdersImport:
+    def setup_method(self):
+        self.tenant = tenant_create(name="Import Co", slug="import-co")
+        self.ops = user_create(
+            tenant=self.tenant, email="ops@import.co", password="pass",
+            full_name="Ops", role=User.Role.OPS_ADMIN,
+        )
+
+    def run_import(self, text, fmt="csv", **kwargs):
+        return orders_import(
+            tenant=self.tenant, rows=order_import.read_rows(io.BytesIO(text.encode()), fmt),
+            actor_user=self.ops, **kwargs,
+        )
+
+    @pytest.mark.parametrize("n", [10, 40])
+    def test_query_count_is_fixed_per_chunk(self, n):
+        text = CSV_HEADER + "".join(csv_row(f"BULK-{k}") for k in range(n))
+
+        with CaptureQueriesContext(connection) as ctx:
+            report = self.run_import(text, chunk_size=50)
+
+        # Existing references, orders, stops, history, events, outbox, and the savepoint pair
+        assert len(ctx.captured_queries) == 8
+        assert report == {"rows": n, "created": n, "errors": []}
+        assert Stop.objects.filter(order__tenant=self.tenant).count() == 2 * n
+        assert StatusHistory.objects.filter(tenant=self.tenant, to_status=Order.Status.CREATED).count() == n
+        assert Event.objects.filter(tenant=self.tenant, type="order.created").count() == n
+        assert OutboxMessage.objects.filter(event__tenant=self.tenant).count() == n
+        order = Order.objects.get(reference_code="BULK-0")
+        assert order.weight_kg == 1.5 and order.tracking_token
+
+    def test_values_round_trip(self):
+        awkward = "tab\there, line\nbreak, back\\slash, \\N, naïve"
+        text = ndjson_row(
+            "ODD-1", customer_name="\\N", notes=awkward, drop_window_start="2026-03-01T09:30:00+05:30",
+        )
+
+        assert self.run_import(text, fmt="ndjson")["created"] == 1
+
+        order = Order.objects.get(reference_code="ODD-1")
+        assert (order.customer_name, order.notes, order.customer_email) == ("\\N", awkward, "")
+        assert order.drop_window_start.isoformat() == "2026-03-01T04:00:00+00:00"
+        assert order.pickup_window_start is None and order.weight_kg == 0
+        pickup, drop = order.stops.all()
+        assert (pickup.lat, pickup.city, drop.lat) == (None, "", 12.95)
+        assert order.created_at and order.status_history.get().actor_user == self.ops
+        payload = Event.objects.get(tenant=self.tenant).payload
+        assert payload == {"order_id": str(order.id), "reference_code": "ODD-1"}
+
+    def test_row_errors_and_duplicates(self):
+        order_create(
+            tenant=self.tenant, reference_code="TAKEN", customer_name="C", customer_phone="9",
+            stops_data=[{"sequence_index": 1, "type": "DROP", "address_line": "X"}],
+        )
+        text = (
+            ndjson_row("OK-1")
+            + ndjson_row("TAKEN")
+            + ndjson_row("OK-2", weight_kg=-1)
+            + "not json\n"
+            + ndjson_row("OK-3", stops=[])
+            + ndjson_row("OK-1")  # repeated in the next chunk
+            + ndjson_row("OK-4")
+        )
+
+        report = self.run_import(text, fmt="ndjson", chunk_size=3)
+
+        assert (report["rows"], report["created"]) == (7, 2)
+        errors = {e["line"]: e["errors"] for e in report["errors"]}
+        assert sorted(errors) == [2, 3, 4, 5, 6]
+        assert "already exists" in str(errors[2]["reference_code"][0])
+        assert "weight_kg" in errors[3] and "stops" in errors[5]
+        assert "already exists" in str(errors[6]["reference_code"][0])
+        assert set(Order.objects.values_list("reference_code", flat=True)) == {"TAKEN", "OK-1", "OK-4"}
+
+    def test_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.ops)
+        text = CSV_HEADER + csv_row("API-1") + csv_row("API-2", weight="x")
+        upload = SimpleUploadedFile("orders.csv", text.encode())
+
+        resp = client.post("/api/v1/ops/orders/import/", {"file": upload}, format="multipart")
+
+        assert resp.status_code == 200, resp.data
+        assert resp.data["created"] == 1
+        assert resp.data["errors"][0]["line"] == 3 and "weight_kg" in resp.data["errors"][0]["errors"]
+
+        unknown = SimpleUploadedFile("orders.txt", text.encode())
+        resp = client.post("/api/v1/ops/orders/import/", {"file": unknown}, format="multipart")
+        assert resp.status_code == 400 and "format" in resp.data["detail"]
+
+    def test_unreadable_tail_is_resumable(self):
+        # Past the reader's first 8 KiB block, so earlier chunks are committed first
+        lines = [ndjson_row(f"PART-{k}") for k in range(120)]
+        data = "".join(lines[:100]).encode() + b"\xff\xfe\n" + "".join(lines[100:]).encode()
+        client = APIClient()
+        client.force_authenticate(self.ops)
+
+        with override_settings(ORDER_IMPORT_CHUNK_SIZE=10):
+            resp = client.post(
+                "/api/v1/ops/orders/import/",
+                {"file": SimpleUploadedFile("orders.ndjson", data)}, format="multipart",
+            )
+
+        assert resp.status_code == 207, resp.data
+        created, line = resp.data["created"], resp.data["stopped"]["line"]
+        assert 0 < created < 100 and line == created + 1 and not resp.data["errors"]
+        assert Order.objects.filter(tenant=self.tenant).count() == created
+
+        # Resume from the reported line, the corrupt one repaired
+        report = self.run_import("".join(lines[line - 1:]), fmt="ndjson")
+        assert report["created"] == 120 - created and "stopped" not in report
+
+        with pytest.raises(ValueError):
+            self.run_import("")  # no header at all: nothing to import
+
+    def test_command(self, tmp_path):
+        path = tmp_path / "orders.ndjson"
+        path.write_text(ndjson_row("CMD-1") + ndjson_row("CMD-1"))
+        out, err = StringIO(), StringIO()
+
+        call_command("import_orders", tenant_slug="import-co", file=str(path), stdout=out, stderr=err)
+
+        assert "Imported 1 of 2 rows" in out.getvalue()
+        assert err.getvalue().startswith("line 2:")
+        assert Order.objects.filter(tenant=self.tenant, reference_code="CMD-1").count() == 1
+
+
+# Transactional, so every chunk really commits; the serialized rollback restores
+# the rows data migrations created, such as the beat schedules
+@pytest.mark.django_db(transaction=True, serialized_rollback=True)
+def test_import_rate():
+    tenant = tenant_create(name="Rate Co", slug="rate-co")
+    rates = []
+    for run in range(3):  # best of three, as the benchmarks keep, to ride out a noisy host
+        text = (CSV_HEADER + "".join(csv_row(f"RATE-{run}-{k}") for k in range(5000))).encode()
+        started = time.perf_counter()
+        report = orders_import(tenant=tenant, rows=order_import.read_rows(io.BytesIO(text), "csv"))
+        rates.append(report["created"] / (time.perf_counter() - started))
+        assert report["created"] == 5000
+
+    assert max(rates) >= IMPORT_ORDERS_PER_S, f"{max(rates):.0f} orders/s"
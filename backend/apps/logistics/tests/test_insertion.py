@@ -0,0 +1,237 @@
+"""
+Cheapest-insertion tests.
+
+Covers:
+- insertion.cheapest_insertion agrees with brute force and keeps visited stops fixed,
+  and prices over the distance matrix it is given
+- Ranked candidates served from cached route geometry, invalidated on changes, and
+  priced over the configured distance provider
+- POST /ops/orders/<id>/insertion/ committing the best route
+- Windowed repair of live routes on cancel / reassign, with visited stops fixed
+"""
+import random
+from datetime import date
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.logistics.models import Order, Route, Stop
+from apps.logistics.optimization.distance import DistanceMatrix
+from apps.logistics.optimization import providers, repair
+from apps.logistics.optimization.insertion import cheapest_insertion
+from apps.logistics.optimization.precedence import Precedence
+from apps.logistics.services import (
+    driver_create,
+    order_cancel,
+    order_insert,
+    order_insertion_candidates,
+    order_reassign,
+    route_start,
+    vehicle_create,
+)
+
+TODAY = date(2026, 5, 4)
+
+
+def brute_force(points, first_open, pickup, drop):
+    best = None
+    for i in range(first_open - 1, len(points)):
+        for j in range(i, len(points)):
+            tour = list(points)
+            tour.insert(j + 1, drop)
+            tour.insert(i + 1, pickup)
+            added = DistanceMatrix.from_points(tour).tour_length(range(len(tour)))
+            if best is None or added < best:
+                best = added
+    return best - DistanceMatrix.from_points(points).tour_length(range(len(points)))
+
+
+class TestCheapestInsertion:
+    @pytest.mark.parametrize("seed", range(5))
+    def test_matches_brute_force(self, seed):
+        rng = random.Random(seed)
+        points = [(12.9 + rng.random() * 0.2, 77.5 + rng.random() * 0.2) for _ in range(9)]
+        pickup, drop = points.pop(), points.pop()
+        first_open = seed % 3
+
+        best = cheapest_insertion(points, first_open, pickup, drop)
+
+        assert best.added_km == pytest.approx(brute_force(points, first_open, pickup, drop))
+        assert first_open - 1 <= best.pickup_after <= best.drop_after
+
+    def test_prices_over_the_given_matrix(self):
+        points, drop = [(12.90, 77.50), (12.90, 77.52)], (12.90, 77.51)
+        # Straight-line the drop sits between the two; by road it is only near the second
+        matrix = DistanceMatrix([[0, 2, 10], [2, 0, 1], [10, 1, 0]])
+
+        assert cheapest_insertion(points, 0, drop=drop).drop_after == 0
+        best = cheapest_insertion(points, 0, drop=drop, matrix=matrix)
+        assert (best.drop_after, best.added_km) == (1, 1)
+
+    def test_single_stop_and_empty_route(self):
+        points = [(12.90, 77.50), (12.92, 77.50)]
+        assert cheapest_insertion(points, 0, drop=(12.91, 77.50)).drop_after == 0
+        assert cheapest_insertion([], 0, (12.9, 77.5), (12.9, 77.6)).pickup_after == -1
+
+
+class TestRepair:
+    def test_windows_merge_and_skip_anchor(self):
+        assert repair.windows(20, {0, 3, 9, 17}, radius=2) == [(1, 5), (7, 11), (15, 19)]
+        assert repair.windows(20, {4, 7}, radius=2) == [(2, 9)]
+
+    def test_only_windows_change_and_never_worse(self):
+        rng = random.Random(3)
+        points = [(12.9 + rng.random() * 0.3, 77.5 + rng.random() * 0.3) for _ in range(31)]
+        matrix = DistanceMatrix.from_points(points)
+        precedence = Precedence(31, [(i, i + 15) for i in range(1, 16)])
+        tour = list(range(31))
+
+        repaired = repair.repair(matrix, tour, {10}, precedence, radius=3)
+
+        assert repaired[:7] == tour[:7] and repaired[14:] == tour[14:]
+        assert sorted(repaired[7:14]) == tour[7:14]
+        assert precedence.is_feasible(repaired)
+        assert matrix.tour_length(repaired) <= matrix.tour_length(tour) + 1e-9
+
+
+class RiverProvider(providers.HaversineProvider):
+    """Straight-line, but crossing the river at lng 77.58 is a 50 km detour."""
+
+    def matrix(self, points):
+        rows = super().matrix(points).rows
+        bank = [lng > 77.58 for _, lng in points]
+        return DistanceMatrix([
+            [km + 50 * (bank[i] != bank[j]) for j, km in enumerate(row)] for i, row in enumerate(rows)
+        ])
+
+
+class RouteFixtures:
+    """Two 3-order routes for the same day: one in the west of town, one in the east."""
+
+    @pytest.fixture(autouse=True)
+    def routes(self, tenant, ops, make_order, make_orders, make_route):
+        cache.clear()
+        self.tenant, self.ops = tenant, ops
+        self.make_order, self._make_orders, self._make_route = make_order, make_orders, make_route
+        self.west = self.make_route("W", [(12.95, 77.50), (12.97, 77.51), (12.99, 77.50)])
+        self.east = self.make_route("E", [(12.95, 77.70), (12.97, 77.71), (12.99, 77.70)])
+
+    def make_route(self, name, points):
+        driver = driver_create(tenant=self.tenant, name=f"Driver {name}", phone=name)
+        vehicle = vehicle_create(
+            tenant=self.tenant, plate_number=f"INS-{name}", vehicle_type="VAN", capacity_kg=10
+        )
+        orders = self._make_orders(points, offset=(0.005, 0.0), weight_kg=1.0)
+        return self._make_route(orders, TODAY, driver=driver, vehicle=vehicle, optimize="2opt")
+
+
+@pytest.mark.django_db
+class TestOrderInsertion(RouteFixtures):
+    def test_ranks_nearest_route_first_from_cache(self):
+        order = self.make_order((12.96, 77.69), (12.98, 77.69))
+        order_insertion_candidates(order=order, route_date=TODAY)
+
+        with CaptureQueriesContext(connection) as ctx:
+            candidates = order_insertion_candidates(order=order, route_date=TODAY)
+
+        assert [c["route"].id for c in candidates] == [self.east.id, self.west.id]
+        assert candidates[0]["added_km"] < candidates[1]["added_km"]
+        assert not [q for q in ctx.captured_queries if '"stops"' in q["sql"] and "assigned_route" in q["sql"]]
+
+    def test_ranks_over_the_configured_provider(self, monkeypatch):
+        # Nearer the west route as the crow flies, but on the east route's bank
+        order = self.make_order((12.96, 77.59), (12.98, 77.59))
+        assert order_insertion_candidates(order=order, route_date=TODAY)[0]["route"].id == self.west.id
+
+        monkeypatch.setattr("apps.logistics.services._distance_provider", RiverProvider)
+
+        assert order_insertion_candidates(order=order, route_date=TODAY)[0]["route"].id == self.east.id
+
+    def test_commit_splices_stops_and_invalidates_cache(self):
+        order = self.make_order((12.96, 77.69), (12.98, 77.69))
+        before = order_insertion_candidates(order=order, route_date=TODAY)[0]
+
+        order_insert(order=order, route=self.east, actor_user=self.ops)
+
+        order.refresh_from_db()
+        assert order.status == Order.Status.ASSIGNED and order.assigned_route_id == self.east.id
+        stops = list(Stop.objects.filter(order__assigned_route=self.east).order_by("sequence_index"))
+        assert [s.sequence_index for s in stops] == list(range(1, 9))
+        mine = [s for s in stops if s.order_id == order.id]
+        assert mine[0].type == Stop.StopType.PICKUP and mine[1].type == Stop.StopType.DROP
+        if before["pickup_after_stop_id"]:
+            anchor = next(i for i, s in enumerate(stops) if str(s.id) == str(before["pickup_after_stop_id"]))
+            assert stops[anchor + 1] == mine[0]
+
+        other = self.make_order((12.96, 77.69), (12.98, 77.69))
+        again = order_insertion_candidates(order=other, route_date=TODAY)[0]
+        assert again["route"].id == self.east.id
+        assert again["pickup_after_stop_id"] is not None
+
+    def test_skips_completed_stops_and_full_vehicles(self):
+        first = list(Stop.objects.filter(order__assigned_route=self.west).order_by("sequence_index")[:2])
+        Stop.objects.filter(id__in=[s.id for s in first]).update(status=Stop.StopStatus.COMPLETED)
+        cache.clear()  # completed behind the services' back
+        order = self.make_order((12.95, 77.49), (12.95, 77.495))
+
+        candidates = order_insertion_candidates(order=order, route_date=TODAY)
+
+        west = next(c for c in candidates if c["route"].id == self.west.id)
+        assert west["pickup_after_stop_id"] is not None
+        assert str(west["pickup_after_stop_id"]) != str(first[0].id)
+
+        heavy = self.make_order((12.95, 77.49), (12.95, 77.495), weight_kg=8)
+        assert order_insertion_candidates(order=heavy, route_date=TODAY) == []
+
+    def test_insertion_endpoint_commits_best_route(self, ops_client):
+        order = self.make_order((12.96, 77.51), (12.98, 77.51))
+
+        resp = ops_client.post(
+            f"/api/v1/ops/orders/{order.id}/insertion/",
+            {"route_date": str(TODAY), "commit": True},
+            format="json",
+        )
+
+        assert resp.status_code == 200, resp.data
+        assert resp.data["inserted_route_id"] == str(self.west.id)
+        assert resp.data["candidates"][0]["route_id"] == str(self.west.id)
+        assert Route.objects.get(pk=self.west.id).orders.filter(pk=order.pk).exists()
+
+
+@pytest.mark.django_db
+class TestRouteRepair(RouteFixtures):
+    def route_stops(self, route):
+        return list(Stop.objects.filter(order__assigned_route=route).order_by("sequence_index"))
+
+    def assert_consistent(self, route):
+        stops = self.route_stops(route)
+        assert [s.sequence_index for s in stops] == list(range(1, len(stops) + 1))
+        pickups = {s.order_id: s.sequence_index for s in stops if s.type == Stop.StopType.PICKUP}
+        assert all(pickups[s.order_id] < s.sequence_index for s in stops if s.type == Stop.StopType.DROP)
+
+    def test_cancel_mid_route_keeps_visited_stops_and_drops_cancelled(self):
+        route_start(route=self.west, actor_user=self.ops)
+        self.west.driver.current_lat, self.west.driver.current_lng = 12.96, 77.505
+        self.west.driver.save(update_fields=["current_lat", "current_lng"])
+        stops = self.route_stops(self.west)
+        Stop.objects.filter(id=stops[0].id).update(status=Stop.StopStatus.COMPLETED)
+        victim = next(s.order for s in stops[1:] if s.order_id != stops[0].order_id)
+
+        order_cancel(order=victim, reason="customer", actor_user=self.ops)
+
+        after = self.route_stops(self.west)
+        assert after[0].id == stops[0].id
+        assert [s.order_id for s in after[-2:]] == [victim.id, victim.id]
+        self.assert_consistent(self.west)
+
+    def test_reassign_splices_into_target_and_closes_source_gap(self):
+        moved = self.route_stops(self.west)[0].order
+
+        order_reassign(order=moved, target_route=self.east, note="", actor_user=self.ops)
+
+        self.assert_consistent(self.west)
+        self.assert_consistent(self.east)
+        assert len(self.route_stops(self.west)) == 4
+        assert {s.order_id for s in self.route_stops(self.east)} >= {moved.id}
@@ -0,0 +1,111 @@
+"""
+Background optimization job tests.
+
+Covers:
+- anytime.search keeps the best feasible tour and stops at its deadline
+- POST /ops/routes/<id>/optimize/ runs the job on commit and pushes route_updated
+- Jobs are rejected for busy or non-PLANNED routes and discard stale results
+"""
+import random
+import time
+
+import pytest
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+from apps.logistics.models import OptimizationJob, Route, Stop
+from apps.logistics.optimization import anytime, sequencing
+from apps.logistics.optimization.distance import DistanceMatrix
+from apps.logistics.optimization.precedence import Precedence
+from apps.logistics.services import optimization_job_create, optimization_job_run
+
+
+class TestAnytimeSearch:
+    def test_never_worse_feasible_and_bounded_by_deadline(self):
+        rng = random.Random(4)
+        points = [(12.9 + rng.random() * 0.3, 77.5 + rng.random() * 0.3) for _ in range(41)]
+        matrix = DistanceMatrix.from_points(points)
+        precedence = Precedence(41, [(i, i + 20) for i in range(1, 21)])
+        stages = sequencing.MODES["2opt"]
+        _, local = sequencing.solve(matrix, "2opt", precedence)
+
+        started = time.monotonic()
+        best, iterations = anytime.search(
+            local,
+            cost=matrix.tour_length,
+            improve=lambda t: sequencing.improve(matrix, t, stages, precedence),
+            deadline=started + 0.5,
+            precedence=precedence,
+        )
+
+        assert time.monotonic() - started < 1.5
+        assert iterations > 0
+        assert sorted(best) == list(range(41)) and best[0] == local[0]
+        assert precedence.is_feasible(best)
+        assert matrix.tour_length(best) <= matrix.tour_length(local) + 1e-9
+
+
+@pytest.mark.django_db
+class TestOptimizationJobs:
+    @pytest.fixture(autouse=True)
+    def planned_route(self, tenant, driver, vehicle, ops_client, make_orders, make_route):
+        self.tenant, self.client = tenant, ops_client
+        rng = random.Random(9)
+        pickups = [(12.9 + rng.random() * 0.3, 77.5 + rng.random() * 0.3) for _ in range(8)]
+        orders = make_orders(pickups, offset=(0.04, -0.04))
+        self.route = make_route(orders, "2026-01-01", driver=driver, vehicle=vehicle)
+
+    def stop_sequence(self):
+        stops = Stop.objects.filter(order__assigned_route=self.route).order_by("id")
+        return list(stops.values_list("id", "sequence_index"))
+
+    @pytest.fixture(autouse=True)
+    def in_memory_channels(self, settings):
+        settings.CHANNEL_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+
+    def test_job_applies_sequence_and_pushes_route_updated(self, django_capture_on_commit_callbacks):
+        layer = get_channel_layer()
+        channel = async_to_sync(layer.new_channel)()
+        async_to_sync(layer.group_add)(f"ops_tenant_{self.tenant.id}", channel)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            resp = self.client.post(
+                f"/api/v1/ops/routes/{self.route.id}/optimize/",
+                {"mode": "2opt", "time_budget_s": 1},
+                format="json",
+            )
+        assert resp.status_code == 202, resp.data
+
+        resp = self.client.get(f"/api/v1/ops/optimization-jobs/{resp.data['id']}/")
+        assert resp.data["status"] == OptimizationJob.Status.SUCCEEDED
+        assert resp.data["progress"] == 1.0
+        assert resp.data["result"]["distance_after_km"] <= resp.data["result"]["distance_before_km"]
+
+        message = async_to_sync(layer.receive)(channel)
+        stops = Stop.objects.filter(order__assigned_route=self.route).order_by("sequence_index")
+        assert message["type"] == "route_updated"
+        assert [s["id"] for s in message["stops"]] == [str(s.id) for s in stops]
+        self.route.refresh_from_db()
+        assert self.route.optimization_summary == resp.data["result"]
+
+    def test_rejects_second_job_and_non_planned_route(self):
+        optimization_job_create(tenant=self.tenant, route=self.route, time_budget_s=1)
+        resp = self.client.post(f"/api/v1/ops/routes/{self.route.id}/optimize/", {}, format="json")
+        assert resp.status_code == 400
+
+        Route.objects.filter(pk=self.route.pk).update(status=Route.Status.IN_PROGRESS)
+        OptimizationJob.objects.update(status=OptimizationJob.Status.FAILED)
+        with pytest.raises(ValueError, match="PLANNED"):
+            optimization_job_create(tenant=self.tenant, route=self.route, time_budget_s=1)
+
+    def test_discards_result_when_route_changed(self):
+        job = optimization_job_create(tenant=self.tenant, route=self.route, time_budget_s=1)
+        before = self.stop_sequence()
+        Route.objects.filter(pk=self.route.pk).update(status=Route.Status.CANCELLED)
+
+        job = optimization_job_run(job=job)
+
+        assert job.status == OptimizationJob.Status.FAILED
+        assert "changed" in job.error
+        after = self.stop_sequence()
+        assert after == before
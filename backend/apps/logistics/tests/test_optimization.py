@@ -0,0 +1,320 @@
+"""
+Route optimization tests.
+
+Covers:
+- DistanceMatrix matches the scalar _haversine (NumPy and fallback paths)
+- Nearest-neighbor stop ordering on top of the matrix
+- 2-opt / Or-opt improvement stages and optimization modes in route_create;
+  unknown or non-string modes are a 400
+- PICKUP-before-DROP precedence in construction and improvement
+- Time-window sequencing and the scheduled ETAs it writes, the solver's own arrivals
+"""
+import math
+import random
+import uuid
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.logistics.models import Stop
+from apps.logistics.optimization import batch, distance, sequencing, time_windows
+from apps.logistics.optimization.distance import DistanceMatrix
+from apps.logistics.optimization.precedence import Precedence
+from apps.logistics.services import (
+    _haversine,
+    _nearest_neighbor_order,
+    _optimize_route_stops,
+    route_create,
+)
+
+
+def random_points(n, seed=7):
+    rng = random.Random(seed)
+    return [(12.9 + rng.random() * 0.3, 77.5 + rng.random() * 0.3) for _ in range(n)]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Distance matrix
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestDistanceMatrix:
+    @pytest.mark.parametrize("use_numpy", [True, False])
+    def test_matches_scalar_haversine(self, monkeypatch, use_numpy):
+        if use_numpy:
+            pytest.importorskip("numpy")
+        else:
+            monkeypatch.setattr(distance, "np", None)
+
+        points = random_points(25)
+        matrix = DistanceMatrix.from_points(points)
+
+        assert len(matrix) == 25
+        for i, (lat1, lng1) in enumerate(points):
+            for j, (lat2, lng2) in enumerate(points):
+                assert matrix.distance(i, j) == pytest.approx(
+                    _haversine(lat1, lng1, lat2, lng2), abs=1e-6
+                )
+
+    def test_tour_length_is_sum_of_legs(self):
+        points = random_points(5)
+        matrix = DistanceMatrix.from_points(points)
+        expected = sum(_haversine(*points[i], *points[i + 1]) for i in range(4))
+        assert matrix.tour_length([0, 1, 2, 3, 4]) == pytest.approx(expected)
+
+    @pytest.mark.parametrize("use_numpy", [True, False])
+    def test_neighbors_sorted_by_distance(self, monkeypatch, use_numpy):
+        if not use_numpy:
+            monkeypatch.setattr(distance, "np", None)
+        matrix = DistanceMatrix.from_points([(0.0, 0.0), (0.0, 0.03), (0.0, 0.01), (0.0, 0.025)])
+        assert matrix.neighbors(2) == [[2, 3], [3, 2], [0, 3], [1, 2]]
+
+    def test_nearest_prefers_first_on_ties(self):
+        matrix = DistanceMatrix.from_points([(12.0, 77.0), (12.1, 77.0), (12.1, 77.0)])
+        assert matrix.nearest(0, [1, 2]) == 1
+        assert matrix.nearest(0, [2, 1]) == 2
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Nearest-neighbor ordering
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestNearestNeighborOrder:
+    def test_visits_closest_stop_next(self):
+        coords = [(12.0, 77.0), (12.3, 77.0), (12.1, 77.0), (None, None), (12.2, 77.0)]
+        stops = [Stop(lat=lat, lng=lng, sequence_index=i) for i, (lat, lng) in enumerate(coords)]
+
+        ordered = _nearest_neighbor_order(stops)
+
+        assert [s.sequence_index for s in ordered] == [0, 2, 4, 1, 3]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Improvement stages
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestImprovementStages:
+    def test_two_opt_removes_crossing(self):
+        # Greedy from the corner zig-zags across the square; 2-opt uncrosses it.
+        points = [(0.0, 0.0), (0.0, 0.01), (0.01, 0.0), (0.01, 0.01)]
+        matrix = DistanceMatrix.from_points(points)
+        crossed = [0, 1, 2, 3]
+
+        improved = sequencing.two_opt(matrix, crossed)
+
+        assert improved[0] == 0
+        assert matrix.tour_length(improved) < matrix.tour_length(crossed)
+
+    def test_or_opt_relocates_outlier(self):
+        points = [(0.0, 0.0), (0.0, 0.05), (0.0, 0.01), (0.0, 0.02), (0.0, 0.03)]
+        matrix = DistanceMatrix.from_points(points)
+
+        assert sequencing.or_opt(matrix, [0, 1, 2, 3, 4]) == [0, 2, 3, 4, 1]
+
+    @pytest.mark.parametrize("seed", [1, 2, 3])
+    def test_2opt_mode_never_worse_than_greedy(self, seed):
+        matrix = DistanceMatrix.from_points(random_points(60, seed=seed))
+
+        constructed, tour = sequencing.solve(matrix, "2opt")
+
+        assert sorted(tour) == list(range(60))
+        assert tour[0] == constructed[0]
+        assert matrix.tour_length(tour) <= matrix.tour_length(constructed)
+
+    def test_unknown_mode_raises(self):
+        matrix = DistanceMatrix.from_points(random_points(3))
+        with pytest.raises(ValueError, match="Unknown optimization mode"):
+            sequencing.solve(matrix, "simulated-annealing")
+
+
+@pytest.mark.django_db
+class TestRouteCreateOptimize:
+    @pytest.fixture(autouse=True)
+    def route_fixtures(self, tenant, driver, vehicle, make_orders, make_route):
+        self.tenant, self.driver, self.vehicle = tenant, driver, vehicle
+        self._make_orders, self.make_route = make_orders, make_route
+
+    def make_orders(self, n):
+        return self._make_orders(random_points(2 * n, seed=11)[::2], offset=(0.05, -0.05))
+
+    def test_2opt_mode_reports_distances(self):
+        orders = self.make_orders(6)
+        route = self.make_route(orders, "2026-01-01", driver=self.driver, vehicle=self.vehicle, optimize="2opt")
+
+        route.refresh_from_db()
+        summary = route.optimization_summary
+        assert summary["mode"] == "2opt"
+        assert 0 < summary["distance_after_km"] <= summary["distance_before_km"]
+        stops = list(Stop.objects.filter(order__assigned_route=route))
+        assert sorted(s.sequence_index for s in stops) == list(range(1, 13))
+        for order in orders:
+            pickup, drop = sorted(
+                (s for s in stops if s.order_id == order.id), key=lambda s: s.type != "PICKUP"
+            )
+            assert pickup.sequence_index < drop.sequence_index
+
+    def test_windows_mode_writes_etas_in_one_update(self):
+        orders = self.make_orders(4)
+        start = timezone.now().replace(microsecond=0)
+        for order in orders:
+            order.drop_window_end = start + timedelta(hours=3)
+            order.save()
+        route = route_create(
+            tenant=self.tenant, route_date=start.date(), driver=self.driver,
+            vehicle=self.vehicle, order_ids=[], optimize=False,
+        )
+        route.start_time = start
+        for order in orders:
+            order.assigned_route = route
+            order.save()
+
+        with CaptureQueriesContext(connection) as ctx:
+            summary = _optimize_route_stops(route, mode="windows", service_minutes=4)
+
+        stop_updates = [q for q in ctx.captured_queries if q["sql"].startswith('UPDATE "stops"')]
+        assert len(stop_updates) == 1
+        assert summary["window_violations"] == 0
+        stops = list(Stop.objects.filter(order__assigned_route=route).order_by("sequence_index"))
+        etas = [s.scheduled_eta for s in stops]
+        assert all(etas) and etas == sorted(etas)
+        assert etas[0] == start
+        assert etas[1] - etas[0] >= timedelta(minutes=4)
+
+    def test_windows_mode_stores_the_solvers_arrivals(self, mocker):
+        orders = self.make_orders(5)
+        start = timezone.now().replace(microsecond=0)
+        for k, order in enumerate(orders):
+            # Tight enough that some drops are late
+            order.drop_window_end = start + timedelta(minutes=10 * k)
+            order.save()
+        route = route_create(
+            tenant=self.tenant, route_date=start.date(), driver=self.driver,
+            vehicle=self.vehicle, order_ids=[], optimize=False,
+        )
+        route.start_time = start
+        route.orders.set(orders)
+        # A learned speed, as a travel profile gives, that the solver schedules with
+        mocker.patch("apps.logistics.services._typical_speed_kmh", return_value=12.0)
+        solve = mocker.spy(batch, "solve_problem")
+
+        summary = _optimize_route_stops(route, mode="windows", service_minutes=4)
+
+        solution = solve.spy_return
+        stops = list(
+            Stop.objects.filter(order__assigned_route=route).select_related("order").order_by("sequence_index")
+        )
+        assert [s.scheduled_eta for s in stops] == [start + timedelta(seconds=a) for a in solution.arrivals]
+        late = [s for s in stops if s.type == "DROP" and s.scheduled_eta > s.order.drop_window_end]
+        assert summary["window_violations"] == len(late) > 0
+
+    def test_legacy_boolean_uses_default_mode(self):
+        orders = self.make_orders(2)
+        route = self.make_route(orders, "2026-01-01", driver=self.driver, vehicle=self.vehicle, optimize=True)
+        assert route.optimization_summary["mode"] == sequencing.DEFAULT_MODE
+
+    @pytest.mark.parametrize("optimize", ["annealing", [], {}, 2])
+    def test_bad_mode_is_a_validation_error(self, optimize, ops_client):
+        resp = ops_client.post("/api/v1/ops/routes/", {
+            "route_date": "2026-01-01", "driver_id": str(self.driver.id), "vehicle_id": str(self.vehicle.id),
+            "order_ids": [str(o.id) for o in self.make_orders(1)], "optimize": optimize,
+        }, format="json")
+
+        assert resp.status_code == 400, resp.data
+        assert resp.data["detail"]["optimize"][0].code == "invalid_choice"
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Pickup / drop precedence
+# ─────────────────────────────────────────────────────────────────────────────
+
+def pickup_drop_instance(n_orders, seed):
+    """Drops sit right next to a *different* order's pickup to tempt the optimizer."""
+    points = random_points(n_orders, seed=seed)
+    drops = points[1:] + points[:1]
+    coords = points + [(lat + 0.001, lng) for lat, lng in drops]
+    pairs = [(k, n_orders + k) for k in range(n_orders)]
+    return DistanceMatrix.from_points(coords), Precedence(2 * n_orders, pairs)
+
+
+class TestPrecedence:
+    def test_from_stops_pairs_pickups_with_drops(self):
+        a, b = uuid.uuid4(), uuid.uuid4()
+        stops = [
+            Stop(order_id=a, type="DROP"),
+            Stop(order_id=b, type="PICKUP"),
+            Stop(order_id=a, type="PICKUP"),
+            Stop(order_id=b, type="DROP"),
+        ]
+        precedence = Precedence.from_stops(stops)
+
+        assert precedence.predecessors[0] == [2]
+        assert precedence.successors[1] == [3]
+        assert not precedence.is_feasible([0, 1, 2, 3])
+        assert precedence.is_feasible([2, 1, 0, 3])
+
+    @pytest.mark.parametrize("mode", sorted(sequencing.MODES))
+    @pytest.mark.parametrize("seed", [4, 5, 6])
+    def test_modes_keep_pickup_before_drop(self, mode, seed):
+        matrix, precedence = pickup_drop_instance(20, seed)
+
+        constructed, tour = sequencing.solve(matrix, mode, precedence)
+
+        assert sorted(tour) == list(range(40))
+        assert precedence.is_feasible(constructed)
+        assert precedence.is_feasible(tour)
+        assert matrix.tour_length(tour) <= matrix.tour_length(constructed) + 1e-9
+
+    def test_unconstrained_2opt_would_violate(self):
+        # Sanity check that the instance actually exercises the constraint.
+        matrix, precedence = pickup_drop_instance(20, 4)
+        _, tour = sequencing.solve(matrix, "2opt")
+        assert not precedence.is_feasible(tour)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Time windows
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestTimeWindows:
+    def test_far_stop_with_early_deadline_goes_first(self):
+        # Points on a line 1 km apart; point 3 must be served within 12 minutes.
+        points = [(0.0, 0.009 * i) for i in range(4)]
+        matrix = DistanceMatrix.from_points(points)
+        windows = time_windows.TimeWindows(
+            earliest=[0.0] * 4,
+            latest=[math.inf, math.inf, math.inf, 12 * 60.0],
+            service=[300.0] * 4,
+        )
+
+        initial, result = time_windows.solve(
+            matrix, windows, speed_kmh=30, lateness_weight=5
+        )
+
+        assert result.violations == 0
+        assert result.tour.index(3) < result.tour.index(1)
+        assert result.arrivals == sorted(result.arrivals)
+
+    def test_waits_for_window_to_open(self):
+        matrix = DistanceMatrix.from_points([(0.0, 0.0), (0.0, 0.009)])
+        windows = time_windows.TimeWindows(
+            earliest=[0.0, 3600.0], latest=[math.inf, math.inf], service=[0.0, 0.0]
+        )
+        _, result = time_windows.solve(matrix, windows, speed_kmh=30, lateness_weight=5)
+        assert result.arrivals == [0.0, 3600.0]
+
+    @pytest.mark.parametrize("seed", [8, 9])
+    def test_respects_precedence_and_never_worse(self, seed):
+        matrix, precedence = pickup_drop_instance(15, seed)
+        rng = random.Random(seed)
+        latest = [rng.choice([math.inf, rng.uniform(1800, 4 * 3600)]) for _ in range(30)]
+        windows = time_windows.TimeWindows([0.0] * 30, latest, [180.0] * 30)
+        route = time_windows.WindowedRoute(matrix, windows, 25, 5)
+
+        initial, result = time_windows.solve(
+            matrix, windows, precedence, speed_kmh=25, lateness_weight=5
+        )
+
+        assert precedence.is_feasible(result.tour)
+        assert route.cost(result) <= route.cost(initial) + 1e-9
@@ -0,0 +1,115 @@
+"""
+Keyset pagination tests for the ops list endpoints.
+
+Covers:
+- Walking /ops/orders/ forwards and back visits every row once, ties on
+  created_at included; rows created meanwhile do not shift the pages
+- Deep pages are one LIMIT query without OFFSET, like the first page
+- Page size is bounded; malformed cursors are rejected
+- Routes, drivers and exceptions are paginated on their own keys
+- Dashboard stats count every row, not one page
+"""
+import uuid
+from datetime import date, timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.logistics.models import Driver, Exception as LogisticsException, Order, Route, Vehicle
+from apps.users.services import tenant_create
+
+
+def listed_ids(tenant, ids=None):
+    orders = Order.objects.filter(tenant=tenant).order_by("-created_at", "-id")
+    if ids is not None:
+        orders = orders.filter(id__in=ids)
+    return list(orders.values_list("id", flat=True))
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+    @pytest.fixture(autouse=True)
+    def ops_session(self, tenant, ops_client, bulk_orders):
+        self.tenant, self.client, self.bulk_orders = tenant, ops_client, bulk_orders
+
+    def walk(self, url, key="next"):
+        pages = []
+        while url:
+            resp = self.client.get(url)
+            assert resp.status_code == 200, resp.data
+            pages.append(resp.data)
+            url = resp.data[key]
+        return pages
+
+    def test_walks_every_order_once_in_order(self):
+        self.bulk_orders(self.tenant, 5)
+        self.bulk_orders(self.tenant, 6, created_at=timezone.now() - timedelta(days=1))  # tied keys
+        expected = listed_ids(self.tenant)
+
+        pages = self.walk("/api/v1/ops/orders/?page_size=3")
+        seen = [uuid.UUID(o["id"]) for page in pages for o in page["results"]]
+        assert seen == expected
+        assert [len(page["results"]) for page in pages] == [3, 3, 3, 2]
+        assert pages[0]["previous"] is None and pages[-1]["next"] is None
+
+        # Rows created since land before the first page; walking back reaches them
+        newer = listed_ids(self.tenant, [o.id for o in self.bulk_orders(self.tenant, 2)])
+        back = self.walk(pages[-1]["previous"], key="previous")
+        assert [len(page["results"]) for page in back] == [3, 3, 3, 2]
+        assert [uuid.UUID(o["id"]) for page in reversed(back) for o in page["results"]] == newer + expected[:9]
+
+    def test_deep_page_costs_the_same_as_the_first(self):
+        self.bulk_orders(self.tenant, 30)
+        counts, sql = [], []
+        url = "/api/v1/ops/orders/?page_size=10"
+        while url:
+            with CaptureQueriesContext(connection) as ctx:
+                url = self.client.get(url).data["next"]
+            counts.append(len(ctx.captured_queries))
+            sql.extend(q["sql"] for q in ctx.captured_queries if 'FROM "orders"' in q["sql"])
+
+        assert len(set(counts)) == 1
+        assert all("LIMIT 11" in q and "OFFSET" not in q for q in sql)
+
+    def test_page_size_bounds_and_bad_cursor(self):
+        self.bulk_orders(self.tenant, 105)
+
+        assert len(self.client.get("/api/v1/ops/orders/", {"page_size": 1000}).data["results"]) == 100
+        assert len(self.client.get("/api/v1/ops/orders/").data["results"]) == 20
+        resp = self.client.get("/api/v1/ops/orders/", {"cursor": "not-a-cursor"})
+        assert resp.status_code == 404 and resp.data["detail"] == "Invalid cursor."
+
+    def test_other_lists_use_their_keys(self):
+        drivers = [Driver.objects.create(tenant=self.tenant, name=name, phone="1") for name in "CAB"]
+        vehicle = Vehicle.objects.create(tenant=self.tenant, plate_number="PG-1")
+        for day in range(3):
+            Route.objects.create(
+                tenant=self.tenant, route_date=date(2026, 6, 1) + timedelta(days=day),
+                driver=drivers[0], vehicle=vehicle,
+            )
+
+        routes = self.walk("/api/v1/ops/routes/?page_size=2")
+        assert [r["route_date"] for page in routes for r in page["results"]] == [
+            "2026-06-03", "2026-06-02", "2026-06-01"
+        ]
+        names = self.walk("/api/v1/ops/drivers/?page_size=2")
+        assert [d["name"] for page in names for d in page["results"]] == ["A", "B", "C"]
+        exceptions = self.client.get("/api/v1/ops/exceptions/")
+        assert exceptions.data == {"next": None, "previous": None, "results": []}
+
+    def test_stats_count_past_the_first_page(self):
+        orders = self.bulk_orders(self.tenant, 105)
+        Order.objects.filter(id__in=[o.id for o in orders[:3]]).update(status=Order.Status.IN_TRANSIT)
+        LogisticsException.objects.create(tenant=self.tenant, order=orders[0], type=LogisticsException.ExceptionType.DELAY)
+        other = tenant_create(name="Other Co", slug="other-page-co")
+        self.bulk_orders(other, 2)
+
+        resp = self.client.get("/api/v1/ops/stats/")
+        assert resp.status_code == 200, resp.data
+        assert resp.data["order_count"] == 105
+        assert resp.data["orders"][Order.Status.CREATED] == 102
+        assert resp.data["orders"][Order.Status.IN_TRANSIT] == 3
+        assert resp.data["orders"][Order.Status.DELIVERED] == 0
+        assert (resp.data["open_exception_count"], resp.data["active_route_count"]) == (1, 0)
@@ -0,0 +1,166 @@
+"""
+Fleet planning tests.
+
+Covers:
+- cluster_orders respects vehicle capacity and per-route balance
+- routes_plan assigns a day's CREATED orders across drivers/vehicles
+- POST /ops/routes/plan/ end to end
+- routes_optimize_day / optimize_routes solving routes in a process pool
+"""
+import math
+import random
+from datetime import date
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.logistics.models import Order, OutboxMessage, Route, StatusHistory, Stop
+from apps.logistics.optimization import batch
+from apps.logistics.optimization.planning import cluster_orders
+from apps.logistics.optimization.precedence import Precedence
+from apps.logistics.services import driver_create, routes_optimize_day, routes_plan, vehicle_create
+
+PLAN_DATE = date(2026, 3, 2)
+
+
+class TestClusterOrders:
+    def test_two_far_apart_groups_split_by_vehicle(self):
+        rng = random.Random(3)
+        west = [(12.9 + rng.random() * 0.01, 77.4 + rng.random() * 0.01) for _ in range(10)]
+        east = [(12.9 + rng.random() * 0.01, 77.8 + rng.random() * 0.01) for _ in range(10)]
+
+        assignment = cluster_orders(west + east, [1.0] * 20, [math.inf, math.inf])
+
+        assert len(set(assignment[:10])) == 1
+        assert len(set(assignment[10:])) == 1
+        assert assignment[0] != assignment[10]
+
+    def test_capacity_and_balance_are_respected(self):
+        rng = random.Random(5)
+        points = [(12.9 + rng.random() * 0.2, 77.5 + rng.random() * 0.2) for _ in range(200)]
+        weights = [rng.uniform(1, 10) for _ in range(200)]
+        capacities = [300.0, 400.0, 200.0]
+
+        assignment = cluster_orders(points, weights, capacities)
+
+        for vehicle, capacity in enumerate(capacities):
+            members = [i for i, a in enumerate(assignment) if a == vehicle]
+            assert sum(weights[i] for i in members) <= capacity
+            assert len(members) <= math.ceil(200 / 3 * 1.25)
+
+    def test_orders_that_fit_nowhere_are_unassigned(self):
+        assignment = cluster_orders([(12.9, 77.5), None], [50.0, 5.0], [10.0])
+        assert assignment == [-1, 0]
+
+
+class TestSolveMany:
+    def test_process_pool_matches_in_process(self):
+        rng = random.Random(2)
+        problems = []
+        for key in range(4):
+            points = [(12.9 + rng.random() * 0.2, 77.5 + rng.random() * 0.2) for _ in range(21)]
+            precedence = Precedence(21, [(i, i + 10) for i in range(1, 11)])
+            problems.append(batch.RouteProblem(str(key), "2opt", points, precedence))
+
+        pooled = batch.solve_many(problems, max_workers=2)
+
+        assert pooled == batch.solve_many(problems, max_workers=1)
+        assert [s.key for s in pooled] == ["0", "1", "2", "3"]
+
+
+@pytest.mark.django_db
+class TestRoutesPlan:
+    @pytest.fixture(autouse=True)
+    def fleet(self, tenant, ops, make_orders):
+        self.tenant, self.ops, self._make_orders = tenant, ops, make_orders
+        self.drivers = [
+            driver_create(tenant=self.tenant, name=f"Driver {i}", phone=str(i)) for i in range(3)
+        ]
+        self.vehicles = [
+            vehicle_create(tenant=self.tenant, plate_number=f"PLAN-{i}", vehicle_type="VAN",
+                           capacity_kg=cap)
+            for i, cap in enumerate([100, 60, 0])
+        ]
+
+    def make_orders(self, n, weight=5.0):
+        rng = random.Random(n)
+        pickups = [(12.9 + rng.random() * 0.2, 77.5 + rng.random() * 0.2) for _ in range(n)]
+        return self._make_orders(pickups, offset=(0.01, 0.01), weight_kg=weight)
+
+    def test_assigns_all_orders_within_capacity(self):
+        orders = self.make_orders(30)
+
+        routes, unassigned = routes_plan(
+            tenant=self.tenant, route_date=PLAN_DATE, optimize="2opt", actor_user=self.ops
+        )
+
+        assert unassigned == []
+        assert len(routes) == 3
+        assert not Order.objects.filter(id__in=[o.id for o in orders]).exclude(
+            status=Order.Status.ASSIGNED
+        ).exists()
+        for route in Route.objects.filter(tenant=self.tenant).select_related("vehicle"):
+            weight = sum(o.weight_kg for o in route.orders.all())
+            assert not route.vehicle.capacity_kg or weight <= route.vehicle.capacity_kg
+            assert route.optimization_summary["mode"] == "2opt"
+            stops = list(Stop.objects.filter(order__assigned_route=route))
+            assert sorted(s.sequence_index for s in stops) == list(range(1, len(stops) + 1))
+        assert StatusHistory.objects.filter(to_status=Order.Status.ASSIGNED).count() == 30
+        assert OutboxMessage.objects.filter(event__type="order.status_changed").count() == 30
+
+    def test_skips_drivers_already_routed_that_day(self):
+        self.make_orders(4)
+        routes_plan(tenant=self.tenant, route_date=PLAN_DATE, drivers=self.drivers[:1])
+        self.make_orders(4)
+
+        routes, _ = routes_plan(tenant=self.tenant, route_date=PLAN_DATE)
+
+        assert self.drivers[0] not in [r.driver for r in routes]
+
+    def test_plan_endpoint(self, ops_client):
+        self.make_orders(6)
+
+        resp = ops_client.post(
+            "/api/v1/ops/routes/plan/",
+            {"route_date": str(PLAN_DATE), "optimize": "greedy"},
+            format="json",
+        )
+
+        assert resp.status_code == 201, resp.data
+        assert sum(r["order_count"] for r in resp.data["routes"]) == 6
+        assert resp.data["unassigned_order_ids"] == []
+
+    def test_optimize_day_writes_all_routes_in_one_pass(self):
+        self.make_orders(30)
+        planned, _ = routes_plan(tenant=self.tenant, route_date=PLAN_DATE, optimize="greedy")
+
+        with CaptureQueriesContext(connection) as ctx:
+            routes = routes_optimize_day(
+                tenant=self.tenant, route_date=PLAN_DATE, mode="2opt", max_workers=2
+            )
+
+        assert {r.id for r in routes} == {r.id for r in planned}
+        stop_updates = [q for q in ctx.captured_queries if q["sql"].startswith('UPDATE "stops"')]
+        assert len(stop_updates) == 1
+        for route in Route.objects.filter(id__in=[r.id for r in routes]):
+            summary = route.optimization_summary
+            assert summary["mode"] == "2opt"
+            assert summary["distance_after_km"] <= summary["distance_before_km"]
+            stops = sorted(Stop.objects.filter(order__assigned_route=route), key=lambda s: s.sequence_index)
+            pickups = {s.order_id: s.sequence_index for s in stops if s.type == Stop.StopType.PICKUP}
+            assert all(pickups[s.order_id] < s.sequence_index for s in stops if s.type == Stop.StopType.DROP)
+
+    def test_optimize_routes_command_skips_started_routes(self):
+        self.make_orders(9)
+        planned, _ = routes_plan(tenant=self.tenant, route_date=PLAN_DATE)
+        Route.objects.filter(pk=planned[0].pk).update(status=Route.Status.IN_PROGRESS)
+
+        call_command(
+            "optimize_routes", "--tenant-slug", self.tenant.slug, "--date", str(PLAN_DATE),
+            "--workers", "1",
+        )
+
+        assert Route.objects.get(pk=planned[0].pk).optimization_summary["mode"] == "greedy"
+        assert Route.objects.get(pk=planned[1].pk).optimization_summary["mode"] == "2opt"
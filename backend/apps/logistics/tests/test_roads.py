@@ -0,0 +1,132 @@
+"""
+Road graph distance provider tests.
+
+Covers:
+- RoadGraph.one_to_many agrees with Floyd-Warshall on random directed graphs
+- RoadGraphProvider routes around a river instead of straight across it, from cache
+- .npz round trip through build_road_graph and providers.get
+- batch.solve_problem builds its matrix with the named provider; haversine is the default
+- TravelTimeCache LRU / shared-store levels and CachedProvider reuse across processes
+"""
+import math
+import random
+
+import pytest
+from django.core.management import call_command
+
+from apps.logistics.optimization import batch, providers
+from apps.logistics.optimization.distance import haversine
+from apps.logistics.optimization.precedence import Precedence
+from apps.logistics.optimization.roads import RoadGraph
+from apps.logistics.optimization.spatial import geohash
+from apps.logistics.optimization.travel_cache import TravelTimeCache
+
+class TestRoadGraph:
+    @pytest.mark.parametrize("seed", range(3))
+    def test_one_to_many_matches_floyd_warshall(self, seed):
+        rng = random.Random(seed)
+        n = 12
+        nodes = [(12.9 + rng.random() * 0.1, 77.5 + rng.random() * 0.1) for _ in range(n)]
+        edges = {(rng.randrange(n), rng.randrange(n)): rng.uniform(10, 300) for _ in range(30)}
+        graph = RoadGraph.from_edges(nodes, [(u, v, t * 10, t) for (u, v), t in edges.items() if u != v])
+
+        best = [[0.0 if i == j else edges.get((i, j), math.inf) for j in range(n)] for i in range(n)]
+        for k in range(n):
+            for i in range(n):
+                for j in range(n):
+                    best[i][j] = min(best[i][j], best[i][k] + best[k][j])
+
+        for source in range(n):
+            found = graph.one_to_many(source, range(n))
+            for target in range(n):
+                if math.isinf(best[source][target]):
+                    assert target not in found
+                else:
+                    seconds, metres = found[target]
+                    assert seconds == pytest.approx(best[source][target])
+                    assert metres == pytest.approx(seconds * 10)
+
+    def test_provider_goes_round_the_river_and_caches_paths(self, monkeypatch, river_city):
+        provider = providers.RoadGraphProvider(RoadGraph.from_edges(*river_city))
+        west, east = (12.9001, 77.51), (12.9001, 77.52)
+
+        km = provider.matrix([west, east]).rows
+        seconds = provider.travel_times([west, east], speed_kmh=30)
+
+        straight = haversine(*west, *east)
+        assert km[0][1] == km[1][0] > 8 * straight
+        assert seconds[0][1] == pytest.approx(km[0][1] / 30 * 3600, rel=0.05)
+
+        monkeypatch.setattr(provider.graph, "one_to_many", lambda *a: pytest.fail("not cached"))
+        assert provider.matrix([east, west]).rows[0][1] == km[0][1]
+
+
+class TestProviderConfiguration:
+    def test_build_command_round_trip(self, tmp_path, river_city):
+        nodes, edges = river_city
+        (tmp_path / "nodes.csv").write_text(
+            "id,lat,lng\n" + "".join(f"n{i},{lat},{lng}\n" for i, (lat, lng) in enumerate(nodes))
+        )
+        (tmp_path / "edges.csv").write_text(
+            "source,target,length_m,speed_kmh,oneway\n"
+            + "".join(f"n{u},n{v},{length},30,yes\n" for u, v, length, _ in edges)
+        )
+        out = tmp_path / "city.npz"
+
+        call_command("build_road_graph", nodes=tmp_path / "nodes.csv", edges=tmp_path / "edges.csv", out=out)
+
+        spec = f"road_graph:{out}"
+        provider = providers.get(spec)
+        assert providers.get(spec) is provider
+        assert isinstance(provider, providers.CachedProvider)  # configured by the app at start-up
+        assert provider.inner.graph.edge_count == len(edges)
+        assert provider.matrix([(12.9001, 77.51), (12.9001, 77.52)]).rows[0][1] > 8
+        with pytest.raises(ValueError, match="Unknown distance provider"):
+            providers.get("osrm")
+
+    def test_haversine_default_is_not_cached(self):
+        assert type(providers.get()) is providers.HaversineProvider
+
+    def test_solve_problem_uses_named_provider(self, tmp_path, river_city):
+        path = tmp_path / "city.npz"
+        RoadGraph.from_edges(*river_city).save(path)
+        points = [(12.9001, 77.51), (12.9001, 77.52), (12.9201, 77.51)]
+        problem = batch.RouteProblem(key="r", mode="2opt", points=points, precedence=Precedence(3))
+
+        straight = batch.solve_problem(problem)
+        problem.distance = f"road_graph:{path}"
+        road = batch.solve_problem(problem)
+
+        assert straight.distance_after_km < 5 < road.distance_after_km
+
+
+class TestTravelTimeCache:
+    def test_geohash_reference_value(self):
+        assert geohash(57.64911, 10.40744, 11) == "u4pruydqqvj"
+
+    def test_levels_eviction_and_counters(self, shared_store):
+        cache = TravelTimeCache(shared_store, maxsize=2)
+        cache.set_many({("a", "b"): (1.0, 60.0), ("b", "c"): (2.0, 120.0), ("c", "a"): (3.0, 180.0)})
+        assert cache.stats()["size"] == 2  # ("a", "b") evicted locally, still shared
+
+        found = cache.get_many([("a", "b"), ("c", "a"), ("x", "y")])
+
+        assert found == {("a", "b"): (1.0, 60.0), ("c", "a"): (3.0, 180.0)}
+        assert shared_store.round_trips == 2
+        assert cache.stats() == {"hits": 1, "shared_hits": 1, "misses": 1, "hit_rate": 0.667, "size": 2}
+
+    def test_cached_provider_reuses_pairs_across_processes(self, monkeypatch, river_city, shared_store):
+        graph = RoadGraph.from_edges(*river_city)
+        points = [(12.9001, 77.51), (12.9001, 77.52), (12.9201, 77.51), (12.90011, 77.51001)]
+        first = providers.CachedProvider(providers.RoadGraphProvider(graph), TravelTimeCache(shared_store))
+
+        km = first.matrix(points).rows
+        assert km[0][3] == 0.0 and km[0][1] > 8  # same geohash cell, river between 0 and 1
+        assert first.cache.stats()["misses"] == 6
+
+        # A fresh worker: empty LRU and path cache, one shared round trip, no searches
+        second = providers.CachedProvider(providers.RoadGraphProvider(graph), TravelTimeCache(shared_store))
+        monkeypatch.setattr(graph, "one_to_many", lambda *a: pytest.fail("searched again"))
+        shared_store.round_trips = 0
+        assert second.matrix(points).rows == km
+        assert shared_store.round_trips == 1 and second.cache.stats()["shared_hits"] == 6
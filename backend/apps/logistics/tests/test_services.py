@@ -5,24 +5,42 @@ Covers:
 - Status machine transitions (valid and invalid)
 - order_create + stop creation
 - order_cancel guards
+- Compare-and-set transitions: stale instances don't move, batches report moved rows
+- collect_events batches Event/Outbox writes per unit of work, in emission order
+- route_create / route_reorder_stops cost the same number of queries at any route size
+- Route order counters follow every transition and reassignment, complete the
+  route, and reconcile
 - Driver cannot update to forbidden statuses
 - Tenant isolation on order_list / order_get
 - Tracking token privacy (TrackingSerializer)
 """
 import uuid
+from io import StringIO
 
 import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
-from apps.logistics.models import Order, Stop
+from apps.logistics.models import Event, Order, OutboxMessage, Route, StatusHistory, Stop
 from apps.logistics.selectors import order_get, order_list
 from apps.logistics.serializers import TrackingSerializer
 from apps.logistics.services import (
+    collect_events,
     driver_create,
+    driver_update_order_status,
     order_cancel,
     order_create,
+    order_reassign,
+    pod_create,
     route_create,
+    route_reorder_stops,
+    route_start,
+    route_counters_reconcile,
     vehicle_create,
 )
+from apps.logistics.services import _transition_orders
 from apps.users.models import User
 from apps.users.services import tenant_create, user_create
 
@@ -166,6 +184,54 @@ class TestOrderCancel:
             order_cancel(order=order, reason="Test", actor_user=ops_user)
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# Compare-and-set transitions
+# ─────────────────────────────────────────────────────────────────────────────
+
+@pytest.mark.django_db
+class TestTransitions:
+    def test_batch_moves_only_rows_still_in_loaded_status(self, tenant_a, ops_user):
+        orders = [make_order(tenant_a, ops_user) for _ in range(4)]
+        Order.objects.filter(pk=orders[1].pk).update(status=Order.Status.ASSIGNED)
+        orders[2].status = Order.Status.ASSIGNED  # loaded later, after an assignment
+        Order.objects.filter(pk=orders[2].pk).update(status=Order.Status.ASSIGNED)
+        Order.objects.filter(pk=orders[3].pk).update(status=Order.Status.CANCELLED)
+
+        with CaptureQueriesContext(connection) as ctx:
+            moved = _transition_orders(orders, Order.Status.CANCELLED)
+
+        assert [(o.pk, prev) for o, prev in moved] == [
+            (orders[0].pk, Order.Status.CREATED), (orders[2].pk, Order.Status.ASSIGNED)
+        ]
+        assert len(ctx.captured_queries) == 2  # one UPDATE per loaded status
+        assert orders[0].status == Order.Status.CANCELLED and orders[1].status == Order.Status.CREATED
+        statuses = dict(Order.objects.values_list("pk", "status"))
+        assert statuses[orders[1].pk] == Order.Status.ASSIGNED
+
+    def test_stale_order_is_not_overwritten(self, tenant_a, ops_user):
+        order = make_order(tenant_a, ops_user)
+        Order.objects.filter(pk=order.pk).update(status=Order.Status.ASSIGNED)  # ops, meanwhile
+
+        with pytest.raises(ValueError, match="changed by someone else"):
+            order_cancel(order=order, reason="dup", actor_user=ops_user)
+
+        order.refresh_from_db()
+        assert order.status == Order.Status.ASSIGNED
+        assert not order.status_history.filter(to_status=Order.Status.CANCELLED).exists()
+
+    def test_stale_route_is_not_started_twice(self, tenant_a, ops_user, driver, vehicle):
+        order = make_order(tenant_a, ops_user)
+        route = route_create(
+            tenant=tenant_a, route_date="2026-06-01", driver=driver, vehicle=vehicle,
+            order_ids=[order.id], actor_user=ops_user,
+        )
+        stale = Route.objects.get(pk=route.pk)
+        route_start(route=route, actor_user=ops_user)
+
+        with pytest.raises(ValueError, match="PLANNED"):
+            route_start(route=stale, actor_user=ops_user)
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Tenant isolation
 # ─────────────────────────────────────────────────────────────────────────────
@@ -196,6 +262,213 @@ class TestTenantIsolation:
             order_get(tenant=tenant_b, order_id=str(order.pk))
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# Event collector
+# ─────────────────────────────────────────────────────────────────────────────
+
+def inserts(ctx, table):
+    return [q for q in ctx.captured_queries if q["sql"].startswith(f'INSERT INTO "{table}"')]
+
+
+@pytest.mark.django_db
+class TestCollectEvents:
+    def test_pod_create_writes_its_events_together(self, tenant_a, ops_user):
+        order = make_order(tenant_a, ops_user)
+        Order.objects.filter(pk=order.pk).update(status=Order.Status.IN_TRANSIT)
+        order.refresh_from_db()
+
+        with CaptureQueriesContext(connection) as ctx:
+            pod_create(order=order, receiver_name="R", actor_user=ops_user)
+
+        assert len(inserts(ctx, "events")) == len(inserts(ctx, "outbox_messages")) == 1
+        events = Event.objects.filter(payload__order_id=str(order.id))
+        at = {e.type: e.created_at for e in events}
+        assert at["order.created"] < at["order.status_changed"] <= at["pod.created"]
+        assert OutboxMessage.objects.filter(event__in=events).count() == events.count()
+
+    def test_units_in_emission_order(self, tenant_a, ops_user):
+        with CaptureQueriesContext(connection) as ctx, collect_events():
+            refs = [make_order(tenant_a, ops_user).reference_code for _ in range(3)]
+            assert not Event.objects.filter(type="order.created").exists()  # buffered
+
+        assert len(inserts(ctx, "events")) == 1
+        at = {e.payload["reference_code"]: e.created_at for e in Event.objects.filter(type="order.created")}
+        assert [at[ref] for ref in refs] == sorted(at.values())
+
+    def test_failed_nested_unit_drops_its_events(self, tenant_a, ops_user):
+        with collect_events():
+            kept = make_order(tenant_a, ops_user)
+            with pytest.raises(ValueError):
+                with collect_events():
+                    make_order(tenant_a, ops_user, ref="DROPPED")
+                    raise ValueError("rolled back")
+
+        assert not Order.objects.filter(reference_code="DROPPED").exists()
+        assert [e.payload["order_id"] for e in Event.objects.filter(type="order.created")] == [str(kept.id)]
+
+    def test_failed_unit_writes_nothing(self, tenant_a, ops_user):
+        with pytest.raises(RuntimeError):
+            with collect_events():
+                make_order(tenant_a, ops_user)
+                raise RuntimeError
+
+        assert not Event.objects.exists() and not OutboxMessage.objects.exists()
+        make_order(tenant_a, ops_user)  # the buffer was released
+        assert Event.objects.count() == 1
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Route creation
+# ─────────────────────────────────────────────────────────────────────────────
+
+@pytest.mark.django_db
+class TestRouteCreateQueries:
+    def create(self, tenant, actor, driver, vehicle, n, optimize=False):
+        orders = [make_order(tenant, actor) for _ in range(n)]
+        cache.clear()  # the tenant's travel profile lookup is cached
+        with CaptureQueriesContext(connection) as ctx:
+            route = route_create(
+                tenant=tenant, route_date="2026-06-01", driver=driver, vehicle=vehicle,
+                order_ids=[o.id for o in orders], optimize=optimize, actor_user=actor,
+            )
+        return route, len(ctx.captured_queries)
+
+    @pytest.mark.parametrize("optimize", [False, "2opt"])
+    def test_query_count_does_not_grow_with_orders(self, tenant_a, ops_user, driver, vehicle, optimize):
+        route, small = self.create(tenant_a, ops_user, driver, vehicle, 2, optimize)
+        route.status = Route.Status.CANCELLED
+        route.save(update_fields=["status"])
+        route, large = self.create(tenant_a, ops_user, driver, vehicle, 12, optimize)
+
+        assert small == large
+        assert route.orders.filter(status=Order.Status.ASSIGNED).count() == 12
+        history = StatusHistory.objects.filter(order__assigned_route=route, to_status=Order.Status.ASSIGNED)
+        assert history.count() == 12
+        assert {h.metadata["route_id"] for h in history} == {str(route.id)}
+        events = Event.objects.filter(type="order.status_changed", payload__to_status=Order.Status.ASSIGNED)
+        assert events.count() == 14 and OutboxMessage.objects.filter(event__in=events).count() == 14
+
+    def test_rejects_orders_not_created_without_side_effects(self, tenant_a, ops_user, driver, vehicle):
+        taken = make_order(tenant_a, ops_user)
+        route_create(
+            tenant=tenant_a, route_date="2026-06-01", driver=driver, vehicle=vehicle,
+            order_ids=[taken.id], actor_user=ops_user,
+        )
+        fresh = make_order(tenant_a, ops_user)
+
+        with pytest.raises(ValueError, match="CREATED"):
+            route_create(
+                tenant=tenant_a, route_date="2026-06-01", driver=driver, vehicle=vehicle,
+                order_ids=[fresh.id, taken.id], actor_user=ops_user,
+            )
+
+        fresh.refresh_from_db()
+        assert fresh.status == Order.Status.CREATED and fresh.assigned_route is None
+        assert Route.objects.filter(tenant=tenant_a).count() == 1
+
+    def test_reorder_query_count_does_not_grow_with_stops(self, tenant_a, ops_user, driver, vehicle):
+        counts = []
+        for n in (2, 12):
+            route, _ = self.create(tenant_a, ops_user, driver, vehicle, n)
+            stop_ids = list(
+                Stop.objects.filter(order__assigned_route=route).order_by("-sequence_index", "id")
+                .values_list("id", flat=True)
+            )
+            cache.clear()
+            with CaptureQueriesContext(connection) as ctx:
+                route_reorder_stops(route=route, stop_order=[str(i) for i in stop_ids])
+            counts.append(len(ctx.captured_queries))
+            ordered = Stop.objects.filter(order__assigned_route=route).order_by("sequence_index")
+            assert [s.id for s in ordered] == stop_ids
+            assert all(s.scheduled_eta for s in ordered)
+            route.status = Route.Status.CANCELLED
+            route.save(update_fields=["status"])
+
+        assert counts[0] == counts[1]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Route order counters
+# ─────────────────────────────────────────────────────────────────────────────
+
+@pytest.mark.django_db
+class TestRouteCounters:
+    def test_counters_follow_transitions_and_complete_route(
+        self, tenant_a, ops_user, driver_user, driver, vehicle
+    ):
+        kept, cancelled = make_order(tenant_a, ops_user), make_order(tenant_a, ops_user)
+        route = route_create(
+            tenant=tenant_a, route_date="2026-06-01", driver=driver, vehicle=vehicle,
+            order_ids=[kept.id, cancelled.id], actor_user=ops_user,
+        )
+        route_start(route=route, actor_user=ops_user)
+        order_cancel(order=Order.objects.get(pk=cancelled.pk), reason="dup", actor_user=ops_user)
+        order = Order.objects.select_related("assigned_route").get(pk=kept.pk)
+        for status in (Order.Status.PICKED_UP, Order.Status.IN_TRANSIT):
+            driver_update_order_status(order=order, to_status=status, stop=None, actor_user=driver_user)
+
+        route.refresh_from_db()
+        assert route.status == Route.Status.IN_PROGRESS
+        assert (route.in_transit_count, route.cancelled_count, route.order_count) == (1, 1, 2)
+
+        with CaptureQueriesContext(connection) as ctx:
+            driver_update_order_status(
+                order=order, to_status=Order.Status.DELIVERED, stop=None, actor_user=driver_user
+            )
+        assert not [q for q in ctx.captured_queries if q["sql"].startswith("SELECT") and 'FROM "orders"' in q["sql"]]
+        route.refresh_from_db()
+        assert route.status == Route.Status.COMPLETED and route.end_time
+        assert route.order_counts == {
+            Order.Status.ASSIGNED: 0, Order.Status.PICKED_UP: 0, Order.Status.IN_TRANSIT: 0,
+            Order.Status.DELIVERED: 1, Order.Status.FAILED: 0, Order.Status.CANCELLED: 1,
+        }
+
+    def test_reassigned_order_keeps_target_route_open(
+        self, tenant_a, ops_user, driver_user, driver, vehicle
+    ):
+        moved, other = make_order(tenant_a, ops_user), make_order(tenant_a, ops_user)
+        source = route_create(
+            tenant=tenant_a, route_date="2026-06-01", driver=driver, vehicle=vehicle,
+            order_ids=[moved.id], actor_user=ops_user,
+        )
+        target = route_create(
+            tenant=tenant_a, route_date="2026-06-02", driver=driver, vehicle=vehicle,
+            order_ids=[other.id], actor_user=ops_user,
+        )
+        route_start(route=target, actor_user=ops_user)
+        order_reassign(
+            order=Order.objects.select_related("assigned_route").get(pk=moved.pk),
+            target_route=target, note="rebalance", actor_user=ops_user,
+        )
+        source.refresh_from_db()
+        assert (source.assigned_count, source.order_count) == (0, 0)
+
+        order = Order.objects.select_related("assigned_route").get(pk=other.pk)
+        for status in (Order.Status.PICKED_UP, Order.Status.IN_TRANSIT, Order.Status.DELIVERED):
+            driver_update_order_status(order=order, to_status=status, stop=None, actor_user=driver_user)
+
+        target.refresh_from_db()
+        assert target.status == Route.Status.IN_PROGRESS
+        assert (target.assigned_count, target.delivered_count, target.order_count) == (1, 1, 2)
+
+    def test_reconcile_repairs_drift(self, tenant_a, ops_user, driver, vehicle):
+        orders = [make_order(tenant_a, ops_user) for _ in range(3)]
+        route = route_create(
+            tenant=tenant_a, route_date="2026-06-01", driver=driver, vehicle=vehicle,
+            order_ids=[o.id for o in orders], actor_user=ops_user,
+        )
+        Order.objects.filter(pk=orders[0].pk).update(status=Order.Status.PICKED_UP)  # behind services' back
+        assert route_counters_reconcile(tenant=tenant_a) and not route_counters_reconcile()
+
+        Route.objects.filter(pk=route.pk).update(assigned_count=7, failed_count=1)
+        out = StringIO()
+        call_command("reconcile_route_counters", tenant_slug="tenant-a", stdout=out)
+
+        assert "Repaired order counters of 1 routes" in out.getvalue()
+        route.refresh_from_db()
+        assert (route.assigned_count, route.picked_up_count, route.failed_count) == (2, 1, 0)
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Tracking privacy
 # ─────────────────────────────────────────────────────────────────────────────
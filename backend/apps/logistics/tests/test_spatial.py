@@ -0,0 +1,165 @@
+"""
+Spatial index tests.
+
+Covers:
+- GridIndex k-nearest and radius queries agree with brute force, also after removals
+- sequencing.nearest_neighbor_path matches the matrix-based construction
+- GET /ops/orders/<id>/nearby-drivers/ ranks drivers by distance to the next stop
+- Location pings inside the geofence mark pending stops ARRIVED
+- Buffered pings: no database writes per ping, served to ops, flushed in one UPDATE
+  by a task that migrations schedule with celery beat
+"""
+import random
+from datetime import date
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django_celery_beat.models import PeriodicTask
+
+from apps.logistics.models import Driver, Event, Stop
+from apps.logistics.optimization import sequencing
+from apps.logistics.optimization.distance import DistanceMatrix, haversine
+from apps.logistics.optimization.spatial import GridIndex
+from apps.logistics.services import driver_create, driver_record_location, route_start
+
+
+def random_points(seed, n, spread=0.3):
+    rng = random.Random(seed)
+    return [(12.9 + rng.random() * spread, 77.5 + rng.random() * spread) for _ in range(n)]
+
+
+def brute_force(points, lat, lng, keys):
+    return sorted((haversine(lat, lng, *points[k]), k) for k in keys)
+
+
+class TestGridIndex:
+    @pytest.mark.parametrize("seed", range(4))
+    def test_nearest_and_within_match_brute_force(self, seed):
+        points = random_points(seed, 300)
+        index = GridIndex.from_points((i, lat, lng) for i, (lat, lng) in enumerate(points))
+        removed = set(random.Random(seed).sample(range(300), 100))
+        for key in removed:
+            assert index.remove(key)
+        keys = [k for k in range(300) if k not in removed]
+        assert len(index) == 200 and not any(k in index for k in removed)
+
+        for lat, lng in random_points(seed + 100, 20, spread=0.4):
+            expected = brute_force(points, lat, lng, keys)
+            assert [k for k, _ in index.nearest(lat, lng, 5)] == [k for _, k in expected[:5]]
+            assert [k for k, _ in index.within(lat, lng, 3.0)] == [k for d, k in expected if d <= 3.0]
+
+    def test_empty_moved_and_far_away_points(self):
+        index = GridIndex(cell_km=0.5, ref_lat=13.0)
+        assert index.nearest(13.0, 77.6) == [] and index.within(13.0, 77.6, 10) == []
+
+        index.insert("a", 13.0, 77.6)
+        index.insert("b", 13.5, 77.6)
+        index.insert("a", 12.0, 77.6)  # moved, not duplicated
+
+        assert len(index) == 2
+        assert [k for k, _ in index.nearest(13.0, 77.6, 5)] == ["b", "a"]
+        assert not index.remove("missing")
+
+
+class TestNearestNeighborPath:
+    def test_matches_matrix_construction(self):
+        points = random_points(7, 120)
+        expected = sequencing.nearest_neighbor(DistanceMatrix.from_points(points))
+        assert sequencing.nearest_neighbor_path(points) == expected
+        assert sequencing.nearest_neighbor_path([]) == []
+
+
+@pytest.mark.django_db
+class TestNearbyDriversAndGeofence:
+    @pytest.fixture(autouse=True)
+    def use_flush(self, flush_locations):
+        self.flush = flush_locations
+
+    @pytest.fixture(autouse=True)
+    def geo_order(self, tenant, ops, ops_client, make_order, make_route):
+        self.tenant, self.ops, self.client, self.make_route = tenant, ops, ops_client, make_route
+        self.order = make_order((12.95, 77.60), (12.99, 77.64))
+
+    def make_driver(self, name, lat=None, lng=None):
+        driver = driver_create(tenant=self.tenant, name=name, phone=name)
+        if lat is not None:
+            driver_record_location(driver_id=driver.id, lat=lat, lng=lng)
+            self.flush()
+        return driver
+
+    def test_nearby_drivers_ranked_by_distance(self):
+        near = self.make_driver("Near", 12.951, 77.601)
+        far = self.make_driver("Far", 13.05, 77.70)
+        self.make_driver("Unknown")
+
+        resp = self.client.get(f"/api/v1/ops/orders/{self.order.id}/nearby-drivers/")
+        assert resp.status_code == 200, resp.data
+        assert [d["driver"]["id"] for d in resp.data] == [str(near.id), str(far.id)]
+        assert resp.data[0]["distance_km"] < 0.2
+
+        resp = self.client.get(
+            f"/api/v1/ops/orders/{self.order.id}/nearby-drivers/", {"radius_km": 1}
+        )
+        assert [d["driver"]["id"] for d in resp.data] == [str(near.id)]
+
+    def test_ping_inside_geofence_marks_stop_arrived(self, settings, vehicle):
+        settings.ROUTE_GEOFENCE_RADIUS_M = 100
+        driver = self.make_driver("Live")
+        route = self.make_route([self.order], date(2026, 5, 4), driver=driver, vehicle=vehicle)
+        pickup, drop = self.order.stops.order_by("sequence_index")
+
+        driver_record_location(driver_id=driver.id, lat=12.9505, lng=77.6005)
+        self.flush()
+        assert Stop.objects.get(pk=pickup.pk).status == Stop.StopStatus.PENDING  # route not started
+
+        route_start(route=route, actor_user=self.ops)
+        driver_record_location(driver_id=driver.id, lat=12.9505, lng=77.6005)
+        self.flush()
+
+        pickup.refresh_from_db()
+        drop.refresh_from_db()
+        assert pickup.status == Stop.StopStatus.ARRIVED and pickup.actual_arrival_time
+        assert drop.status == Stop.StopStatus.PENDING
+        event = Event.objects.get(tenant=self.tenant, type="stop.arrived")
+        assert event.payload["stop_id"] == str(pickup.id)
+
+    def test_buffered_pings_are_served_then_flushed_in_one_update(self):
+        near, far = self.make_driver("Near"), self.make_driver("Far", 12.96, 77.61)
+        with CaptureQueriesContext(connection) as ctx:
+            driver_record_location(driver_id=far.id, lat=13.05, lng=77.70)
+            driver_record_location(driver_id=near.id, lat=12.90, lng=77.50)
+            driver_record_location(driver_id=near.id, lat=12.951, lng=77.601)
+        assert len(ctx.captured_queries) == 0
+
+        resp = self.client.get(f"/api/v1/ops/orders/{self.order.id}/nearby-drivers/")
+        assert [d["driver"]["id"] for d in resp.data] == [str(near.id), str(far.id)]
+        assert Driver.objects.get(pk=near.pk).current_lat is None  # not written yet
+
+        with CaptureQueriesContext(connection) as ctx:
+            moved = self.flush()
+
+        assert {d.id for d in moved} == {near.id, far.id}
+        assert len([q for q in ctx.captured_queries if q["sql"].startswith('UPDATE "drivers"')]) == 1
+        stored = Driver.objects.get(pk=near.pk)
+        assert (stored.current_lat, stored.current_lng) == (12.951, 77.601)
+        assert self.flush() == []
+
+    def test_flush_geofences_live_routes(self, settings, vehicle):
+        settings.ROUTE_GEOFENCE_RADIUS_M = 100
+        driver = self.make_driver("Live")
+        route = self.make_route([self.order], date(2026, 5, 4), driver=driver, vehicle=vehicle)
+        route_start(route=route, actor_user=self.ops)
+        pickup, drop = self.order.stops.order_by("sequence_index")
+
+        driver_record_location(driver_id=driver.id, lat=12.9505, lng=77.6005)
+        assert Stop.objects.get(pk=pickup.pk).status == Stop.StopStatus.PENDING
+        self.flush()
+
+        assert Stop.objects.get(pk=pickup.pk).status == Stop.StopStatus.ARRIVED
+        assert Stop.objects.get(pk=drop.pk).status == Stop.StopStatus.PENDING
+        assert Event.objects.get(tenant=self.tenant, type="stop.arrived").payload["stop_id"] == str(pickup.id)
+
+    def test_flush_is_scheduled(self):
+        task = PeriodicTask.objects.get(task="logistics.flush_driver_locations")
+        assert task.enabled and (task.interval.every, task.interval.period) == (5, "seconds")
@@ -0,0 +1,164 @@
+"""
+Learned travel profile tests.
+
+Covers:
+- SpeedProfile.build aggregates km/h and service time per zone × hour of week
+- Sparse buckets fall back to zone, hour, then overall; legs never span routes
+- dumps/loads round trip
+- travel_profile_build mines completed routes in two queries, and ETAs use the result
+- build_travel_profile management command; the nightly task is scheduled and builds
+  profiles for tenants with recent completed routes
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django_celery_beat.models import PeriodicTask
+
+from apps.logistics import tasks
+from apps.logistics.models import StatusHistory, Stop, TravelProfile
+from apps.logistics.optimization.distance import haversine
+from apps.logistics.optimization.speed_profile import HOURS_PER_WEEK, SpeedProfile, Visit, hour_of_week
+from apps.logistics.services import route_update_etas, travel_profile_build
+
+CENTRE = (12.93, 77.60)
+OTHER = (13.30, 77.90)  # a different precision-5 zone
+
+
+def drive(route, start, hour, points, speed_kmh, service_s=300.0):
+    """Visits along ``points`` at ``speed_kmh`` with ``service_s`` at each stop."""
+    visits, clock = [], start
+    for k, (lat, lng) in enumerate(points):
+        if k:
+            clock += haversine(*points[k - 1], lat, lng) / speed_kmh * 3600
+        visits.append(Visit(route, lat, lng, clock, clock + service_s, hour, hour))
+        clock += service_s
+    return visits
+
+
+def line(origin, n, step=0.003):
+    return [(origin[0] + k * step, origin[1]) for k in range(n)]
+
+
+class TestSpeedProfile:
+    def test_zone_hour_buckets_and_fallbacks(self):
+        visits = (
+            drive("a", 0, 9, line(CENTRE, 6), speed_kmh=12, service_s=600)
+            + drive("b", 0, 20, line(CENTRE, 6), speed_kmh=40)
+            + drive("c", 0, 9, line(OTHER, 6), speed_kmh=30)
+        )
+        profile = SpeedProfile.build(visits, precision=5, min_samples=5)
+
+        assert profile.legs == 15 and profile.visits == 18
+        assert profile.speed_kmh(*CENTRE, 9) == pytest.approx(12, rel=1e-3)
+        assert profile.speed_kmh(*CENTRE, 20 + HOURS_PER_WEEK) == pytest.approx(40, rel=1e-3)
+        assert profile.speed_kmh(*OTHER, 9) == pytest.approx(30, rel=1e-3)
+        assert profile.service_s(*CENTRE, 9) == pytest.approx(600)
+        # Unseen hour: the zone over all hours (km-weighted: 10 legs, 5 at 12 and 5 at 40 km/h)
+        assert profile.speed_kmh(*CENTRE, 3) == pytest.approx(1 / (0.5 / 12 + 0.5 / 40), rel=1e-3)
+        # Unseen zone: the hour over all zones, then everything
+        assert profile.speed_kmh(40.0, -74.0, 20) == pytest.approx(40, rel=1e-3)
+        assert profile.speed_kmh(40.0, -74.0, 3) > 0
+
+    def test_legs_do_not_span_routes_and_noise_is_dropped(self):
+        first = drive("a", 0, 9, line(CENTRE, 2), speed_kmh=20)
+        # Starts where "a" ended, moments later: would be an absurd leg if joined
+        second = drive("b", first[-1].departed_s + 1, 9, line(OTHER, 2), speed_kmh=20)
+        stuck = [Visit("c", *CENTRE, 0, 60, 9, 9), Visit("c", *OTHER, 30, 90, 9, 9)]
+
+        profile = SpeedProfile.build(first + second + stuck, min_samples=1)
+
+        assert profile.legs == 2
+        assert profile.speed_kmh(*line(CENTRE, 2)[1], 9) == pytest.approx(20, rel=1e-3)
+
+    def test_round_trip(self):
+        profile = SpeedProfile.build(drive("a", 0, 9, line(CENTRE, 8), speed_kmh=18), min_samples=1)
+
+        loaded = SpeedProfile.loads(profile.zones, profile.dumps())
+
+        assert loaded.zones == profile.zones and loaded.legs == profile.legs
+        assert loaded.speed.tobytes() == profile.speed.tobytes()
+        assert loaded.speed_kmh(*CENTRE, 9) == pytest.approx(18, rel=1e-3)
+
+    def test_empty_profile_knows_nothing(self):
+        profile = SpeedProfile.build([])
+        assert profile.speed_kmh(*CENTRE, 9) is None and profile.service_s(*CENTRE, 9) is None
+
+
+@pytest.mark.django_db
+class TestTravelProfileBuild:
+    @pytest.fixture(autouse=True)
+    def route_fixtures(self, tenant, driver, vehicle, make_order, make_route):
+        self.tenant, self.driver, self.vehicle = tenant, driver, vehicle
+        self.make_order, self._make_route = make_order, make_route
+
+    def make_route(self, points, route_date):
+        orders = [self.make_order(a, b) for a, b in zip(points[::2], points[1::2])]
+        return self._make_route(orders, route_date, driver=self.driver, vehicle=self.vehicle, pinned=True)
+
+    def complete(self, route, start, speed_kmh, service_s):
+        """Replay a drive through the route's stops as geofenced arrivals and status changes."""
+        stops = list(Stop.objects.filter(order__assigned_route=route).order_by("sequence_index"))
+        clock = start
+        for prev, stop in zip([None] + stops, stops):
+            if prev:
+                clock += timedelta(hours=haversine(prev.lat, prev.lng, stop.lat, stop.lng) / speed_kmh)
+            Stop.objects.filter(pk=stop.pk).update(status=Stop.StopStatus.COMPLETED, actual_arrival_time=clock)
+            clock += timedelta(seconds=service_s)
+            history = StatusHistory.objects.create(
+                tenant=self.tenant, order=stop.order, stop=stop,
+                actor_type=StatusHistory.ActorType.DRIVER, to_status="DELIVERED",
+            )
+            StatusHistory.objects.filter(pk=history.pk).update(created_at=clock)
+        route.status, route.end_time = route.Status.COMPLETED, clock
+        route.save(update_fields=["status", "end_time"])
+
+    def test_builds_from_history_and_retimes_etas(self, settings):
+        settings.ROUTE_SPEED_PROFILE_MIN_SAMPLES = 3
+        settings.ROUTE_AVERAGE_SPEED_KMH = 30
+        settings.ROUTE_DAY_START = "09:00"
+        start = timezone.make_aware(datetime(2026, 6, 1, 9, 0))
+        for day in range(3):
+            route = self.make_route(line(CENTRE, 4), start.date() + timedelta(days=7 * day))
+            self.complete(route, start + timedelta(days=7 * day), speed_kmh=10, service_s=240)
+
+        with CaptureQueriesContext(connection) as ctx:
+            profile = travel_profile_build(tenant=self.tenant)
+
+        mined = [q for q in ctx.captured_queries if q["sql"].startswith("SELECT") and "stop" in q["sql"]]
+        assert len(mined) == 2
+        assert (profile.routes, profile.legs, profile.visits) == (3, 9, 12)
+        learned = SpeedProfile.loads(profile.zones, bytes(TravelProfile.objects.get().tables))
+        assert learned.speed_kmh(*CENTRE, hour_of_week(timezone.localtime(start))) == pytest.approx(10, rel=1e-3)
+
+        planned = self.make_route(line(CENTRE, 4), (start + timedelta(days=28)).date())
+        stops = route_update_etas(route=planned)
+        gap = stops[1].scheduled_eta - stops[0].scheduled_eta
+        leg_s = haversine(*line(CENTRE, 2)[0], *line(CENTRE, 2)[1]) / 10 * 3600
+        assert gap.total_seconds() == pytest.approx(240 + leg_s, abs=1)
+
+    def test_no_completed_routes_gives_empty_profile(self):
+        self.make_route(line(CENTRE, 2), datetime(2026, 6, 1, tzinfo=dt_timezone.utc).date())
+
+        out = StringIO()
+        call_command("build_travel_profile", tenant_slug=self.tenant.slug, stdout=out)
+
+        profile = TravelProfile.objects.get(tenant=self.tenant)
+        assert (profile.routes, profile.legs, profile.zones) == (0, 0, [])
+        assert "0 routes" in out.getvalue()
+
+    def test_nightly_task_builds_recent_tenants(self):
+        start = timezone.now() - timedelta(days=2)
+        route = self.make_route(line(CENTRE, 4), start.date())
+        self.complete(route, start, speed_kmh=20, service_s=120)
+
+        task = PeriodicTask.objects.get(task="logistics.build_travel_profiles")
+        assert task.enabled and (task.crontab.minute, task.crontab.hour) == ("30", "2")
+        result = tasks.build_travel_profiles.app.tasks[task.task].apply()  # as beat sends it, by name
+
+        assert result.get() == "Built 1 travel profiles."
+        assert TravelProfile.objects.get(tenant=self.tenant).routes == 1
@@ -9,15 +9,30 @@ ops_urlpatterns = [
     path("drivers/<uuid:pk>/", views.OpsDriverDetailView.as_view(), name="ops-driver-detail"),
     path("vehicles/", views.OpsVehicleListCreateView.as_view(), name="ops-vehicle-list-create"),
     path("orders/", views.OpsOrderListCreateView.as_view(), name="ops-order-list-create"),
+    path("orders/import/", views.OpsOrderImportView.as_view(), name="ops-order-import"),
     path("orders/<uuid:pk>/", views.OpsOrderDetailView.as_view(), name="ops-order-detail"),
     path("orders/<uuid:pk>/cancel/", views.OpsOrderCancelView.as_view(), name="ops-order-cancel"),
     path("orders/<uuid:pk>/reassign/", views.OpsOrderReassignView.as_view(), name="ops-order-reassign"),
+    path("orders/<uuid:pk>/insertion/", views.OpsOrderInsertionView.as_view(), name="ops-order-insertion"),
+    path(
+        "orders/<uuid:pk>/nearby-drivers/",
+        views.OpsOrderNearbyDriversView.as_view(),
+        name="ops-order-nearby-drivers",
+    ),
     path("routes/", views.OpsRouteListCreateView.as_view(), name="ops-route-list-create"),
+    path("routes/plan/", views.OpsRoutePlanView.as_view(), name="ops-route-plan"),
     path("routes/<uuid:pk>/", views.OpsRouteDetailView.as_view(), name="ops-route-detail"),
     path("routes/<uuid:pk>/reorder/", views.OpsRouteReorderView.as_view(), name="ops-route-reorder"),
+    path("routes/<uuid:pk>/optimize/", views.OpsRouteOptimizeView.as_view(), name="ops-route-optimize"),
+    path(
+        "optimization-jobs/<uuid:pk>/",
+        views.OpsOptimizationJobDetailView.as_view(),
+        name="ops-optimization-job-detail",
+    ),
     path("exceptions/", views.OpsExceptionListView.as_view(), name="ops-exception-list"),
     path("exceptions/<uuid:pk>/ack/", views.OpsExceptionAckView.as_view(), name="ops-exception-ack"),
     path("exceptions/<uuid:pk>/resolve/", views.OpsExceptionResolveView.as_view(), name="ops-exception-resolve"),
+    path("stats/", views.OpsStatsView.as_view(), name="ops-stats"),
 ]
 
 # ── Driver ────────────────────────────────────────────────────────────────────
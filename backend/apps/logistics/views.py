@@ -7,27 +7,33 @@ from rest_framework.response import Response
 from rest_framework.throttling import AnonRateThrottle
 from rest_framework.views import APIView
 
-from apps.logistics import selectors, services
+from apps.logistics import order_import, selectors, services
 from apps.logistics.models import (
     Driver,
     Exception as LogisticsException,
+    OptimizationJob,
     Order,
     Route,
     Stop,
     Vehicle,
 )
+from apps.logistics.optimization import sequencing
 from apps.logistics.serializers import (
     DriverCreateSerializer, DriverSerializer, DriverStatusUpdateSerializer,
     ExceptionAckSerializer, ExceptionResolveSerializer, ExceptionSerializer,
-    OrderCancelSerializer, OrderCreateSerializer, OrderDetailSerializer,
-    OrderListSerializer, OrderReassignSerializer,
-    PODCreateSerializer, PODSerializer,
+    OptimizationJobCreateSerializer, OptimizationJobSerializer,
+    InsertionCandidateSerializer, NearbyDriverSerializer, NearbyDriversQuerySerializer,
+    OrderCancelSerializer, OrderCreateSerializer, OrderImportSerializer,
+    OrderDetailSerializer, OrderInsertionSerializer, OrderListQuerySerializer, OrderListSerializer,
+    OrderReassignSerializer,
+    PlannedRouteSerializer, PODCreateSerializer, PODSerializer,
     RouteCreateSerializer, RouteDetailSerializer, RouteListSerializer,
-    RouteReorderSerializer, ScanSerializer, TrackingSerializer,
+    RoutePlanSerializer, RouteReorderSerializer, ScanSerializer, TrackingSerializer,
     VehicleSerializer,
 )
 from apps.users.models import User
 from apps.users.services import user_create
+from common.pagination import KeysetPagination
 from common.permissions import IsDriverUser, IsOpsUser
 
 
@@ -55,8 +61,10 @@ class OpsDriverListCreateView(APIView):
     permission_classes = [IsAuthenticated, IsOpsUser]
 
     def get(self, request):
-        drivers = selectors.driver_list(tenant=request.user.tenant)
-        return Response(DriverSerializer(drivers, many=True).data)
+        paginator = KeysetPagination(ordering=selectors.DRIVER_LIST_ORDERING)
+        drivers = paginator.paginate_queryset(selectors.driver_list(tenant=request.user.tenant), request)
+        drivers = selectors.drivers_with_live_positions(drivers)
+        return paginator.get_paginated_response(DriverSerializer(drivers, many=True).data)
 
     def post(self, request):
         ser = DriverCreateSerializer(data=request.data)
@@ -87,6 +95,7 @@ class OpsDriverDetailView(APIView):
 
     def get(self, request, pk):
         driver = get_object_or_404(Driver, pk=pk, tenant=request.user.tenant)
+        driver, = selectors.drivers_with_live_positions([driver])
         return Response(DriverSerializer(driver).data)
 
 
@@ -121,12 +130,12 @@ class OpsOrderListCreateView(APIView):
     permission_classes = [IsAuthenticated, IsOpsUser]
 
     def get(self, request):
-        orders = selectors.order_list(tenant=request.user.tenant)
-        # Apply status filter
-        s = request.query_params.get("status")
-        if s:
-            orders = orders.filter(status=s)
-        return Response(OrderListSerializer(orders, many=True).data)
+        ser = OrderListQuerySerializer(data=request.query_params)
+        ser.is_valid(raise_exception=True)
+        orders = selectors.order_list(tenant=request.user.tenant, **ser.validated_data)
+        paginator = KeysetPagination(ordering=selectors.ORDER_LIST_ORDERING)
+        orders = paginator.paginate_queryset(orders, request)
+        return paginator.get_paginated_response(OrderListSerializer(orders, many=True).data)
 
     def post(self, request):
         ser = OrderCreateSerializer(data=request.data)
@@ -146,6 +155,7 @@ class OpsOrderListCreateView(APIView):
                 pickup_window_end=d.get("pickup_window_end"),
                 drop_window_start=d.get("drop_window_start"),
                 drop_window_end=d.get("drop_window_end"),
+                weight_kg=d.get("weight_kg", 0),
                 actor_user=request.user,
             )
         except ValueError as e:
@@ -157,6 +167,34 @@ class OpsOrderListCreateView(APIView):
         )
 
 
+class OpsOrderImportView(APIView):
+    permission_classes = [IsAuthenticated, IsOpsUser]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        """
+        Chunks commit as they go. A file unreadable part-way answers 207 with
+        the rows created so far and ``stopped.line`` to resume from; 400 means
+        nothing was written.
+        """
+        ser = OrderImportSerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        d = ser.validated_data
+
+        try:
+            report = services.orders_import(
+                tenant=request.user.tenant,
+                rows=order_import.read_rows(d["file"], d["format"]),
+                actor_user=request.user,
+            )
+        except (ValueError, UnicodeDecodeError) as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if "stopped" in report:
+            return Response(report, status=status.HTTP_207_MULTI_STATUS)
+        return Response(report)
+
+
 class OpsOrderDetailView(APIView):
     permission_classes = [IsAuthenticated, IsOpsUser]
 
@@ -204,6 +242,46 @@ class OpsOrderReassignView(APIView):
         return Response(OrderDetailSerializer(order, context={"request": request}).data)
 
 
+class OpsOrderInsertionView(APIView):
+    permission_classes = [IsAuthenticated, IsOpsUser]
+
+    def post(self, request, pk):
+        order = get_object_or_404(Order, pk=pk, tenant=request.user.tenant)
+        ser = OrderInsertionSerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        d = ser.validated_data
+        try:
+            candidates = services.order_insertion_candidates(
+                order=order, route_date=d.get("route_date"), limit=d["limit"]
+            )
+            inserted_route_id = None
+            if d["commit"]:
+                if not candidates:
+                    raise ValueError("No active route can take this order.")
+                services.order_insert(order=order, route=candidates[0]["route"], actor_user=request.user)
+                inserted_route_id = str(candidates[0]["route"].id)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            "candidates": InsertionCandidateSerializer(candidates, many=True).data,
+            "inserted_route_id": inserted_route_id,
+        })
+
+
+class OpsOrderNearbyDriversView(APIView):
+    permission_classes = [IsAuthenticated, IsOpsUser]
+
+    def get(self, request, pk):
+        order = get_object_or_404(Order, pk=pk, tenant=request.user.tenant)
+        ser = NearbyDriversQuerySerializer(data=request.query_params)
+        ser.is_valid(raise_exception=True)
+        try:
+            nearby = selectors.drivers_near_order(order=order, **ser.validated_data)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(NearbyDriverSerializer(nearby, many=True).data)
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # OPS — Routes
 # ─────────────────────────────────────────────────────────────────────────────
@@ -212,8 +290,9 @@ class OpsRouteListCreateView(APIView):
     permission_classes = [IsAuthenticated, IsOpsUser]
 
     def get(self, request):
-        routes = selectors.route_list(tenant=request.user.tenant)
-        return Response(RouteListSerializer(routes, many=True).data)
+        paginator = KeysetPagination(ordering=selectors.ROUTE_LIST_ORDERING)
+        routes = paginator.paginate_queryset(selectors.route_list(tenant=request.user.tenant), request)
+        return paginator.get_paginated_response(RouteListSerializer(routes, many=True).data)
 
     def post(self, request):
         ser = RouteCreateSerializer(data=request.data)
@@ -231,6 +310,7 @@ class OpsRouteListCreateView(APIView):
                 vehicle=vehicle,
                 order_ids=[str(oid) for oid in d["order_ids"]],
                 optimize=d.get("optimize", False),
+                service_minutes=d.get("service_minutes"),
                 actor_user=request.user,
             )
         except ValueError as e:
@@ -239,6 +319,44 @@ class OpsRouteListCreateView(APIView):
         return Response(RouteDetailSerializer(route).data, status=status.HTTP_201_CREATED)
 
 
+class OpsRoutePlanView(APIView):
+    permission_classes = [IsAuthenticated, IsOpsUser]
+
+    def post(self, request):
+        ser = RoutePlanSerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        d = ser.validated_data
+        tenant = request.user.tenant
+
+        drivers = vehicles = None
+        if d.get("driver_ids"):
+            drivers = list(Driver.objects.filter(tenant=tenant, is_active=True, id__in=d["driver_ids"]))
+        if d.get("vehicle_ids"):
+            vehicles = list(Vehicle.objects.filter(tenant=tenant, is_active=True, id__in=d["vehicle_ids"]))
+
+        try:
+            routes, unassigned = services.routes_plan(
+                tenant=tenant,
+                route_date=d["route_date"],
+                drivers=drivers,
+                vehicles=vehicles,
+                optimize=d["optimize"] or sequencing.DEFAULT_MODE,
+                service_minutes=d.get("service_minutes"),
+                actor_user=request.user,
+            )
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        planned = selectors.route_plan_summary(tenant=tenant, route_ids=[r.id for r in routes])
+        return Response(
+            {
+                "routes": PlannedRouteSerializer(planned, many=True).data,
+                "unassigned_order_ids": [str(o.id) for o in unassigned],
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+
 class OpsRouteDetailView(APIView):
     permission_classes = [IsAuthenticated, IsOpsUser]
 
@@ -247,6 +365,7 @@ class OpsRouteDetailView(APIView):
             route = selectors.route_get(tenant=request.user.tenant, route_id=pk)
         except Route.DoesNotExist:
             return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+        route.path = selectors.route_path(route=route)
         return Response(RouteDetailSerializer(route).data)
 
 
@@ -266,6 +385,39 @@ class OpsRouteReorderView(APIView):
         return Response({"detail": "Stops reordered."})
 
 
+class OpsRouteOptimizeView(APIView):
+    permission_classes = [IsAuthenticated, IsOpsUser]
+
+    def post(self, request, pk):
+        route = get_object_or_404(Route, pk=pk, tenant=request.user.tenant)
+        ser = OptimizationJobCreateSerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        d = ser.validated_data
+        try:
+            job = services.optimization_job_create(
+                tenant=request.user.tenant,
+                route=route,
+                mode=d["mode"],
+                time_budget_s=d.get("time_budget_s"),
+                service_minutes=d.get("service_minutes"),
+                actor_user=request.user,
+            )
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(OptimizationJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
+class OpsOptimizationJobDetailView(APIView):
+    permission_classes = [IsAuthenticated, IsOpsUser]
+
+    def get(self, request, pk):
+        try:
+            job = selectors.optimization_job_get(tenant=request.user.tenant, job_id=pk)
+        except OptimizationJob.DoesNotExist:
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(OptimizationJobSerializer(job).data)
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # OPS — Exceptions
 # ─────────────────────────────────────────────────────────────────────────────
@@ -278,7 +430,16 @@ class OpsExceptionListView(APIView):
         s = request.query_params.get("status")
         if s:
             exceptions = exceptions.filter(status=s)
-        return Response(ExceptionSerializer(exceptions, many=True).data)
+        paginator = KeysetPagination(ordering=selectors.EXCEPTION_LIST_ORDERING)
+        exceptions = paginator.paginate_queryset(exceptions, request)
+        return paginator.get_paginated_response(ExceptionSerializer(exceptions, many=True).data)
+
+
+class OpsStatsView(APIView):
+    permission_classes = [IsAuthenticated, IsOpsUser]
+
+    def get(self, request):
+        return Response(selectors.ops_stats(tenant=request.user.tenant))
 
 
 class OpsExceptionAckView(APIView):
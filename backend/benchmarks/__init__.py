@@ -0,0 +1,13 @@
+"""
+Route optimizer benchmarks.
+
+Reproducible synthetic instances (``instances``) are solved by every
+sequencing strategy (``strategies``); ``runner`` records runtime, peak memory,
+distance and window / precedence violations as JSON, and ``compare`` checks a
+result file against a stored baseline::
+
+    python -m benchmarks run --suite quick --out results.json
+    python -m benchmarks compare results.json benchmarks/baseline.json
+
+Nothing here touches Django or the database.
+"""
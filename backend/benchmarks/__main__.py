@@ -0,0 +1,87 @@
+"""
+Command line entry point; run from ``backend/``::
+
+    python -m benchmarks run [--suite quick|full] [--sizes 10 500] [--kinds clustered]
+                             [--strategies 2opt windows] [--repeat 3] [--no-memory]
+                             [--out results.json] [--baseline benchmarks/baseline.json]
+    python -m benchmarks compare results.json benchmarks/baseline.json
+
+Both commands exit with status 1 when a regression against the baseline is found.
+"""
+import argparse
+import json
+import sys
+
+from benchmarks import compare, instances, runner
+from benchmarks.strategies import STRATEGIES
+
+
+def _report(current: dict, baseline_path: str) -> int:
+    with open(baseline_path) as fh:
+        baseline = json.load(fh)
+    changes = compare.compare(current, baseline)
+    if changes:
+        print(compare.format_changes(changes))
+    found = compare.regressions(changes)
+    print(f"{len(found)} regression(s) against {baseline_path}.")
+    return 1 if found else 0
+
+
+def _run(args) -> int:
+    sizes = args.sizes or runner.SUITES[args.suite]
+    suite = instances.suite(sizes, kinds=args.kinds, seed=args.seed)
+
+    def show(result):
+        print(
+            f"{result['instance']:<20} {result['strategy']:<8} "
+            f"{result['runtime_s']:>9.4f}s {result['distance_km']:>10.3f} km "
+            f"{result['window_violations']:>5} late",
+            file=sys.stderr,
+        )
+
+    report = runner.run(
+        suite, args.strategies, repeat=args.repeat, memory=not args.no_memory, on_result=show
+    )
+    report["meta"]["suite"] = args.suite if not args.sizes else "custom"
+    report["meta"]["seed"] = args.seed
+    payload = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as fh:
+            fh.write(payload + "\n")
+    else:
+        print(payload)
+    return _report(report, args.baseline) if args.baseline else 0
+
+
+def _compare(args) -> int:
+    with open(args.current) as fh:
+        return _report(json.load(fh), args.baseline)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Route optimizer benchmarks.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the benchmark suite and write a JSON report.")
+    run.add_argument("--suite", choices=sorted(runner.SUITES), default="quick")
+    run.add_argument("--sizes", type=int, nargs="+", help="Stop counts; overrides --suite.")
+    run.add_argument("--kinds", nargs="+", choices=instances.KINDS, default=list(instances.KINDS))
+    run.add_argument("--strategies", nargs="+", choices=sorted(STRATEGIES))
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--repeat", type=int, default=1, help="Timed runs per result; the best is kept.")
+    run.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc peak-memory run.")
+    run.add_argument("--out", help="Write the report here instead of stdout.")
+    run.add_argument("--baseline", help="Compare the report against this baseline file.")
+    run.set_defaults(handler=_run)
+
+    cmp = commands.add_parser("compare", help="Compare a report against a baseline.")
+    cmp.add_argument("current")
+    cmp.add_argument("baseline")
+    cmp.set_defaults(handler=_compare)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""
+Compare a benchmark report against a stored baseline.
+
+Results are matched on ``(instance, strategy)``. Distance, window and
+precedence violations are deterministic for a given instance, so any growth
+beyond ``distance_tol`` is a regression; runtime and memory depend on the
+machine and only count when they grow by a relative *and* an absolute margin.
+Changes in the other direction are reported as improvements.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+DISTANCE_TOL = 0.005
+RUNTIME_TOL = 0.5
+MIN_RUNTIME_DELTA_S = 0.05
+MEMORY_TOL = 0.5
+MIN_MEMORY_DELTA_KB = 256
+COUNT_METRICS = ("window_violations", "precedence_violations")
+
+
+@dataclass
+class Change:
+    instance: str
+    strategy: str
+    metric: str
+    baseline: Optional[float]
+    current: Optional[float]
+    regression: bool
+
+
+def compare(
+    current: dict,
+    baseline: dict,
+    *,
+    distance_tol: float = DISTANCE_TOL,
+    runtime_tol: float = RUNTIME_TOL,
+    memory_tol: float = MEMORY_TOL,
+) -> list[Change]:
+    base = {(r["instance"], r["strategy"]): r for r in baseline["results"]}
+    changes = []
+    for result in current["results"]:
+        key = (result["instance"], result["strategy"])
+        before = base.get(key)
+        if before is None:
+            continue
+        checks = [
+            ("distance_km", distance_tol, 0.0),
+            ("runtime_s", runtime_tol, MIN_RUNTIME_DELTA_S),
+            ("peak_kb", memory_tol, MIN_MEMORY_DELTA_KB),
+        ] + [(metric, 0.0, 0.0) for metric in COUNT_METRICS]
+        for metric, rel_tol, abs_tol in checks:
+            old, new = before.get(metric), result.get(metric)
+            if old is None or new is None:
+                continue
+            margin = max(abs(old) * rel_tol, abs_tol)
+            if abs(new - old) > margin:
+                changes.append(Change(*key, metric, old, new, regression=new > old))
+
+    current_keys = {(r["instance"], r["strategy"]) for r in current["results"]}
+    for key in base.keys() - current_keys:
+        changes.append(Change(*key, "missing", None, None, regression=False))
+    return changes
+
+
+def regressions(changes: list[Change]) -> list[Change]:
+    return [c for c in changes if c.regression]
+
+
+def format_changes(changes: list[Change]) -> str:
+    lines = []
+    for c in sorted(changes, key=lambda c: (not c.regression, c.instance, c.strategy, c.metric)):
+        label = "REGRESSION" if c.regression else ("missing" if c.metric == "missing" else "improved")
+        if c.metric == "missing":
+            lines.append(f"{label:<10}  {c.instance:<20} {c.strategy:<8} not in current run")
+        else:
+            lines.append(
+                f"{label:<10}  {c.instance:<20} {c.strategy:<8} {c.metric:<22} {c.baseline} -> {c.current}"
+            )
+    return "\n".join(lines)
@@ -0,0 +1,108 @@
+"""
+Synthetic city-scale routing instances.
+
+Every instance is fully determined by ``(kind, n_stops, seed)``. Stops are
+spread over a square of ``CITY_SPAN_DEG`` degrees, either uniformly or around
+Gaussian clusters (one per ``STOPS_PER_CLUSTER`` stops). Orders are a PICKUP
+followed by a DROP, except ``DROP_ONLY_FRACTION`` of them which ship from the
+depot and only have a DROP. ``WINDOW_FRACTION`` of the stops get a service
+window spread over the expected length of the route.
+"""
+import math
+import random
+from dataclasses import dataclass
+
+from apps.logistics.optimization.precedence import Precedence
+from apps.logistics.optimization.time_windows import TimeWindows
+
+KINDS = ("uniform", "clustered")
+CITY_ORIGIN = (12.85, 77.45)
+CITY_SPAN_DEG = 0.3
+STOPS_PER_CLUSTER = 40
+CLUSTER_SIGMA_DEG = 0.008
+DROP_ONLY_FRACTION = 0.3
+WINDOW_FRACTION = 0.5
+WINDOW_WIDTH_S = (3600.0, 3 * 3600.0)
+# Same defaults as the ROUTE_* settings
+SPEED_KMH = 25.0
+SERVICE_MINUTES = 5.0
+LATENESS_WEIGHT = 5.0
+
+
+@dataclass
+class Instance:
+    kind: str
+    n_stops: int
+    seed: int
+    points: list[tuple[float, float]]
+    types: list[str]  # "PICKUP" / "DROP" per point
+    pairs: list[tuple[int, int]]  # (pickup, drop) point indices
+    windows: TimeWindows
+
+    @property
+    def name(self) -> str:
+        return f"{self.kind}-{self.n_stops}-s{self.seed}"
+
+    def precedence(self) -> Precedence:
+        return Precedence(self.n_stops, self.pairs)
+
+
+def generate(kind: str, n_stops: int, seed: int = 0) -> Instance:
+    if kind not in KINDS:
+        raise ValueError(f"Unknown instance kind '{kind}'.")
+    if n_stops < 2:
+        raise ValueError("An instance needs at least 2 stops.")
+    rng = random.Random(f"{kind}:{n_stops}:{seed}")
+    sample = _uniform if kind == "uniform" else _clustered(rng, n_stops)
+
+    points, types, pairs = [], [], []
+    while len(points) < n_stops:
+        if n_stops - len(points) == 1 or rng.random() < DROP_ONLY_FRACTION:
+            points.append(sample(rng))
+            types.append("DROP")
+            continue
+        points += [sample(rng), sample(rng)]
+        types += ["PICKUP", "DROP"]
+        pairs.append((len(points) - 2, len(points) - 1))
+
+    return Instance(kind, n_stops, seed, points, types, pairs, _windows(rng, points, types))
+
+
+def suite(sizes, kinds=KINDS, seed: int = 0) -> list[Instance]:
+    return [generate(kind, n, seed) for n in sizes for kind in kinds]
+
+
+def _uniform(rng: random.Random) -> tuple[float, float]:
+    return (
+        CITY_ORIGIN[0] + rng.random() * CITY_SPAN_DEG,
+        CITY_ORIGIN[1] + rng.random() * CITY_SPAN_DEG,
+    )
+
+
+def _clustered(rng: random.Random, n_stops: int):
+    centers = [_uniform(rng) for _ in range(max(1, math.ceil(n_stops / STOPS_PER_CLUSTER)))]
+
+    def sample(rng: random.Random) -> tuple[float, float]:
+        lat, lng = rng.choice(centers)
+        return rng.gauss(lat, CLUSTER_SIGMA_DEG), rng.gauss(lng, CLUSTER_SIGMA_DEG)
+
+    return sample
+
+
+def _windows(rng: random.Random, points, types) -> TimeWindows:
+    # Rough route length: service time plus one average leg per stop
+    span_km = CITY_SPAN_DEG * 111.0
+    leg_s = span_km / math.sqrt(len(points)) / SPEED_KMH * 3600.0
+    horizon = len(points) * (SERVICE_MINUTES * 60.0 + leg_s)
+    earliest, latest = [], []
+    for point_type in types:
+        if rng.random() < WINDOW_FRACTION:
+            opens = rng.random() * horizon
+            if point_type == "DROP":
+                opens = max(opens, horizon / 4)
+            earliest.append(opens)
+            latest.append(opens + rng.uniform(*WINDOW_WIDTH_S))
+        else:
+            earliest.append(0.0)
+            latest.append(math.inf)
+    return TimeWindows(earliest, latest, [SERVICE_MINUTES * 60.0] * len(points))
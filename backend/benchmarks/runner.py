@@ -0,0 +1,102 @@
+"""
+Run strategies over instances and collect comparable metrics.
+
+Runtime is the best of ``repeat`` plain runs; peak memory comes from one extra
+run under ``tracemalloc`` (which slows Python down, so it is never timed).
+Every tour is scored the same way whatever produced it: driven distance plus
+the window schedule at ``SPEED_KMH``, and pickups visited after their drop.
+"""
+import platform
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Optional, Sequence
+
+from apps.logistics.optimization.distance import DistanceMatrix, np
+from apps.logistics.optimization.precedence import tour_positions
+from apps.logistics.optimization.time_windows import WindowedRoute
+from benchmarks.instances import LATENESS_WEIGHT, SPEED_KMH, Instance
+from benchmarks.strategies import STRATEGIES
+
+SUITES = {
+    "quick": (10, 50, 200),
+    "full": (10, 50, 200, 500, 1000, 2000),
+}
+FORMAT_VERSION = 1
+
+
+def score(instance: Instance, tour: Sequence[int]) -> dict:
+    if sorted(tour) != list(range(instance.n_stops)):
+        raise ValueError(f"Tour for {instance.name} is not a permutation of its stops.")
+    route = WindowedRoute(
+        DistanceMatrix.from_points(instance.points), instance.windows, SPEED_KMH, LATENESS_WEIGHT
+    )
+    schedule = route.schedule(tour)
+    positions = tour_positions(tour)
+    return {
+        "distance_km": round(schedule.distance_km, 3),
+        "window_violations": schedule.violations,
+        "lateness_min": round(schedule.lateness_s / 60, 1),
+        "precedence_violations": sum(positions[p] > positions[d] for p, d in instance.pairs),
+    }
+
+
+def measure(instance: Instance, strategy: str, *, repeat: int = 1, memory: bool = True) -> dict:
+    solve = STRATEGIES[strategy]
+    runtimes = []
+    for _ in range(max(repeat, 1)):
+        started = time.perf_counter()
+        tour = solve(instance)
+        runtimes.append(time.perf_counter() - started)
+
+    peak_kb = None
+    if memory:
+        tracemalloc.start()
+        try:
+            solve(instance)
+            peak_kb = tracemalloc.get_traced_memory()[1] // 1024
+        finally:
+            tracemalloc.stop()
+
+    return {
+        "instance": instance.name,
+        "kind": instance.kind,
+        "n_stops": instance.n_stops,
+        "strategy": strategy,
+        "runtime_s": round(min(runtimes), 4),
+        "peak_kb": peak_kb,
+        **score(instance, tour),
+    }
+
+
+def run(
+    instances: Sequence[Instance],
+    strategies: Optional[Sequence[str]] = None,
+    *,
+    repeat: int = 1,
+    memory: bool = True,
+    on_result: Optional[Callable[[dict], None]] = None,
+) -> dict:
+    """Benchmark every strategy on every instance; returns the JSON-ready report."""
+    strategies = list(strategies or STRATEGIES)
+    unknown = [s for s in strategies if s not in STRATEGIES]
+    if unknown:
+        raise ValueError(f"Unknown strategies: {', '.join(unknown)}.")
+    results = []
+    for instance in instances:
+        for strategy in strategies:
+            result = measure(instance, strategy, repeat=repeat, memory=memory)
+            results.append(result)
+            if on_result:
+                on_result(result)
+    return {
+        "format": FORMAT_VERSION,
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "numpy": np is not None,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
@@ -0,0 +1,42 @@
+"""
+Sequencing strategies under benchmark.
+
+Each strategy takes an ``Instance`` and returns a tour over its points, going
+through the same code paths the services use: every ``sequencing.MODES`` entry
+and the ``windows`` mode via ``batch.solve_problem`` (distance matrix
+included), plus the matrix-free greedy behind ``_nearest_neighbor_order``.
+"""
+from typing import Callable
+
+from apps.logistics.optimization import batch, sequencing, time_windows
+from benchmarks.instances import LATENESS_WEIGHT, SPEED_KMH, Instance
+
+Strategy = Callable[[Instance], list[int]]
+
+
+def _solver(mode: str) -> Strategy:
+    def run(instance: Instance) -> list[int]:
+        problem = batch.RouteProblem(
+            key=instance.name,
+            mode=mode,
+            points=instance.points,
+            precedence=instance.precedence(),
+        )
+        if mode == time_windows.MODE:
+            problem.windows = instance.windows
+            problem.speed_kmh = SPEED_KMH
+            problem.lateness_weight = LATENESS_WEIGHT
+        return batch.solve_problem(problem).tour
+
+    return run
+
+
+def _nearest_neighbor_path(instance: Instance) -> list[int]:
+    return sequencing.nearest_neighbor_path(instance.points)
+
+
+STRATEGIES: dict[str, Strategy] = {
+    **{mode: _solver(mode) for mode in sequencing.MODES},
+    time_windows.MODE: _solver(time_windows.MODE),
+    "nn_path": _nearest_neighbor_path,
+}
@@ -0,0 +1,83 @@
+"""
+Benchmark suite tests.
+
+Covers:
+- Instances are reproducible and mix PICKUP/DROP pairs with drop-only orders
+- Every strategy yields a scored, JSON-ready result on a small instance
+- compare() flags quality regressions but tolerates runtime noise
+"""
+import copy
+import json
+
+import pytest
+
+from benchmarks import compare, instances, runner
+from benchmarks.__main__ import main
+from benchmarks.strategies import STRATEGIES
+
+
+class TestInstances:
+    @pytest.mark.parametrize("kind", instances.KINDS)
+    def test_reproducible_mixed_instances(self, kind):
+        first = instances.generate(kind, 51, seed=3)
+        again = instances.generate(kind, 51, seed=3)
+
+        assert first.points == again.points and first.pairs == again.pairs
+        assert first.points != instances.generate(kind, 51, seed=4).points
+        assert len(first.points) == len(first.types) == 51
+        assert first.types.count("DROP") > first.types.count("PICKUP") == len(first.pairs) > 0
+        assert all(first.types[p] == "PICKUP" and first.types[d] == "DROP" for p, d in first.pairs)
+
+    def test_rejects_unknown_kind(self):
+        with pytest.raises(ValueError, match="kind"):
+            instances.generate("ring", 10)
+
+
+class TestRunner:
+    def test_every_strategy_reports_metrics(self):
+        report = runner.run(instances.suite([30], kinds=["clustered"]), memory=True)
+
+        results = {r["strategy"]: r for r in report["results"]}
+        assert set(results) == set(STRATEGIES)
+        assert all(r["runtime_s"] >= 0 and r["peak_kb"] >= 0 and r["distance_km"] > 0 for r in results.values())
+        assert results["2opt"]["distance_km"] <= results["greedy"]["distance_km"]
+        assert results["windows"]["precedence_violations"] == results["2opt"]["precedence_violations"] == 0
+        json.dumps(report)
+
+    def test_cli_writes_report_and_fails_on_regression(self, tmp_path):
+        out, baseline = tmp_path / "out.json", tmp_path / "baseline.json"
+        args = ["run", "--sizes", "12", "--kinds", "uniform", "--strategies", "greedy", "--no-memory"]
+        assert main(args + ["--out", str(out)]) == 0
+
+        report = json.loads(out.read_text())
+        report["results"][0]["distance_km"] -= 5
+        baseline.write_text(json.dumps(report))
+
+        assert main(["compare", str(out), str(baseline)]) == 1
+
+
+class TestCompare:
+    def report(self, **overrides):
+        result = {
+            "instance": "uniform-10-s0", "strategy": "2opt", "runtime_s": 1.0, "peak_kb": 1000,
+            "distance_km": 100.0, "window_violations": 2, "precedence_violations": 0,
+        }
+        return {"results": [{**result, **overrides}]}
+
+    def test_regressions_and_improvements(self):
+        baseline = self.report()
+
+        assert compare.compare(self.report(runtime_s=1.3, peak_kb=1200, distance_km=100.2), baseline) == []
+        changes = compare.compare(self.report(distance_km=102.0, window_violations=1), baseline)
+        assert {(c.metric, c.regression) for c in changes} == {
+            ("distance_km", True), ("window_violations", False),
+        }
+        assert compare.regressions(compare.compare(self.report(runtime_s=2.0), baseline))
+
+    def test_missing_results_are_reported_not_failed(self):
+        baseline = self.report()
+        current = copy.deepcopy(baseline)
+        current["results"][0]["strategy"] = "greedy"
+
+        [change] = compare.compare(current, baseline)
+        assert change.metric == "missing" and not change.regression
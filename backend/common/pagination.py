@@ -1,6 +1,15 @@
 """Pagination classes."""
-from rest_framework.pagination import PageNumberPagination
+import binascii
+import json
+from base64 import b64decode, b64encode
+from typing import Optional
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class StandardPagination(PageNumberPagination):
@@ -17,3 +26,106 @@ class StandardPagination(PageNumberPagination):
                 "results": data,
             }
         )
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination over a fixed ``ordering`` that ends in a unique
+    field, e.g. ``("-created_at", "-id")``. All fields sort the same way.
+
+    A cursor is the key of the last row of the previous page, so a page is
+    ``WHERE key < cursor ORDER BY key LIMIT n`` — a range scan on a matching
+    composite index that costs the same at any depth, and rows inserted
+    meanwhile neither repeat nor skip. Cursors are opaque (base64 of the key);
+    there is no total count, which would need a full scan.
+    """
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor."
+
+    def __init__(self, ordering: tuple[str, ...]):
+        self.ordering = ordering
+        self.fields = [name.lstrip("-") for name in ordering]
+        self.descending = ordering[0].startswith("-")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.size = self.get_page_size(request)
+        key, reverse = self.decode_cursor(request, queryset.model)
+
+        ordering = self.ordering
+        # Going back walks the index the other way from the first row shown
+        before = self.descending != reverse
+        if reverse:
+            ordering = tuple(name[1:] if name.startswith("-") else f"-{name}" for name in ordering)
+        queryset = queryset.order_by(*ordering)
+        if key is not None:
+            queryset = queryset.filter(self._after(key, before))
+
+        rows = list(queryset[: self.size + 1])
+        has_more = len(rows) > self.size
+        rows = rows[: self.size]
+        if reverse:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, key is not None
+        self.next_key = self._key(rows[-1]) if rows and has_next else None
+        self.previous_key = self._key(rows[0]) if rows and has_previous else None
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.encode_cursor(self.next_key, reverse=False),
+                "previous": self.encode_cursor(self.previous_key, reverse=True),
+                "results": data,
+            }
+        )
+
+    def get_page_size(self, request) -> int:
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def _after(self, key: list, before: bool) -> Q:
+        # (a, b) < (x, y) as a < x OR (a = x AND b < y); the leading a <= x
+        # bound keeps it a single index range scan
+        lookup = "lt" if before else "gt"
+        condition = Q(**{f"{self.fields[-1]}__{lookup}": key[-1]})
+        for name, value in zip(reversed(self.fields[:-1]), reversed(key[:-1])):
+            condition = Q(**{f"{name}__{lookup}": value}) | (Q(**{name: value}) & condition)
+        bound = Q(**{f"{self.fields[0]}__{lookup}e": key[0]})
+        return bound & condition
+
+    def _key(self, row) -> list:
+        return [getattr(row, name) for name in self.fields]
+
+    def decode_cursor(self, request, model) -> tuple[Optional[list], bool]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(b64decode(encoded.encode(), altchars=b"-_", validate=True))
+            values = payload["k"]
+            if len(values) != len(self.fields):
+                raise ValueError
+            key = [model._meta.get_field(name).to_python(value) for name, value in zip(self.fields, values)]
+            return key, bool(payload.get("r"))
+        except (TypeError, ValueError, KeyError, binascii.Error, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, key: Optional[list], reverse: bool) -> Optional[str]:
+        if key is None:
+            return None
+        payload = {"k": [value.isoformat() if hasattr(value, "isoformat") else str(value) for value in key]}
+        if reverse:
+            payload["r"] = 1
+        encoded = b64encode(json.dumps(payload, separators=(",", ":")).encode(), altchars=b"-_").decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
@@ -111,6 +111,14 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # Redis
 REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
 
+# Cache
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ.get("CACHE_URL", "redis://localhost:6379/3"),
+    }
+}
+
 # Celery
 CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL", "redis://localhost:6379/1")
 CELERY_RESULT_BACKEND = os.environ.get("CELERY_RESULT_BACKEND", "redis://localhost:6379/2")
@@ -121,6 +129,45 @@ CELERY_TIMEZONE = TIME_ZONE
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
 CELERY_TASK_ALWAYS_EAGER = False
 
+# Route optimization
+ROUTE_AVERAGE_SPEED_KMH = float(os.environ.get("ROUTE_AVERAGE_SPEED_KMH", "25"))
+ROUTE_SERVICE_TIME_MINUTES = float(os.environ.get("ROUTE_SERVICE_TIME_MINUTES", "5"))
+ROUTE_DAY_START = os.environ.get("ROUTE_DAY_START", "09:00")
+# Objective weight of lateness in the "windows" mode, in km per minute late
+ROUTE_LATENESS_WEIGHT = float(os.environ.get("ROUTE_LATENESS_WEIGHT", "5"))
+# Wall-clock budget of background optimization jobs, in seconds
+ROUTE_OPTIMIZATION_BUDGET_S = float(os.environ.get("ROUTE_OPTIMIZATION_BUDGET_S", "30"))
+ROUTE_OPTIMIZATION_MAX_BUDGET_S = float(os.environ.get("ROUTE_OPTIMIZATION_MAX_BUDGET_S", "300"))
+# Lifetime of cached per-route stop geometry used by cheapest insertion
+ROUTE_GEOMETRY_CACHE_TTL_S = int(os.environ.get("ROUTE_GEOMETRY_CACHE_TTL_S", "3600"))
+# "haversine" (straight line) or "road_graph:<path to .npz>" built by build_road_graph
+ROUTE_DISTANCE_PROVIDER = os.environ.get("ROUTE_DISTANCE_PROVIDER", "haversine")
+# Pairwise travel-time cache in front of road-graph providers (the haversine
+# default is computed directly and never cached): geohash length of the
+# origin/destination key, in-process LRU entries, and Redis lifetime
+ROUTE_TRAVEL_CACHE_PRECISION = int(os.environ.get("ROUTE_TRAVEL_CACHE_PRECISION", "8"))
+ROUTE_TRAVEL_CACHE_SIZE = int(os.environ.get("ROUTE_TRAVEL_CACHE_SIZE", "100000"))
+ROUTE_TRAVEL_CACHE_TTL_S = int(os.environ.get("ROUTE_TRAVEL_CACHE_TTL_S", str(7 * 24 * 3600)))
+# A driver ping this close to a pending stop of their live route marks it ARRIVED
+ROUTE_GEOFENCE_RADIUS_M = float(os.environ.get("ROUTE_GEOFENCE_RADIUS_M", "75"))
+# Latest driver GPS ping is buffered in the cache for this long between flushes to the database
+DRIVER_POSITION_TTL_S = int(os.environ.get("DRIVER_POSITION_TTL_S", "3600"))
+# Breadcrumb segments are simplified to within this many metres of the pings once their day is over
+BREADCRUMB_TOLERANCE_M = float(os.environ.get("BREADCRUMB_TOLERANCE_M", "5"))
+# Live ETAs from driver pings: minimum movement before re-forecasting a route,
+# at most one forecast per route per interval, and the smallest ETA change pushed
+# to customer tracking pages
+ROUTE_LIVE_ETA_MIN_MOVE_M = float(os.environ.get("ROUTE_LIVE_ETA_MIN_MOVE_M", "200"))
+ROUTE_LIVE_ETA_INTERVAL_S = int(os.environ.get("ROUTE_LIVE_ETA_INTERVAL_S", "30"))
+ROUTE_LIVE_ETA_MIN_SHIFT_MINUTES = float(os.environ.get("ROUTE_LIVE_ETA_MIN_SHIFT_MINUTES", "2"))
+# Learned travel profiles: geohash length of a zone, observations needed before a
+# zone × hour bucket is trusted, and how many days of completed routes are mined
+ROUTE_SPEED_PROFILE_PRECISION = int(os.environ.get("ROUTE_SPEED_PROFILE_PRECISION", "5"))
+ROUTE_SPEED_PROFILE_MIN_SAMPLES = int(os.environ.get("ROUTE_SPEED_PROFILE_MIN_SAMPLES", "5"))
+ROUTE_SPEED_PROFILE_DAYS = int(os.environ.get("ROUTE_SPEED_PROFILE_DAYS", "56"))
+# Bulk order imports: rows validated and inserted per transaction
+ORDER_IMPORT_CHUNK_SIZE = int(os.environ.get("ORDER_IMPORT_CHUNK_SIZE", "1000"))
+
 # Channels
 CHANNEL_LAYERS = {
     "default": {
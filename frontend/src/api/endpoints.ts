@@ -1,4 +1,27 @@
 import api from "./client";
+import type { Driver, LogisticsException, OpsStats, Order, Page, Route } from "@/types";
+
+// Ops lists are keyset paginated; ask for the largest page the API serves
+const LIST_PARAMS = { page_size: "100" };
+
+// Cursor of a next/previous link, to pass back as the `cursor` param
+export const cursorOf = (link: string | null) =>
+  link ? new URL(link).searchParams.get("cursor") : null;
+
+// Every row of a list, following next cursors; for pickers that must offer all of them
+export async function listAll<T>(
+  list: (params?: Record<string, string>) => Promise<{ data: Page<T> }>,
+  params: Record<string, string> = {},
+): Promise<T[]> {
+  const rows: T[] = [];
+  let cursor: string | null = null;
+  do {
+    const { data } = await list(cursor ? { ...params, cursor } : params);
+    rows.push(...data.results);
+    cursor = cursorOf(data.next);
+  } while (cursor);
+  return rows;
+}
 
 // ── Auth ──────────────────────────────────────────────────────────────────────
 export const authApi = {
@@ -17,27 +40,35 @@ export const authApi = {
 
 // ── Orders ────────────────────────────────────────────────────────────────────
 export const ordersApi = {
-  list: (params?: Record<string, string>) => api.get("/ops/orders/", { params }),
+  list: (params?: Record<string, string>) =>
+    api.get<Page<Order>>("/ops/orders/", { params: { ...LIST_PARAMS, ...params } }),
   get: (id: string) => api.get(`/ops/orders/${id}/`),
   create: (data: unknown) => api.post("/ops/orders/", data),
   cancel: (id: string, reason: string) =>
     api.post(`/ops/orders/${id}/cancel/`, { reason }),
   reassign: (id: string, data: unknown) =>
     api.post(`/ops/orders/${id}/reassign/`, data),
+  nearbyDrivers: (id: string, params?: { limit?: number; radius_km?: number }) =>
+    api.get(`/ops/orders/${id}/nearby-drivers/`, { params }),
 };
 
 // ── Routes ────────────────────────────────────────────────────────────────────
 export const routesApi = {
-  list: () => api.get("/ops/routes/"),
+  list: (params?: Record<string, string>) =>
+    api.get<Page<Route>>("/ops/routes/", { params: { ...LIST_PARAMS, ...params } }),
   get: (id: string) => api.get(`/ops/routes/${id}/`),
   create: (data: unknown) => api.post("/ops/routes/", data),
   reorder: (id: string, stopOrder: string[]) =>
     api.post(`/ops/routes/${id}/reorder/`, { stop_order: stopOrder }),
+  optimize: (id: string, data?: { mode?: string; time_budget_s?: number }) =>
+    api.post(`/ops/routes/${id}/optimize/`, data ?? {}),
+  optimizationJob: (jobId: string) => api.get(`/ops/optimization-jobs/${jobId}/`),
 };
 
 // ── Drivers ───────────────────────────────────────────────────────────────────
 export const driversApi = {
-  list: () => api.get("/ops/drivers/"),
+  list: (params?: Record<string, string>) =>
+    api.get<Page<Driver>>("/ops/drivers/", { params: { ...LIST_PARAMS, ...params } }),
   create: (data: unknown) => api.post("/ops/drivers/", data),
 };
 
@@ -50,13 +81,18 @@ export const vehiclesApi = {
 // ── Exceptions ────────────────────────────────────────────────────────────────
 export const exceptionsApi = {
   list: (params?: Record<string, string>) =>
-    api.get("/ops/exceptions/", { params }),
+    api.get<Page<LogisticsException>>("/ops/exceptions/", { params: { ...LIST_PARAMS, ...params } }),
   ack: (id: string, note: string) =>
     api.post(`/ops/exceptions/${id}/ack/`, { note }),
   resolve: (id: string, resolution: string) =>
     api.post(`/ops/exceptions/${id}/resolve/`, { resolution }),
 };
 
+// ── Dashboard ─────────────────────────────────────────────────────────────────
+export const statsApi = {
+  get: () => api.get<OpsStats>("/ops/stats/"),
+};
+
 // ── Driver app ────────────────────────────────────────────────────────────────
 export const driverApi = {
   me: () => api.get("/driver/me/"),
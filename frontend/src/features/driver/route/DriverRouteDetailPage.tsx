@@ -76,10 +76,9 @@ export default function DriverRouteDetailPage() {
   if (isLoading) return <div className="flex justify-center p-20"><Spinner size={32} /></div>;
   if (isError || !route) return <div className="p-4"><ErrorMessage /></div>;
 
-  const completedOrders = route.orders?.filter(
-    (o) => o.status === "DELIVERED" || o.status === "FAILED"
-  ).length ?? 0;
-  const totalOrders = route.orders?.length ?? 0;
+  const completedOrders =
+    (route.order_counts?.DELIVERED ?? 0) + (route.order_counts?.FAILED ?? 0);
+  const totalOrders = route.order_count ?? 0;
   const progress = totalOrders > 0 ? Math.round((completedOrders / totalOrders) * 100) : 0;
 
   return (
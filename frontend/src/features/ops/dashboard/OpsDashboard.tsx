@@ -1,8 +1,8 @@
 import { useQuery } from "@tanstack/react-query";
-import { ordersApi, exceptionsApi, routesApi } from "@/api/endpoints";
+import { ordersApi, statsApi } from "@/api/endpoints";
 import { MapPin, AlertTriangle, CheckCircle2, TruckIcon, Package, ArrowRight, RefreshCw, Zap } from "lucide-react";
 import Spinner from "@/components/Spinner";
-import type { Order, Route, LogisticsException } from "@/types";
+import type { OpsStats, Order } from "@/types";
 import { OrderStatusBadge } from "@/components/StatusBadge";
 import { Link } from "react-router-dom";
 
@@ -34,25 +34,20 @@ function StatCard({ label, value, icon: Icon, gradient, iconColor, delay = "" }:
 export default function OpsDashboard() {
   const { data: orders, isLoading: loadingOrders, refetch: refetchOrders } = useQuery<Order[]>({
     queryKey: ["orders"],
-    queryFn: () => ordersApi.list().then((r) => r.data),
+    queryFn: () => ordersApi.list().then((r) => r.data.results),
   });
 
-  const { data: routes, isLoading: loadingRoutes, refetch: refetchRoutes } = useQuery<Route[]>({
-    queryKey: ["routes"],
-    queryFn: () => routesApi.list().then((r) => r.data),
+  // Counts come from the API; the orders query is only the first page, for the recent list
+  const { data: stats, isLoading: loadingStats, refetch: refetchStats } = useQuery<OpsStats>({
+    queryKey: ["orders", "stats"],
+    queryFn: () => statsApi.get().then((r) => r.data),
   });
 
-  const { data: exceptions, isLoading: loadingExceptions, refetch: refetchExceptions } = useQuery<LogisticsException[]>({
-    queryKey: ["exceptions"],
-    queryFn: () => exceptionsApi.list().then((r) => r.data),
-  });
-
-  const isLoading = loadingOrders || loadingRoutes || loadingExceptions;
+  const isLoading = loadingOrders || loadingStats;
 
   const handleRefresh = () => {
     refetchOrders();
-    refetchRoutes();
-    refetchExceptions();
+    refetchStats();
   };
 
   if (isLoading) {
@@ -63,11 +58,11 @@ export default function OpsDashboard() {
     );
   }
 
-  const inTransit = orders?.filter((o) => o.status === "IN_TRANSIT").length ?? 0;
-  const delivered = orders?.filter((o) => o.status === "DELIVERED").length ?? 0;
-  const openExceptions = exceptions?.filter((e) => e.status === "OPEN").length ?? 0;
-  const activeRoutes = routes?.filter((r) => r.status === "IN_PROGRESS").length ?? 0;
-  const totalOrders = orders?.length ?? 0;
+  const inTransit = stats?.orders.IN_TRANSIT ?? 0;
+  const delivered = stats?.orders.DELIVERED ?? 0;
+  const openExceptions = stats?.open_exception_count ?? 0;
+  const activeRoutes = stats?.active_route_count ?? 0;
+  const totalOrders = stats?.order_count ?? 0;
 
   return (
     <div className="p-6 animate-fade-in">
@@ -182,11 +177,11 @@ export default function OpsDashboard() {
             <div className="space-y-2">
               {[
                 { label: "Total", value: totalOrders, color: "bg-gray-300 dark:bg-gray-600" },
-                { label: "Created", value: orders?.filter((o) => o.status === "CREATED").length ?? 0, color: "bg-blue-300 dark:bg-blue-600" },
-                { label: "Assigned", value: orders?.filter((o) => o.status === "ASSIGNED").length ?? 0, color: "bg-purple-300 dark:bg-purple-600" },
+                { label: "Created", value: stats?.orders.CREATED ?? 0, color: "bg-blue-300 dark:bg-blue-600" },
+                { label: "Assigned", value: stats?.orders.ASSIGNED ?? 0, color: "bg-purple-300 dark:bg-purple-600" },
                 { label: "In Transit", value: inTransit, color: "bg-amber-300 dark:bg-amber-600" },
                 { label: "Delivered", value: delivered, color: "bg-green-300 dark:bg-green-600" },
-                { label: "Failed / Cancelled", value: orders?.filter((o) => ["FAILED","CANCELLED"].includes(o.status)).length ?? 0, color: "bg-red-300 dark:bg-red-600" },
+                { label: "Failed / Cancelled", value: (stats?.orders.FAILED ?? 0) + (stats?.orders.CANCELLED ?? 0), color: "bg-red-300 dark:bg-red-600" },
               ].map(({ label, value, color }) => (
                 <div key={label} className="flex items-center gap-2">
                   <div className={`h-2.5 w-2.5 rounded-full ${color}`} />
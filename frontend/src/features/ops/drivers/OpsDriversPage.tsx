@@ -31,7 +31,7 @@ export default function OpsDriversPage() {
 
   const { data: drivers, isLoading: loadingDrivers, isError: errorDrivers } = useQuery<Driver[]>({
     queryKey: ["drivers"],
-    queryFn: () => driversApi.list().then((r) => r.data),
+    queryFn: () => driversApi.list().then((r) => r.data.results),
   });
 
   const { data: vehicles, isLoading: loadingVehicles, isError: errorVehicles } = useQuery<Vehicle[]>({
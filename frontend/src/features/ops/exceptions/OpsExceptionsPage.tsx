@@ -26,7 +26,7 @@ export default function OpsExceptionsPage() {
 
   const { data: exceptions, isLoading, isError } = useQuery<LogisticsException[]>({
     queryKey: ["exceptions"],
-    queryFn: () => exceptionsApi.list().then((r) => r.data),
+    queryFn: () => exceptionsApi.list().then((r) => r.data.results),
   });
 
   const ack = useMutation({
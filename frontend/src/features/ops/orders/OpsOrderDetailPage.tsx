@@ -1,6 +1,6 @@
 import { useQuery, useMutation, useQueryClient } from "@tanstack/react-query";
 import { useParams, Link } from "react-router-dom";
-import { ordersApi, routesApi } from "@/api/endpoints";
+import { ordersApi, routesApi, listAll } from "@/api/endpoints";
 import type { Order, Route } from "@/types";
 import { OrderStatusBadge } from "@/components/StatusBadge";
 import Spinner from "@/components/Spinner";
@@ -29,8 +29,8 @@ export default function OpsOrderDetailPage() {
   });
 
   const { data: routes } = useQuery<Route[]>({
-    queryKey: ["routes"],
-    queryFn: () => routesApi.list().then((r) => r.data),
+    queryKey: ["routes", "all"],
+    queryFn: () => listAll(routesApi.list),
     enabled: showReassign,
   });
 
@@ -1,32 +1,48 @@
-import { useQuery } from "@tanstack/react-query";
+import { keepPreviousData, useInfiniteQuery } from "@tanstack/react-query";
 import { Link } from "react-router-dom";
-import { ordersApi } from "@/api/endpoints";
+import { cursorOf, ordersApi } from "@/api/endpoints";
 import type { Order } from "@/types";
 import { OrderStatusBadge } from "@/components/StatusBadge";
 import Spinner from "@/components/Spinner";
 import ErrorMessage from "@/components/ErrorMessage";
 import { Plus, Search, Package, ChevronRight } from "lucide-react";
-import { useState } from "react";
+import { useEffect, useState } from "react";
 
 const STATUS_TABS = ["ALL", "CREATED", "ASSIGNED", "PICKED_UP", "IN_TRANSIT", "DELIVERED", "FAILED", "CANCELLED"] as const;
 
+// Digits (with +, spaces or dashes) search phone prefixes; anything else reference prefixes
+const PHONE_SEARCH = /^\+?[\d\s-]+$/;
+
 export default function OpsOrdersPage() {
   const [search, setSearch] = useState("");
+  const [term, setTerm] = useState("");
   const [statusTab, setStatusTab] = useState<string>("ALL");
+  const [createdFrom, setCreatedFrom] = useState("");
+  const [createdTo, setCreatedTo] = useState("");
 
-  const { data: orders, isLoading, isError } = useQuery<Order[]>({
-    queryKey: ["orders"],
-    queryFn: () => ordersApi.list().then((r) => r.data),
-  });
+  useEffect(() => {
+    const timer = setTimeout(() => setTerm(search.trim()), 300);
+    return () => clearTimeout(timer);
+  }, [search]);
 
-  const filtered = orders?.filter((o) => {
-    const matchSearch =
-      o.reference_code.toLowerCase().includes(search.toLowerCase()) ||
-      o.customer_name.toLowerCase().includes(search.toLowerCase()) ||
-      o.customer_phone.includes(search);
-    const matchStatus = statusTab === "ALL" || o.status === statusTab;
-    return matchSearch && matchStatus;
+  // Server-side filters, each served by an index on the orders table
+  const filters: Record<string, string> = {
+    ...(statusTab !== "ALL" ? { status: statusTab } : {}),
+    ...(term ? (PHONE_SEARCH.test(term) ? { phone: term.replace(/[\s-]/g, "") } : { reference: term }) : {}),
+    ...(createdFrom ? { created_from: createdFrom } : {}),
+    ...(createdTo ? { created_to: createdTo } : {}),
+  };
+  const filtering = Object.keys(filters).length > 0;
+
+  const { data, isLoading, isError, fetchNextPage, hasNextPage, isFetchingNextPage } = useInfiniteQuery({
+    queryKey: ["orders", "pages", filters],
+    queryFn: ({ pageParam }) =>
+      ordersApi.list({ ...filters, ...(pageParam ? { cursor: pageParam } : {}) }).then((r) => r.data),
+    initialPageParam: null as string | null,
+    getNextPageParam: (page) => cursorOf(page.next),
+    placeholderData: keepPreviousData,
   });
+  const orders: Order[] | undefined = data?.pages.flatMap((page) => page.results);
 
   if (isLoading) return <div className="flex justify-center p-20"><Spinner size={32} /></div>;
   if (isError) return <div className="p-6"><ErrorMessage /></div>;
@@ -37,7 +53,7 @@ export default function OpsOrdersPage() {
       <div className="mb-6 flex items-center justify-between">
         <div>
           <h1 className="text-2xl font-bold text-gray-900 dark:text-gray-100">Orders</h1>
-          <p className="text-sm text-gray-500 dark:text-gray-400 mt-0.5">{orders?.length ?? 0} total</p>
+          <p className="text-sm text-gray-500 dark:text-gray-400 mt-0.5">{orders?.length ?? 0}{hasNextPage ? "+" : ""} orders</p>
         </div>
         <Link to="/ops/orders/new" className="btn-primary">
           <Plus size={16} />
@@ -46,44 +62,58 @@ export default function OpsOrdersPage() {
       </div>
 
       {/* Search */}
-      <div className="mb-3 relative">
-        <Search size={15} className="absolute left-3 top-1/2 -translate-y-1/2 text-gray-400 dark:text-gray-500" />
+      <div className="mb-3 flex flex-wrap gap-2">
+        <div className="relative flex-1 min-w-[16rem]">
+          <Search size={15} className="absolute left-3 top-1/2 -translate-y-1/2 text-gray-400 dark:text-gray-500" />
+          <input
+            className="input-field pl-9"
+            placeholder="Search by reference or phone prefix…"
+            value={search}
+            onChange={(e) => setSearch(e.target.value)}
+          />
+        </div>
         <input
-          className="input-field pl-9"
-          placeholder="Search by reference, customer name or phone…"
-          value={search}
-          onChange={(e) => setSearch(e.target.value)}
+          type="date"
+          className="input-field w-auto"
+          title="Created from"
+          value={createdFrom}
+          max={createdTo || undefined}
+          onChange={(e) => setCreatedFrom(e.target.value)}
+        />
+        <input
+          type="date"
+          className="input-field w-auto"
+          title="Created to"
+          value={createdTo}
+          min={createdFrom || undefined}
+          onChange={(e) => setCreatedTo(e.target.value)}
         />
       </div>
 
       {/* Status tabs */}
       <div className="mb-4 flex gap-1 overflow-x-auto pb-1">
-        {STATUS_TABS.map((tab) => {
-          const count = tab === "ALL"
-            ? orders?.length ?? 0
-            : orders?.filter((o) => o.status === tab).length ?? 0;
-          return (
-            <button
-              key={tab}
-              onClick={() => setStatusTab(tab)}
-              className={`shrink-0 rounded-lg px-3 py-1.5 text-xs font-medium transition-colors ${
-                statusTab === tab
-                  ? "bg-brand-600 text-white shadow-sm"
-                  : "bg-white dark:bg-gray-800 text-gray-500 dark:text-gray-400 border border-gray-200 dark:border-gray-600 hover:border-brand-300 dark:hover:border-brand-600 hover:text-brand-600 dark:hover:text-brand-400"
-              }`}
-            >
-              {tab === "ALL" ? "All" : tab.replace("_", " ")}
-              {" "}
-              <span className={`ml-0.5 ${statusTab === tab ? "opacity-80" : "opacity-60"}`}>
-                ({count})
+        {STATUS_TABS.map((tab) => (
+          <button
+            key={tab}
+            onClick={() => setStatusTab(tab)}
+            className={`shrink-0 rounded-lg px-3 py-1.5 text-xs font-medium transition-colors ${
+              statusTab === tab
+                ? "bg-brand-600 text-white shadow-sm"
+                : "bg-white dark:bg-gray-800 text-gray-500 dark:text-gray-400 border border-gray-200 dark:border-gray-600 hover:border-brand-300 dark:hover:border-brand-600 hover:text-brand-600 dark:hover:text-brand-400"
+            }`}
+          >
+            {tab === "ALL" ? "All" : tab.replace("_", " ")}
+            {statusTab === tab && (
+              <span className="ml-1 opacity-80">
+                ({orders?.length ?? 0}{hasNextPage ? "+" : ""})
               </span>
-            </button>
-          );
-        })}
+            )}
+          </button>
+        ))}
       </div>
 
       {/* Table */}
-      {filtered && filtered.length > 0 ? (
+      {orders && orders.length > 0 ? (
         <div className="card overflow-hidden p-0">
           <table className="w-full text-sm">
             <thead className="bg-gray-50 dark:bg-gray-800 border-b border-gray-100 dark:border-gray-700">
@@ -97,7 +127,7 @@ export default function OpsOrdersPage() {
               </tr>
             </thead>
             <tbody>
-              {filtered.map((order) => (
+              {orders.map((order) => (
                 <tr key={order.id} className="border-t border-gray-50 dark:border-gray-700 hover:bg-gray-50/80 dark:hover:bg-gray-700/50 transition-colors">
                   <td className="px-4 py-3">
                     <div className="flex items-center gap-2">
@@ -132,14 +162,25 @@ export default function OpsOrdersPage() {
               ))}
             </tbody>
           </table>
+          {hasNextPage && (
+            <div className="border-t border-gray-100 dark:border-gray-700 p-3 text-center">
+              <button
+                onClick={() => fetchNextPage()}
+                disabled={isFetchingNextPage}
+                className="text-xs font-medium text-brand-600 hover:underline disabled:opacity-50"
+              >
+                {isFetchingNextPage ? "Loading…" : "Load more"}
+              </button>
+            </div>
+          )}
         </div>
       ) : (
         <div className="card py-14 text-center">
           <Package size={36} className="mx-auto mb-3 text-gray-200 dark:text-gray-600" />
           <p className="font-medium text-gray-500 dark:text-gray-400">
-            {search || statusTab !== "ALL" ? "No matching orders" : "No orders yet"}
+            {filtering ? "No matching orders" : "No orders yet"}
           </p>
-          {!search && statusTab === "ALL" && (
+          {!filtering && (
             <Link to="/ops/orders/new" className="btn-primary mt-4 inline-flex">
               <Plus size={15} /> Create first order
             </Link>
@@ -21,8 +21,8 @@ export default function OpsRouteDetailPage() {
   if (isLoading) return <div className="flex justify-center p-20"><Spinner size={32} /></div>;
   if (isError || !route) return <div className="p-6"><ErrorMessage /></div>;
 
-  const completedOrders = route.orders?.filter((o) => o.status === "DELIVERED").length ?? 0;
-  const totalOrders = route.orders?.length ?? 0;
+  const completedOrders = route.order_counts?.DELIVERED ?? 0;
+  const totalOrders = route.order_count ?? 0;
   const progressPct = totalOrders > 0 ? Math.round((completedOrders / totalOrders) * 100) : 0;
 
   return (
@@ -1,5 +1,5 @@
 import { useQuery, useMutation, useQueryClient } from "@tanstack/react-query";
-import { routesApi, driversApi, vehiclesApi, ordersApi } from "@/api/endpoints";
+import { routesApi, driversApi, vehiclesApi, ordersApi, listAll } from "@/api/endpoints";
 import type { Route, Driver, Vehicle, Order } from "@/types";
 import { RouteStatusBadge } from "@/components/StatusBadge";
 import Spinner from "@/components/Spinner";
@@ -31,12 +31,12 @@ export default function OpsRoutesPage() {
 
   const { data: routes, isLoading, isError } = useQuery<Route[]>({
     queryKey: ["routes"],
-    queryFn: () => routesApi.list().then((r) => r.data),
+    queryFn: () => routesApi.list().then((r) => r.data.results),
   });
 
   const { data: drivers } = useQuery<Driver[]>({
-    queryKey: ["drivers"],
-    queryFn: () => driversApi.list().then((r) => r.data),
+    queryKey: ["drivers", "all"],
+    queryFn: () => listAll(driversApi.list),
     enabled: showCreate,
   });
 
@@ -48,7 +48,7 @@ export default function OpsRoutesPage() {
 
   const { data: orders } = useQuery<Order[]>({
     queryKey: ["orders", "CREATED"],
-    queryFn: () => ordersApi.list({ status: "CREATED" }).then((r) => r.data),
+    queryFn: () => listAll(ordersApi.list, { status: "CREATED" }),
     enabled: showCreate,
   });
 
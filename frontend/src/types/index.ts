@@ -117,10 +117,34 @@ export interface Route {
   status: RouteStatus;
   orders: Order[];
   order_count?: number;
+  order_counts?: Partial<Record<OrderStatus, number>>;
   start_time?: string;
   end_time?: string;
   notes?: string;
+  optimization_summary?: {
+    mode?: string;
+    distance_before_km?: number;
+    distance_after_km?: number;
+  };
+  created_at: string;
+}
+
+export type OptimizationJobStatus = "QUEUED" | "RUNNING" | "SUCCEEDED" | "FAILED";
+
+export interface OptimizationJob {
+  id: string;
+  route: string;
+  mode: string;
+  status: OptimizationJobStatus;
+  progress: number;
+  iterations: number;
+  best_cost: number | null;
+  time_budget_s: number;
+  result: Route["optimization_summary"];
+  error: string;
   created_at: string;
+  started_at: string | null;
+  finished_at: string | null;
 }
 
 export type ExceptionType =
@@ -172,3 +196,18 @@ export interface TrackingData {
   last_update: string;
   driver_eta?: string | null;
 }
+
+// Keyset-paginated ops lists; follow next/previous to page through
+export interface Page<T> {
+  next: string | null;
+  previous: string | null;
+  results: T[];
+}
+
+// Tenant-wide dashboard counts, aggregated by the API
+export interface OpsStats {
+  orders: Record<OrderStatus, number>;
+  order_count: number;
+  open_exception_count: number;
+  active_route_count: number;
+}